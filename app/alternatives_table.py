@@ -0,0 +1,368 @@
+"""
+Materialized "healthier alternatives" for every catalog food.
+
+build runs the get_healthier_alternatives() selection once per catalog
+food name and stores the top-n rows with their Calories_Reduction and
+Protein_Ratio_Improvement in a compact .npz file, so answering the most
+common request ("alternatives for X", X in the catalog) is a dictionary
+probe plus a few array reads.
+
+When the catalog changes, refresh() recomputes only the entries the
+change can affect and carries the rest over.
+
+Build or refresh the table from the app directory with:
+    python -m alternatives_table
+"""
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+from catalog_snapshot import SNAPSHOT_DIR
+from nutrition_utils import DEFAULT_NUTRITION_FILE, catalog_cache
+from recommender import AlternativesIndex, get_healthier_alternatives
+from search_index import NgramIndex
+
+TABLE_VERSION = 1
+TABLE_FILE = os.path.join(SNAPSHOT_DIR, 'alternatives.npz')
+NUMERIC_COLUMNS = ['Calories', 'Protein', 'Fat', 'Carbs']
+
+logger = logging.getLogger(__name__)
+
+
+def _row_identities(names) -> list:
+    """Identify rows by (name, occurrence) so they can be matched across catalog versions"""
+    seen = {}
+    identities = []
+    for name in names:
+        occurrence = seen.get(name, 0)
+        seen[name] = occurrence + 1
+        identities.append((name, occurrence))
+    return identities
+
+
+def _catalog_keys(df: pd.DataFrame) -> list:
+    """Lowercased catalog names, first occurrence order"""
+    return list(dict.fromkeys(name.lower() for name in df['Food']))
+
+
+class AlternativesTable:
+    """
+    Top-n alternatives for every catalog food, as fixed-width arrays.
+
+    Entry i belongs to keys[i] (a lowercased catalog name). rows[i] holds
+    the selected catalog rows best first, padded with -1, and the reduction
+    and improvement arrays hold the matching metrics as float32. steps[i]
+    records which selection step produced the entry, or 0 if the key could
+    not be materialized and must be served live.
+    """
+
+    def __init__(self, keys, target_rows, rows, steps, calories_reduction, ratio_improvement,
+                 n_suggestions: int, catalog_names, catalog_values, catalog_digest: str = ''):
+        self.keys = list(keys)
+        self.target_rows = np.asarray(target_rows, dtype=np.int32)
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.steps = np.asarray(steps, dtype=np.int8)
+        self.calories_reduction = np.asarray(calories_reduction, dtype=np.float32)
+        self.ratio_improvement = np.asarray(ratio_improvement, dtype=np.float32)
+        self.n_suggestions = int(n_suggestions)
+        self.catalog_names = list(catalog_names)
+        self.catalog_values = np.asarray(catalog_values, dtype=np.float64)
+        self.catalog_digest = catalog_digest
+        self.key_index = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    @staticmethod
+    def _compute(keys, df: pd.DataFrame, n_suggestions: int, search: NgramIndex, index: AlternativesIndex):
+        """Run the live selection for each key"""
+        m = len(keys)
+        target_rows = np.zeros(m, dtype=np.int32)
+        rows = np.full((m, n_suggestions), -1, dtype=np.int32)
+        steps = np.zeros(m, dtype=np.int8)
+        calories_reduction = np.zeros((m, n_suggestions), dtype=np.float32)
+        ratio_improvement = np.zeros((m, n_suggestions), dtype=np.float32)
+
+        for i, key in enumerate(keys):
+            # Same target as get_healthier_alternatives(key): the first name containing it
+            try:
+                matches = search.contains(key)
+            except Exception:
+                # Names that are invalid regexes fail live too; leave them to the live path
+                matches = []
+            if len(matches) == 0:
+                continue
+            target = int(matches[0])
+            selected, step = index.select(target, n_suggestions)
+            count = len(selected)
+            target_rows[i] = target
+            steps[i] = step
+            rows[i, :count] = selected
+            # Rounded like the live output before narrowing to float32, so serving
+            # reproduces the same two-decimal values
+            calories_reduction[i, :count] = np.round(index.calories[target] - index.calories[selected], 2)
+            ratio_improvement[i, :count] = np.round(
+                index.protein_ratio[selected] - index.protein_ratio[target], 2
+            )
+
+        return target_rows, rows, steps, calories_reduction, ratio_improvement
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, n_suggestions: int = 3, catalog_digest: str = '') -> 'AlternativesTable':
+        """Materialize the alternatives for every food in a catalog"""
+        keys = _catalog_keys(df)
+        computed = cls._compute(keys, df, n_suggestions, NgramIndex(df['Food']), AlternativesIndex(df))
+        return cls(keys, *computed, n_suggestions, list(df['Food']),
+                   df[NUMERIC_COLUMNS].to_numpy(dtype=np.float64), catalog_digest)
+
+    def refresh(self, df: pd.DataFrame, catalog_digest: str = '') -> tuple:
+        """
+        Bring the table up to date with a changed catalog.
+
+        An entry is recomputed only when the change can affect it:
+        - its name is new, or a changed row's name contains it (its target may move)
+        - its target or one of its selected rows was changed or removed
+        - a changed or removed row has fewer calories than its target, and so
+          may enter or leave the candidate set of the first two selection steps
+        - it was filled by the lowest-calorie fallback, which depends on the
+          whole catalog
+        Every other entry keeps its selection, with row numbers remapped.
+
+        Returns:
+            tuple: (refreshed AlternativesTable, number of recomputed entries)
+        """
+        new_names = list(df['Food'])
+        new_values = df[NUMERIC_COLUMNS].to_numpy(dtype=np.float64)
+
+        # Map unchanged old rows to their new position; everything else counts as changed
+        new_position = {identity: row for row, identity in enumerate(_row_identities(new_names))}
+        old_to_new = np.full(len(self.catalog_names), -1, dtype=np.int64)
+        for old_row, identity in enumerate(_row_identities(self.catalog_names)):
+            new_row = new_position.get(identity)
+            if new_row is not None and np.array_equal(
+                self.catalog_values[old_row], new_values[new_row], equal_nan=True
+            ):
+                old_to_new[old_row] = new_row
+
+        unchanged_new = np.zeros(len(new_names), dtype=bool)
+        unchanged_new[old_to_new[old_to_new >= 0]] = True
+        changed_new = np.flatnonzero(~unchanged_new)
+        changed_old = np.flatnonzero(old_to_new < 0)
+
+        # Ties are broken by catalog order, so a reordered catalog needs a full rebuild
+        kept = old_to_new[old_to_new >= 0]
+        if np.any(np.diff(kept) < 0):
+            return AlternativesTable.build(df, self.n_suggestions, catalog_digest), len(_catalog_keys(df))
+
+        keys = _catalog_keys(df)
+        if len(changed_new) == 0 and len(changed_old) == 0:
+            stale = np.zeros(len(keys), dtype=bool)
+        else:
+            changed_calories = np.concatenate([
+                new_values[changed_new, 0], self.catalog_values[changed_old, 0]
+            ])
+            lowest_changed_calories = np.nanmin(changed_calories) if len(changed_calories) else np.inf
+
+            # Keys that are substrings of a changed name
+            touched_keys = set()
+            key_set = set(keys)
+            changed_names = [new_names[row].lower() for row in changed_new]
+            changed_names += [self.catalog_names[row].lower() for row in changed_old]
+            for name in changed_names:
+                for start in range(len(name)):
+                    for end in range(start + 1, len(name) + 1):
+                        if name[start:end] in key_set:
+                            touched_keys.add(name[start:end])
+
+            stale = np.ones(len(keys), dtype=bool)
+            for i, key in enumerate(keys):
+                old = self.key_index.get(key)
+                if old is None or key in touched_keys:
+                    continue
+                if self.steps[old] in (0, AlternativesIndex.LOWEST_CALORIES):
+                    continue
+                target = self.target_rows[old]
+                if old_to_new[target] < 0 or self.catalog_values[target, 0] > lowest_changed_calories:
+                    continue
+                selected = self.rows[old][self.rows[old] >= 0]
+                if np.any(old_to_new[selected] < 0):
+                    continue
+                stale[i] = False
+
+        n = self.n_suggestions
+        target_rows = np.zeros(len(keys), dtype=np.int32)
+        rows = np.full((len(keys), n), -1, dtype=np.int32)
+        steps = np.zeros(len(keys), dtype=np.int8)
+        calories_reduction = np.zeros((len(keys), n), dtype=np.float32)
+        ratio_improvement = np.zeros((len(keys), n), dtype=np.float32)
+
+        # Carry over fresh entries with remapped rows
+        for i in np.flatnonzero(~stale):
+            old = self.key_index[keys[i]]
+            target_rows[i] = old_to_new[self.target_rows[old]]
+            valid = self.rows[old] >= 0
+            rows[i, valid] = old_to_new[self.rows[old][valid]]
+            steps[i] = self.steps[old]
+            calories_reduction[i] = self.calories_reduction[old]
+            ratio_improvement[i] = self.ratio_improvement[old]
+
+        # Recompute the rest
+        stale_rows = np.flatnonzero(stale)
+        if len(stale_rows):
+            computed = self._compute(
+                [keys[i] for i in stale_rows], df, n, NgramIndex(df['Food']), AlternativesIndex(df)
+            )
+            for array, values in zip(
+                (target_rows, rows, steps, calories_reduction, ratio_improvement), computed
+            ):
+                array[stale_rows] = values
+
+        table = AlternativesTable(keys, target_rows, rows, steps, calories_reduction, ratio_improvement,
+                                  n, new_names, new_values, catalog_digest)
+        return table, len(stale_rows)
+
+    def lookup(self, food_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return the stored alternatives for food_name, or None if it is not a key.
+
+        df must be the catalog the table was built from. The result has the
+        same columns and values as get_healthier_alternatives().
+        """
+        i = self.key_index.get(food_name.lower())
+        if i is None or self.steps[i] == 0:
+            return None
+
+        rows = self.rows[i]
+        count = int(np.count_nonzero(rows >= 0))
+        rows = rows[:count]
+
+        result = df.iloc[rows][['Food', 'Calories', 'Protein', 'Fat', 'Carbs']].copy()
+        result['Protein_Ratio'] = result['Protein'] / result['Calories']
+
+        reduction = self.calories_reduction[i, :count].astype(np.float64)
+        if pd.api.types.is_integer_dtype(df['Calories']):
+            reduction = np.rint(reduction).astype(df['Calories'].dtype)
+        result['Calories_Reduction'] = reduction
+        result['Protein_Ratio_Improvement'] = self.ratio_improvement[i, :count].astype(np.float64)
+
+        return result.round(2)
+
+    def save(self, path: str = TABLE_FILE):
+        """Write the table as an uncompressed .npz file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez(
+            tmp_path,
+            version=np.int32(TABLE_VERSION),
+            keys=np.array(self.keys, dtype=str),
+            target_rows=self.target_rows,
+            rows=self.rows,
+            steps=self.steps,
+            calories_reduction=self.calories_reduction,
+            ratio_improvement=self.ratio_improvement,
+            n_suggestions=np.int32(self.n_suggestions),
+            catalog_names=np.array(self.catalog_names, dtype=str),
+            catalog_values=self.catalog_values,
+            catalog_digest=np.array(self.catalog_digest)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = TABLE_FILE) -> 'AlternativesTable':
+        """Read a table written by save(), or return None if it is missing or from another version"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != TABLE_VERSION:
+                return None
+            return cls(
+                data['keys'].tolist(),
+                data['target_rows'],
+                data['rows'],
+                data['steps'],
+                data['calories_reduction'],
+                data['ratio_improvement'],
+                int(data['n_suggestions']),
+                data['catalog_names'].tolist(),
+                data['catalog_values'],
+                str(data['catalog_digest'])
+            )
+
+
+_table_lock = threading.Lock()
+_loaded_tables = {}
+
+
+def _current_table(path: str) -> AlternativesTable:
+    """Load a table file once per modification, shared across calls"""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _table_lock:
+        cached = _loaded_tables.get(path)
+        if cached is None or cached[0] != mtime_ns:
+            cached = (mtime_ns, AlternativesTable.load(path))
+            _loaded_tables[path] = cached
+        return cached[1]
+
+
+def get_alternatives(food_name: str, n_suggestions: int = 3, table_file: str = TABLE_FILE,
+                     file_path: str = DEFAULT_NUTRITION_FILE) -> pd.DataFrame:
+    """
+    Get healthier alternatives, served from the materialized table when possible.
+
+    Falls back to get_healthier_alternatives() when there is no table, it was
+    built for another catalog version or n_suggestions, or food_name is not a
+    catalog name.
+    """
+    try:
+        table = _current_table(table_file)
+        if table is not None and table.n_suggestions == n_suggestions:
+            # The table's rows are only valid for the exact catalog version it was built from
+            digest, df = catalog_cache.versioned(file_path)
+            if table.catalog_digest == digest:
+                result = table.lookup(food_name, df)
+                if result is not None:
+                    return result
+    except Exception as e:
+        logger.warning(f"Ignoring alternatives table: {str(e)}")
+    return get_healthier_alternatives(food_name, n_suggestions)
+
+
+def update_alternatives_table(n_suggestions: int = 3, table_file: str = TABLE_FILE,
+                              file_path: str = DEFAULT_NUTRITION_FILE, full: bool = False) -> tuple:
+    """
+    Build the table, or refresh the existing one for the current catalog.
+
+    Returns:
+        tuple: (number of recomputed entries, total entries)
+    """
+    digest, df = catalog_cache.versioned(file_path)
+    table = None if full else AlternativesTable.load(table_file)
+
+    if table is None or table.n_suggestions != n_suggestions:
+        table = AlternativesTable.build(df, n_suggestions, digest)
+        recomputed = len(table)
+    else:
+        table, recomputed = table.refresh(df, digest)
+
+    table.save(table_file)
+    return recomputed, len(table)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or refresh the materialized alternatives table")
+    parser.add_argument('--n-suggestions', type=int, default=3)
+    parser.add_argument('--full', action='store_true', help="Rebuild every entry")
+    args = parser.parse_args()
+
+    recomputed, total = update_alternatives_table(args.n_suggestions, full=args.full)
+    print(f"Recomputed {recomputed} of {total} entries in {TABLE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Nearest-neighbour indexes over recognizer feature vectors.
+
+Both indexes store L2-normalized vectors and rank by inner product, i.e.
+cosine similarity, and share one interface:
+
+    index.add(vectors, ids=None)      insert vectors (ids default to 0, 1, ...)
+    index.search(queries, k)          -> (scores, ids), each (n_queries, k)
+    index.save(path) / cls.load(path)
+
+ExactIndex scans every vector. IVFFlatIndex partitions vectors into
+n_lists clusters with spherical k-means and only scans the n_probe
+clusters closest to a query, trading a little recall for a large speedup
+on galleries with hundreds of thousands of images. Both are plain NumPy.
+Missing results (fewer than k vectors) are returned with id -1.
+"""
+import numpy as np
+
+INDEX_VERSION = 1
+
+
+def normalize(vectors) -> np.ndarray:
+    """L2-normalize rows as float32; all-zero rows stay zero"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Columns of the k best scores per row, best first"""
+    if k < scores.shape[1]:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _pad(scores: np.ndarray, ids: np.ndarray, k: int) -> tuple:
+    """Pad (scores, ids) with -inf / -1 up to k columns"""
+    missing = k - scores.shape[1]
+    if missing > 0:
+        scores = np.pad(scores, ((0, 0), (0, missing)), constant_values=-np.inf)
+        ids = np.pad(ids, ((0, 0), (0, missing)), constant_values=-1)
+    return scores, ids
+
+
+class _GrowableArray:
+    """Amortized append-only 2D array"""
+
+    def __init__(self, dim: int, dtype):
+        self._data = np.empty((0, dim), dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data[:self._size]
+
+    def extend(self, rows: np.ndarray):
+        needed = self._size + len(rows)
+        if needed > len(self._data):
+            grown = np.empty((max(needed, 2 * len(self._data), 16),) + self._data.shape[1:], dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = rows
+        self._size = needed
+
+
+class ExactIndex:
+    """Brute-force inner-product search; the reference for recall"""
+
+    def __init__(self, dim: int, dtype=np.float32):
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self._vectors = _GrowableArray(dim, self.dtype)
+        self._ids = _GrowableArray(1, np.int64)
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def add(self, vectors, ids=None):
+        """Insert vectors; ids default to consecutive integers"""
+        vectors = normalize(vectors)
+        if ids is None:
+            ids = np.arange(len(self), len(self) + len(vectors))
+        self._vectors.extend(vectors.astype(self.dtype, copy=False))
+        self._ids.extend(np.asarray(ids, dtype=np.int64).reshape(-1, 1))
+
+    def search(self, queries, k: int = 10) -> tuple:
+        """
+        Find the k most similar vectors to each query.
+
+        Returns:
+            tuple: (scores, ids) arrays of shape (n_queries, k)
+        """
+        queries = normalize(queries)
+        if len(self) == 0:
+            return _pad(np.empty((len(queries), 0), np.float32), np.empty((len(queries), 0), np.int64), k)
+        scores = queries @ self._vectors.data.astype(np.float32, copy=False).T
+        top = _top_k(scores, k)
+        return _pad(np.take_along_axis(scores, top, axis=1), self._ids.data[:, 0][top], k)
+
+    def remap_ids(self, mapping):
+        """
+        Renumber the stored ids, dropping vectors whose new id is negative.
+
+        Args:
+            mapping: Array indexed by old id giving the new id, or -1 to drop
+        """
+        new_ids = np.asarray(mapping, dtype=np.int64)[self._ids.data[:, 0]]
+        keep = new_ids >= 0
+        vectors = self._vectors.data[keep]
+        self._vectors = _GrowableArray(self.dim, self.dtype)
+        self._ids = _GrowableArray(1, np.int64)
+        self._vectors.extend(vectors)
+        self._ids.extend(new_ids[keep].reshape(-1, 1))
+
+    def save(self, path):
+        np.savez(path, kind='exact', version=INDEX_VERSION, dim=self.dim,
+                 vectors=self._vectors.data, ids=self._ids.data[:, 0])
+
+    @classmethod
+    def _from_arrays(cls, arrays):
+        index = cls(int(arrays['dim']), dtype=arrays['vectors'].dtype)
+        index._vectors.extend(arrays['vectors'])
+        index._ids.extend(arrays['ids'].reshape(-1, 1))
+        return index
+
+    @classmethod
+    def load(cls, path):
+        return load_index(path)
+
+
+class IVFFlatIndex:
+    """
+    Inverted-file index with uncompressed vectors.
+
+    Vectors are assigned to the closest of n_lists centroids. A query
+    ranks the centroids, then scores exactly only the vectors in its
+    n_probe closest lists. Inserting a vector only appends it to its
+    list, so the gallery can grow without retraining; retrain with
+    build() once the data has drifted far from the original sample.
+    """
+
+    def __init__(self, dim: int, n_lists: int = 256, n_probe: int = 8, dtype=np.float32):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.dtype = np.dtype(dtype)
+        self.centroids = None
+        self._lists = []
+        self._list_ids = []
+
+    def __len__(self):
+        return sum(len(ids) for ids in self._list_ids)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors, iterations: int = 10, sample_size: int = 50_000, seed: int = 0):
+        """
+        Fit the centroids with spherical k-means on a sample of vectors.
+
+        Any vectors already in the index are dropped.
+        """
+        vectors = normalize(vectors)
+        rng = np.random.default_rng(seed)
+        if len(vectors) > sample_size:
+            vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        n_lists = min(self.n_lists, len(vectors))
+
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            counts = np.bincount(assignment, minlength=n_lists)
+            # Re-seed empty clusters with random points
+            empty = np.flatnonzero(counts == 0)
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty))]
+            centroids = normalize(sums)
+
+        self.centroids = centroids
+        self.n_lists = n_lists
+        self._lists = [_GrowableArray(self.dim, self.dtype) for _ in range(n_lists)]
+        self._list_ids = [_GrowableArray(1, np.int64) for _ in range(n_lists)]
+
+    def add(self, vectors, ids=None, batch_size: int = 65_536):
+        """Insert vectors into their closest lists; ids default to consecutive integers"""
+        if not self.is_trained:
+            raise ValueError("IVFFlatIndex must be trained before vectors are added")
+        vectors = normalize(vectors)
+        if ids is None:
+            ids = np.arange(len(self), len(self) + len(vectors))
+        ids = np.asarray(ids, dtype=np.int64)
+
+        for start in range(0, len(vectors), batch_size):
+            batch = vectors[start:start + batch_size]
+            batch_ids = ids[start:start + batch_size]
+            assignment = np.argmax(batch @ self.centroids.T, axis=1)
+            order = np.argsort(assignment, kind='stable')
+            bounds = np.searchsorted(assignment[order], np.arange(self.n_lists + 1))
+            for list_id in np.flatnonzero(np.diff(bounds)):
+                members = order[bounds[list_id]:bounds[list_id + 1]]
+                self._lists[list_id].extend(batch[members].astype(self.dtype, copy=False))
+                self._list_ids[list_id].extend(batch_ids[members].reshape(-1, 1))
+
+    def search(self, queries, k: int = 10, n_probe: int = None) -> tuple:
+        """
+        Find approximately the k most similar vectors to each query.
+
+        Args:
+            queries: One vector or a (n_queries, dim) array
+            k (int): Results per query (default: 10)
+            n_probe (int): Lists to scan per query (default: self.n_probe)
+
+        Returns:
+            tuple: (scores, ids) arrays of shape (n_queries, k)
+        """
+        queries = normalize(queries)
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        if not self.is_trained:
+            return all_scores, all_ids
+
+        probes = _top_k(queries @ self.centroids.T, n_probe)
+        for q, query in enumerate(queries):
+            lists = [l for l in probes[q] if len(self._lists[l])]
+            if not lists:
+                continue
+            candidates = np.concatenate([self._lists[l].data for l in lists])
+            candidate_ids = np.concatenate([self._list_ids[l].data[:, 0] for l in lists])
+            scores = candidates.astype(np.float32, copy=False) @ query
+            top = _top_k(scores[None, :], k)[0]
+            all_scores[q, :len(top)] = scores[top]
+            all_ids[q, :len(top)] = candidate_ids[top]
+        return all_scores, all_ids
+
+    def remap_ids(self, mapping):
+        """
+        Renumber the stored ids, dropping vectors whose new id is negative.
+
+        The centroids are kept, so no retraining is needed.
+
+        Args:
+            mapping: Array indexed by old id giving the new id, or -1 to drop
+        """
+        mapping = np.asarray(mapping, dtype=np.int64)
+        for l in range(len(self._lists)):
+            new_ids = mapping[self._list_ids[l].data[:, 0]]
+            keep = new_ids >= 0
+            vectors = self._lists[l].data[keep]
+            self._lists[l] = _GrowableArray(self.dim, self.dtype)
+            self._list_ids[l] = _GrowableArray(1, np.int64)
+            self._lists[l].extend(vectors)
+            self._list_ids[l].extend(new_ids[keep].reshape(-1, 1))
+
+    def save(self, path):
+        """Write the index to one .npz file"""
+        sizes = np.array([len(ids) for ids in self._list_ids], dtype=np.int64)
+        vectors = np.concatenate([l.data for l in self._lists]) if self._lists else np.empty((0, self.dim), self.dtype)
+        ids = np.concatenate([l.data[:, 0] for l in self._list_ids]) if self._list_ids else np.empty(0, np.int64)
+        np.savez(path, kind='ivf_flat', version=INDEX_VERSION, dim=self.dim, n_probe=self.n_probe,
+                 centroids=self.centroids if self.is_trained else np.empty((0, self.dim), np.float32),
+                 list_sizes=sizes, vectors=vectors, ids=ids)
+
+    @classmethod
+    def _from_arrays(cls, arrays):
+        centroids = arrays['centroids']
+        index = cls(int(arrays['dim']), n_lists=len(centroids), n_probe=int(arrays['n_probe']),
+                    dtype=arrays['vectors'].dtype)
+        if len(centroids) == 0:
+            return index
+        index.centroids = centroids
+        index._lists = [_GrowableArray(index.dim, index.dtype) for _ in range(len(centroids))]
+        index._list_ids = [_GrowableArray(1, np.int64) for _ in range(len(centroids))]
+        offsets = np.concatenate([[0], np.cumsum(arrays['list_sizes'])])
+        vectors, ids = arrays['vectors'], arrays['ids']
+        for l in range(len(centroids)):
+            index._lists[l].extend(vectors[offsets[l]:offsets[l + 1]])
+            index._list_ids[l].extend(ids[offsets[l]:offsets[l + 1]].reshape(-1, 1))
+        return index
+
+    @classmethod
+    def load(cls, path):
+        return load_index(path)
+
+
+INDEX_TYPES = {'exact': ExactIndex, 'ivf_flat': IVFFlatIndex}
+
+
+def build_index(vectors, kind: str = 'ivf_flat', ids=None, dtype=np.float32, **params):
+    """
+    Build an index over vectors.
+
+    Args:
+        vectors: (n, dim) array of feature vectors
+        kind (str): 'exact' or 'ivf_flat' (default)
+        ids: Optional id per vector (default: row numbers)
+        dtype: Storage type of the vectors, e.g. np.float16 to halve memory
+        **params: Index options, e.g. n_lists and n_probe for IVF
+
+    Returns:
+        ExactIndex or IVFFlatIndex
+    """
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{kind}'; expected one of {sorted(INDEX_TYPES)}")
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if kind == 'ivf_flat':
+        n_lists = params.pop('n_lists', max(1, int(np.sqrt(len(vectors)))))
+        train_params = {key: params.pop(key) for key in ('iterations', 'sample_size', 'seed') if key in params}
+        index = IVFFlatIndex(vectors.shape[1], n_lists=n_lists, dtype=dtype, **params)
+        index.train(vectors, **train_params)
+    else:
+        index = ExactIndex(vectors.shape[1], dtype=dtype)
+    index.add(vectors, ids)
+    return index
+
+
+def load_index(path):
+    """Load an index written by save(), whatever its type"""
+    with np.load(path, allow_pickle=False) as arrays:
+        if int(arrays['version']) != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version {int(arrays['version'])}")
+        return INDEX_TYPES[str(arrays['kind'])]._from_arrays(arrays)
@@ -0,0 +1,117 @@
+"""
+Registry of image backbones the recognizer can run on.
+
+Every entry is an ImageNet-1k classifier from torchvision, so the labels,
+the label-to-dish mapping and the preset gallery work the same on all of
+them. Each entry knows how to build the network, which weights it uses,
+its input transform and how to split it into
+
+    backbone    image batch -> pooled embedding (embedding_dim wide)
+    classifier  embedding   -> 1000 ImageNet logits
+
+Smaller backbones trade accuracy for latency and memory:
+
+    mobilenet_v3_large  ~5.5M parameters, 960-d embedding
+    efficientnet_b0     ~5.3M parameters, 1280-d embedding
+    resnet18            ~11.7M parameters, 512-d embedding
+    resnet50            ~25.6M parameters, 2048-d embedding (default)
+"""
+import os
+import torch
+import torchvision
+import torchvision.transforms as transforms
+
+DEFAULT_BACKBONE = os.environ.get('EATELLIGENCE_BACKBONE', 'resnet50')
+
+
+def _split_resnet(model):
+    """ResNets: everything before fc is the backbone"""
+    return torch.nn.Sequential(*list(model.children())[:-1], torch.nn.Flatten()), model.fc
+
+
+def _split_features_classifier(model):
+    """MobileNet / EfficientNet: features + avgpool, then the classifier head"""
+    return torch.nn.Sequential(model.features, model.avgpool, torch.nn.Flatten()), model.classifier
+
+
+class BackboneSpec:
+    """
+    How to build, preprocess for and split one backbone.
+
+    Args:
+        name (str): Registry key, also the weights file name (<name>.pth)
+        builder: torchvision model constructor
+        weights: torchvision weights enum entry
+        embedding_dim (int): Width of the pooled embedding
+        split: Callable mapping the model to (backbone, classifier)
+    """
+
+    def __init__(self, name: str, builder, weights, embedding_dim: int, split):
+        self.name = name
+        self.builder = builder
+        self.weights = weights
+        self.embedding_dim = embedding_dim
+        self.split = split
+
+    @property
+    def weights_file(self) -> str:
+        return f"{self.name}.pth"
+
+    @property
+    def resize_size(self) -> int:
+        """Short side images are resized to before the center crop"""
+        return self.weights.transforms().resize_size[0]
+
+    @property
+    def crop_size(self) -> int:
+        """Side of the square input the network sees"""
+        return self.weights.transforms().crop_size[0]
+
+    @property
+    def num_classes(self) -> int:
+        """Width of the classifier output"""
+        return len(self.weights.meta['categories'])
+
+    def build(self, state_dict: dict = None) -> torch.nn.Module:
+        """Construct the network in eval mode, optionally loading a state dict"""
+        model = self.builder(weights=None)
+        if state_dict is not None:
+            model.load_state_dict(state_dict)
+        return model.eval()
+
+    def transform(self) -> transforms.Compose:
+        """PIL image -> normalized tensor, as the weights were trained"""
+        preset = self.weights.transforms()
+        return transforms.Compose([
+            transforms.Resize(preset.resize_size[0], interpolation=preset.interpolation),
+            transforms.CenterCrop(self.crop_size),
+            transforms.ToTensor(),
+            transforms.Normalize(mean=preset.mean, std=preset.std),
+        ])
+
+
+BACKBONES = {
+    spec.name: spec for spec in (
+        BackboneSpec('mobilenet_v3_large', torchvision.models.mobilenet_v3_large,
+                     torchvision.models.MobileNet_V3_Large_Weights.IMAGENET1K_V1, 960, _split_features_classifier),
+        BackboneSpec('efficientnet_b0', torchvision.models.efficientnet_b0,
+                     torchvision.models.EfficientNet_B0_Weights.IMAGENET1K_V1, 1280, _split_features_classifier),
+        BackboneSpec('resnet18', torchvision.models.resnet18,
+                     torchvision.models.ResNet18_Weights.IMAGENET1K_V1, 512, _split_resnet),
+        BackboneSpec('resnet50', torchvision.models.resnet50,
+                     torchvision.models.ResNet50_Weights.IMAGENET1K_V1, 2048, _split_resnet),
+    )
+}
+
+
+def get_backbone(name: str = DEFAULT_BACKBONE) -> BackboneSpec:
+    """
+    Look up a backbone by name.
+
+    Raises:
+        ValueError: If the name is not registered
+    """
+    try:
+        return BACKBONES[name]
+    except KeyError:
+        raise ValueError(f"Unknown backbone '{name}'; expected one of {', '.join(BACKBONES)}") from None
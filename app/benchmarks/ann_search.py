@@ -0,0 +1,65 @@
+"""
+Benchmark: exact vs IVF-flat nearest-neighbour search over a reference gallery.
+
+Galleries are synthetic clustered unit vectors shaped like recognizer
+features (dish photos cluster by dish). Reports build time, per-query
+latency and recall@10 against exact search for several n_probe values.
+
+Run from the app directory:
+    python -m benchmarks.ann_search
+"""
+import time
+import numpy as np
+from ann_index import ExactIndex, build_index
+
+SIZES = [10_000, 100_000, 300_000]
+DIM = 256
+N_QUERIES = 200
+K = 10
+N_PROBES = [4, 8, 16, 32]
+
+
+def make_gallery(size: int, dim: int = DIM, n_dishes: int = 1_000, seed: int = 0) -> tuple:
+    """Clustered vectors plus queries drawn from the same distribution"""
+    rng = np.random.default_rng(seed)
+    dishes = rng.normal(size=(n_dishes, dim)).astype(np.float32)
+    labels = rng.integers(n_dishes, size=size + N_QUERIES)
+    vectors = dishes[labels] + 0.6 * rng.normal(size=(size + N_QUERIES, dim)).astype(np.float32)
+    return vectors[:size], vectors[size:]
+
+
+def recall(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Fraction of the exact top-k ids that the approximate search found"""
+    hits = sum(len(np.intersect1d(e, a)) for e, a in zip(expected, actual))
+    return hits / expected.size
+
+
+def main():
+    print(f"{'vectors':>8} {'index':>14} {'build (s)':>10} {'query (ms)':>11} {'recall@10':>10}")
+    for size in SIZES:
+        vectors, queries = make_gallery(size)
+
+        start = time.perf_counter()
+        exact = ExactIndex(DIM)
+        exact.add(vectors)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = np.vstack([exact.search(query, K)[1] for query in queries])
+        exact_ms = (time.perf_counter() - start) / N_QUERIES * 1e3
+        print(f"{size:>8} {'exact':>14} {build_s:>10.2f} {exact_ms:>11.2f} {1.0:>10.3f}")
+
+        start = time.perf_counter()
+        ivf = build_index(vectors, 'ivf_flat')
+        build_s = time.perf_counter() - start
+
+        for n_probe in N_PROBES:
+            start = time.perf_counter()
+            actual = np.vstack([ivf.search(query, K, n_probe=n_probe)[1] for query in queries])
+            ivf_ms = (time.perf_counter() - start) / N_QUERIES * 1e3
+            name = f"ivf {ivf.n_lists}/{n_probe}"
+            print(f"{size:>8} {name:>14} {build_s:>10.2f} {ivf_ms:>11.2f} {recall(expected, actual):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark: per-keystroke autocomplete latency vs index size.
+
+Types a few dish names one character at a time against PrefixIndex
+instances built from synthetic catalogs.
+
+Run from the app directory:
+    python -m benchmarks.autocomplete
+"""
+import time
+import numpy as np
+from search_index import PrefixIndex
+
+SIZES = [1_000, 10_000, 100_000]
+WORDS = [
+    'masala', 'dosa', 'paneer', 'dal', 'aloo', 'gobi', 'tikka', 'biryani', 'curry', 'rice',
+    'paratha', 'sabzi', 'kofta', 'chaat', 'halwa', 'pulao', 'bhaji', 'korma', 'raita', 'vada'
+]
+TYPED = ['paneer tikka', 'dal makhani', 'aloo gobi', 'kofta curry']
+
+
+def make_entries(n_names: int, seed: int = 0) -> list:
+    """Synthetic (key, completion, score) entries with word-suffix keys"""
+    rng = np.random.default_rng(seed)
+    entries = []
+    for i, words in enumerate(rng.choice(WORDS, size=(n_names, 3))):
+        name = f"{' '.join(words).title()} {i}"
+        score = float(rng.uniform(0, 10))
+        parts = name.split()
+        entries.extend((' '.join(parts[j:]), name, score) for j in range(len(parts)))
+    return entries
+
+
+def main():
+    print(f"{'names':>8} {'keys':>8} {'build (ms)':>11} {'mean (us)':>10} {'max (us)':>9}")
+    for n_names in SIZES:
+        entries = make_entries(n_names)
+
+        start = time.perf_counter()
+        index = PrefixIndex(entries)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        latencies = []
+        for text in TYPED:
+            for end in range(1, len(text) + 1):
+                start = time.perf_counter()
+                index.complete(text[:end], k=8)
+                latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1e6
+        print(f"{n_names:>8} {len(index):>8} {build_ms:>11.1f} {latencies.mean():>10.1f} {latencies.max():>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Harness: latency, memory and accuracy of each registered backbone.
+
+Every backbone runs in its own process so peak RSS is its own. Images
+come from a labelled folder: either one subdirectory per dish
+(<folder>/<dish>/*.jpg) or images named after their dish
+(<folder>/<dish>.jpg); by default the dish photos bundled with the app.
+Reports median per-image latency at batch size 1, peak RSS, accuracy
+against the folder labels and agreement with the first backbone listed.
+
+Run from the app directory:
+    python -m benchmarks.backbones [--folder PATH] [--backbones a,b] [--mode eager]
+"""
+import argparse
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from PIL import Image
+from backbones import BACKBONES
+from benchmarks.recognizer_setup import APP_DIR
+
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png')
+REPEATS = 3
+
+
+def labelled_images(folder) -> list:
+    """(path, dish label) pairs from a labelled folder"""
+    folder = Path(folder)
+    pairs = []
+    for path in sorted(folder.rglob('*')):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        label = path.stem if path.parent == folder else path.parent.name
+        pairs.append((path, label))
+    return pairs
+
+
+def measure(backbone: str, paths: list, mode: str) -> dict:
+    """Run in a child process: latency, peak RSS and predictions for one backbone"""
+    from benchmarks.recognizer_setup import benchmark_recognizer
+
+    start = time.perf_counter()
+    recognizer = benchmark_recognizer(backbone=backbone, inference_mode=mode)
+    load_s = time.perf_counter() - start
+
+    images = [Image.open(path).convert('RGB') for path in paths]
+    tensors = [recognizer.transform(image) for image in images]
+    recognizer._forward(tensors[:1])  # warm-up
+    latencies = []
+    for tensor in tensors:
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            recognizer._forward([tensor])
+            timings.append(time.perf_counter() - start)
+        latencies.append(min(timings))
+
+    predictions = recognizer.recognize_batch(images, batch_size=1)
+    return {
+        'load_s': load_s,
+        'latency_ms': statistics.median(latencies) * 1e3,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'predictions': predictions,
+        'embedding_dim': recognizer.backbone_spec.embedding_dim
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--folder', default=str(APP_DIR), help="labelled image folder")
+    parser.add_argument('--backbones', default=','.join(BACKBONES), help="comma-separated backbone names")
+    parser.add_argument('--mode', default='eager', help="inference mode for every backbone")
+    args = parser.parse_args(argv)
+
+    pairs = labelled_images(args.folder)
+    if not pairs:
+        sys.exit(f"No images found in {args.folder}")
+    paths = [path for path, _ in pairs]
+    labels = [label.lower() for _, label in pairs]
+
+    print(f"{len(pairs)} images from {args.folder}")
+    print(f"{'backbone':>20} {'dim':>5} {'load (s)':>9} {'ms/image':>9} {'peak RSS MB':>12} {'accuracy':>9} {'agreement':>10}")
+    reference = None
+    context = multiprocessing.get_context('spawn')
+    for backbone in args.backbones.split(','):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(measure, backbone, paths, args.mode).result()
+        predictions = [(prediction or '').lower() for prediction in result['predictions']]
+        if reference is None:
+            reference = predictions
+        accuracy = sum(p == l for p, l in zip(predictions, labels)) / len(labels)
+        agreement = sum(p == r for p, r in zip(predictions, reference)) / len(labels)
+        print(f"{backbone:>20} {result['embedding_dim']:>5} {result['load_s']:>9.1f} {result['latency_ms']:>9.1f} "
+              f"{result['peak_rss_mb']:>12.0f} {accuracy:>9.0%} {agreement:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
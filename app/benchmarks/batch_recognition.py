@@ -0,0 +1,40 @@
+"""
+Benchmark: recognize_batch throughput vs batch size on CPU.
+
+Recognizes 64 distinct images (crops of the bundled dish photos) with
+batch sizes 1 to 64, clearing the feature cache before each run, and
+checks every run returns the same labels as recognize_food().
+
+Run from the app directory:
+    python -m benchmarks.batch_recognition
+"""
+import time
+from benchmarks.recognizer_setup import benchmark_recognizer, sample_images
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64]
+N_IMAGES = 64
+
+
+def main():
+    # Without the near-duplicate cache, which would answer overlapping crops
+    recognizer = benchmark_recognizer(result_cache_size=0)
+    images = sample_images(N_IMAGES)
+
+    recognizer.feature_cache.clear()
+    start = time.perf_counter()
+    expected = [recognizer.recognize_food(image) for image in images]
+    single_s = time.perf_counter() - start
+
+    print(f"{'batch':>6} {'seconds':>8} {'images/s':>9}")
+    print(f"{'single':>6} {single_s:>8.2f} {N_IMAGES / single_s:>9.1f}")
+    for batch_size in BATCH_SIZES:
+        recognizer.feature_cache.clear()
+        start = time.perf_counter()
+        results = recognizer.recognize_batch(images, batch_size=batch_size)
+        seconds = time.perf_counter() - start
+        assert results == expected, f"Batch size {batch_size} changed a prediction"
+        print(f"{batch_size:>6} {seconds:>8.2f} {N_IMAGES / seconds:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: throughput and p50/p99 latency of a shared recognizer under 1
+to 32 concurrent callers, with and without a ThreadBudget, and with a
+ThreadBudget behind the micro-batcher as main.py sets it up.
+
+Each caller thread recognizes distinct images (caches disabled) through
+one shared FoodRecognizer, as Streamlit sessions do. The unbudgeted run
+uses torch's default threads (one per core) on every caller thread; the
+budgeted one runs forward passes on a dedicated pool sized to the cores.
+The batched one runs up to max_concurrent micro-batches at once on that
+pool, so it should use every core too.
+
+Run from the app directory:
+    python -m benchmarks.concurrency
+"""
+import threading
+import time
+import numpy as np
+import torch
+from benchmarks.recognizer_setup import benchmark_recognizer, sample_images
+from thread_budget import ThreadBudget, available_cores
+
+CALLERS = [1, 2, 4, 8, 16, 32]
+REQUESTS = 32
+
+
+def run_callers(recognizer, images, callers: int) -> tuple:
+    """Split the images over caller threads; returns (seconds, latencies)"""
+    latencies = []
+    lock = threading.Lock()
+
+    def caller(share):
+        for image in share:
+            start = time.perf_counter()
+            recognizer.recognize_food(image)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=caller, args=(images[i::callers],)) for i in range(callers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    images = sample_images(REQUESTS)
+    default_threads = torch.get_num_threads()
+    print(f"{available_cores()} cores, torch default {default_threads} intra-op threads")
+
+    configs = [('default', None, False), ('budget', ThreadBudget(), False), ('batched', ThreadBudget(), True)]
+    print(f"{'config':>8} {'callers':>8} {'images/s':>9} {'p50 ms':>7} {'p99 ms':>7}")
+    for name, budget, micro_batching in configs:
+        if budget is None:
+            torch.set_num_threads(default_threads)
+        recognizer = benchmark_recognizer(
+            feature_cache_size=0, result_cache_size=0, thread_budget=budget, micro_batching=micro_batching
+        )
+        recognizer.recognize_food(images[0])
+        for callers in CALLERS:
+            seconds, latencies = run_callers(recognizer, images, callers)
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            print(f"{name:>8} {callers:>8} {REQUESTS / seconds:>9.1f} {p50:>7.0f} {p99:>7.0f}")
+        if budget is not None:
+            print(f"{'':>8} {budget.stats()}")
+        if recognizer.scheduler is not None:
+            print(f"{'':>8} mean batch size {recognizer.scheduler_stats()['mean_batch_size']:.1f}")
+            recognizer.scheduler.close()
+        if budget is not None:
+            budget.close()
+
+
+if __name__ == "__main__":
+    main()
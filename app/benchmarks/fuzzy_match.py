@@ -0,0 +1,62 @@
+"""
+Benchmark: fuzzy name matching, SequenceMatcher scan vs FuzzyMatcher.
+
+Lexicons are synthetic food phrases from 300 to 100k names. Every query
+is also checked for the same best match at the 0.6 threshold.
+
+Run from the app directory:
+    python -m benchmarks.fuzzy_match
+"""
+import random
+import time
+from difflib import SequenceMatcher
+from fuzzy_match import FuzzyMatcher
+
+SIZES = [300, 1_000, 10_000, 100_000]
+WORDS = [
+    'rice', 'dal', 'dosa', 'idli', 'curry', 'bread', 'paneer', 'masala', 'fried', 'cake',
+    'soup', 'spicy', 'indian', 'stew', 'lentil', 'chicken', 'fish', 'snack', 'sweet', 'flat'
+]
+# Typical ImageNet labels the recognizer has to map to dishes
+QUERIES = ['pizza', 'burrito', 'hot pot', 'french loaf', 'potpie', 'consomme', 'bagel', 'meat loaf']
+
+
+def make_lexicon(size: int, seed: int = 0) -> list:
+    """Synthetic lexicon of one to three word food phrases"""
+    rng = random.Random(seed)
+    return [' '.join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(size)]
+
+
+def scan_best_match(names, query, threshold=0.6):
+    """The previous FoodRecognizer._find_best_match loop"""
+    best_match, best_score = None, 0.0
+    for name in names:
+        score = SequenceMatcher(None, query, name).ratio()
+        if score > best_score and score > threshold:
+            best_score, best_match = score, name
+    return best_match
+
+
+def main():
+    print(f"{'names':>8} {'build (ms)':>11} {'scan (ms)':>10} {'matcher (ms)':>13} {'speedup':>8}")
+    for size in SIZES:
+        names = make_lexicon(size)
+
+        start = time.perf_counter()
+        matcher = FuzzyMatcher(names)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        expected = [scan_best_match(names, query) for query in QUERIES]
+        scan_ms = (time.perf_counter() - start) / len(QUERIES) * 1e3
+
+        start = time.perf_counter()
+        actual = [matcher.best_match(query) for query in QUERIES]
+        matcher_ms = (time.perf_counter() - start) / len(QUERIES) * 1e3
+
+        assert actual == expected, "FuzzyMatcher disagrees with the SequenceMatcher scan"
+        print(f"{size:>8} {build_ms:>11.1f} {scan_ms:>10.2f} {matcher_ms:>13.3f} {scan_ms / matcher_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
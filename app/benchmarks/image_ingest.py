@@ -0,0 +1,88 @@
+"""
+Benchmark: decode time and peak memory, full decode vs ingest_image().
+
+Phone-sized JPEGs (12, 24 and 48 MP, with an EXIF rotation) are made by
+upscaling a bundled dish photo. Each measurement runs in a fresh process
+(Linux, for the peak RSS counter) and covers loading plus the recognizer transform:
+
+    before  Image.open(...).convert('RGB') -> transform
+    after   ingest_image(...) -> transform
+
+Run from the app directory:
+    python -m benchmarks.image_ingest
+"""
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from benchmarks.recognizer_setup import APP_DIR
+
+MEGAPIXELS = [12, 24, 48]
+REPEATS = 3
+
+
+def make_photo(megapixels: int, directory: str) -> str:
+    """A 4:3 JPEG of the given size, stored sideways with EXIF orientation 6"""
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    photo = Image.open(APP_DIR / 'dosa.jpg').convert('RGB').resize((width, height), Image.BILINEAR)
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    path = os.path.join(directory, f"photo_{megapixels}mp.jpg")
+    photo.save(path, quality=90, exif=exif)
+    return path
+
+
+def _status_mb(field: str) -> float:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def reset_peak_rss():
+    """Make VmHWM (peak RSS) start again from the current RSS (Linux)"""
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def measure(path: str, method: str) -> tuple:
+    """Run in a fresh process: (best ms, peak RSS growth in MB)"""
+    from backbones import get_backbone
+    from image_ingest import ingest_image
+
+    transform = get_backbone().transform()
+    reset_peak_rss()
+    baseline = _status_mb('VmRSS')
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        if method == 'before':
+            image = Image.open(path).convert('RGB')
+        else:
+            image = ingest_image(path)
+        transform(image)
+        best = min(best, time.perf_counter() - start)
+        del image
+    return best * 1e3, _status_mb('VmHWM') - baseline
+
+
+def main():
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'MP':>4} {'before ms':>10} {'after ms':>9} {'before +MB':>11} {'after +MB':>10}")
+        for megapixels in MEGAPIXELS:
+            path = make_photo(megapixels, directory)
+            results = {}
+            for method in ('before', 'after'):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    results[method] = pool.submit(measure, path, method).result()
+            (before_ms, before_mb), (after_ms, after_mb) = results['before'], results['after']
+            print(f"{megapixels:>4} {before_ms:>10.0f} {after_ms:>9.0f} {before_mb:>11.0f} {after_mb:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
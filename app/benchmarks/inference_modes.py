@@ -0,0 +1,87 @@
+"""
+Benchmark: CPU inference modes on the bundled dish photos.
+
+For each mode reports setup time (loading plus optimization), median
+per-image latency at batch size 1, serialized model size, resident
+memory added by the model, and top-1 agreement with the eager float32
+model (same ImageNet class, and same recognized dish).
+
+Run from the app directory:
+    python -m benchmarks.inference_modes
+"""
+import gc
+import io
+import statistics
+import time
+import torch
+from inference_modes import INFERENCE_MODES
+from benchmarks.recognizer_setup import benchmark_recognizer, bundled_images
+
+REPEATS = 3
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def model_mb(*modules) -> float:
+    """Serialized size of the modules' weights"""
+    size = 0
+    for module in modules:
+        buffer = io.BytesIO()
+        if isinstance(module, torch.jit.ScriptModule):
+            torch.jit.save(module, buffer)
+        else:
+            torch.save(module.state_dict(), buffer)
+        size += buffer.tell()
+    return size / 2**20
+
+
+def main():
+    images = bundled_images()
+    baseline_classes, baseline_foods = None, None
+
+    print(f"{'mode':>14} {'setup (s)':>10} {'ms/image':>9} {'model MB':>9} {'RSS +MB':>8} {'top-1 agree':>12} {'dish agree':>11}")
+    for mode in INFERENCE_MODES:
+        gc.collect()
+        before = rss_mb()
+        start = time.perf_counter()
+        recognizer = benchmark_recognizer(inference_mode=mode)
+        setup_s = time.perf_counter() - start
+
+        tensors = [recognizer.transform(image) for image in images]
+        recognizer._forward(tensors[:1])  # warm-up
+        latencies = []
+        classes = []
+        for tensor in tensors:
+            timings = []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                _, logits = recognizer._forward([tensor])[0]
+                timings.append(time.perf_counter() - start)
+            latencies.append(min(timings))
+            classes.append(int(logits.argmax()))
+        foods = recognizer.recognize_batch(images)
+        added = rss_mb() - before
+
+        if baseline_classes is None:
+            baseline_classes, baseline_foods = classes, foods
+        class_agree = sum(a == b for a, b in zip(classes, baseline_classes)) / len(classes)
+        food_agree = sum(a == b for a, b in zip(foods, baseline_foods)) / len(foods)
+        print(f"{mode:>14} {setup_s:>10.1f} {statistics.median(latencies) * 1e3:>9.1f} "
+              f"{model_mb(recognizer.backbone, recognizer.classifier):>9.1f} {added:>8.0f} "
+              f"{class_agree:>12.0%} {food_agree:>11.0%}")
+        del recognizer
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Microbenchmark: single-name nutrition lookup latency vs catalog size.
+
+Compares the old DataFrame scan used by get_nutrition_info() with a
+NutritionTable hash probe on synthetic catalogs.
+
+Run from the app directory:
+    python -m benchmarks.nutrition_lookup
+"""
+import time
+import numpy as np
+import pandas as pd
+from nutrition_utils import NutritionTable
+
+SIZES = [100, 1_000, 10_000, 100_000]
+N_QUERIES = 200
+
+
+def make_catalog(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a synthetic cleaned catalog with n_rows unique dish names"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Food': [f"Dish {i:06d}" for i in range(n_rows)],
+        'Calories': rng.uniform(20, 800, n_rows).round(1),
+        'Protein': rng.uniform(0, 40, n_rows).round(1),
+        'Fat': rng.uniform(0, 40, n_rows).round(1),
+        'Carbs': rng.uniform(0, 100, n_rows).round(1)
+    })
+
+
+def scan_lookup(df: pd.DataFrame, food_name: str) -> dict:
+    """The previous get_nutrition_info() lookup"""
+    food_data = df[df['Food'].str.lower() == food_name.lower()]
+    if not food_data.empty:
+        return {
+            'name': food_data['Food'].iloc[0],
+            'calories': float(food_data['Calories'].iloc[0]),
+            'protein': float(food_data['Protein'].iloc[0]),
+            'fat': float(food_data['Fat'].iloc[0]),
+            'carbs': float(food_data['Carbs'].iloc[0])
+        }
+    return None
+
+
+def time_per_call(fn, queries) -> float:
+    """Return the mean latency of fn over queries in microseconds"""
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    print(f"{'rows':>8} {'scan (us)':>12} {'table (us)':>12} {'speedup':>9} {'build (ms)':>11}")
+    rng = np.random.default_rng(1)
+    for n_rows in SIZES:
+        df = make_catalog(n_rows)
+        queries = [f"dish {i:06d}" for i in rng.integers(0, n_rows, N_QUERIES)]
+        
+        start = time.perf_counter()
+        table = NutritionTable.from_frame(df)
+        build_ms = (time.perf_counter() - start) * 1e3
+        
+        # The scan is slow on big catalogs; a few queries are enough there
+        scan_us = time_per_call(lambda q: scan_lookup(df, q), queries[:max(5, 20_000 // n_rows)])
+        table_us = time_per_call(table.lookup, queries)
+        print(f"{n_rows:>8} {scan_us:>12.1f} {table_us:>12.2f} {scan_us / table_us:>8.0f}x {build_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
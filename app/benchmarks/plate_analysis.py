@@ -0,0 +1,44 @@
+"""
+Benchmark: plate analysis tile count and latency vs the latency budget.
+
+Builds a thali-like collage of the bundled dish photos and analyzes it
+under budgets from 100 ms to 4 s, reporting the tiles run and the time
+taken per request. Each budget is run a few times after a warm-up
+request, so the per-tile cost estimate has settled.
+
+Run from the app directory:
+    python -m benchmarks.plate_analysis
+"""
+from PIL import Image
+from benchmarks.recognizer_setup import benchmark_recognizer, bundled_images
+
+BUDGETS_MS = [100, 250, 500, 1000, 2000, 4000]
+RUNS = 3
+
+
+def plate_collage(columns: int = 4, tile: int = 320) -> Image.Image:
+    """The bundled photos pasted side by side in a grid"""
+    photos = bundled_images()
+    rows = (len(photos) + columns - 1) // columns
+    plate = Image.new('RGB', (columns * tile, rows * tile), 'white')
+    for i, photo in enumerate(photos):
+        plate.paste(photo.resize((tile, tile)), ((i % columns) * tile, (i // columns) * tile))
+    return plate
+
+
+def main():
+    recognizer = benchmark_recognizer()
+    plate = plate_collage()
+    recognizer.analyze_plate(plate, min_confidence=0.0)
+
+    print(f"{'budget ms':>9} {'tiles':>6} {'elapsed ms':>11} {'max ms':>7}")
+    for budget_ms in BUDGETS_MS:
+        reports = [recognizer.analyze_plate(plate, budget_ms=budget_ms, min_confidence=0.0) for _ in range(RUNS)]
+        tiles = sum(report['tiles_used'] for report in reports) / RUNS
+        elapsed = [report['elapsed_ms'] for report in reports]
+        print(f"{budget_ms:>9} {tiles:>6.1f} {sum(elapsed) / RUNS:>11.0f} {max(elapsed):>7.0f}")
+    print(f"{'':>9} of {reports[0]['tiles_planned']} tiles planned")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Shared setup for recognizer benchmarks.
+
+Uses the weights in the model artifact directory when present. Otherwise a
+randomly initialized backbone is saved to a temporary directory: the
+labels are then meaningless, but timings are the same.
+"""
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+import torch
+from PIL import Image
+from backbones import DEFAULT_BACKBONE, get_backbone
+from model_artifacts import MODEL_DIR
+
+APP_DIR = Path(__file__).resolve().parent.parent
+IMAGE_PATTERNS = ('*.jpg', '*.jpeg')
+
+
+@lru_cache(maxsize=None)
+def benchmark_model_dir(backbone: str = DEFAULT_BACKBONE) -> str:
+    """Artifact directory with real weights, or a temporary one with random weights (the same for every call)"""
+    spec = get_backbone(backbone)
+    if os.path.exists(os.path.join(MODEL_DIR, spec.weights_file)):
+        return MODEL_DIR
+    model_dir = tempfile.mkdtemp(prefix='eatelligence-bench-')
+    torch.manual_seed(0)
+    torch.save(spec.build().state_dict(), os.path.join(model_dir, spec.weights_file))
+    print(f"No {spec.name} weights in {MODEL_DIR}; timing a randomly initialized model")
+    return model_dir
+
+
+def benchmark_recognizer(backbone: str = DEFAULT_BACKBONE, **kwargs):
+    """A FoodRecognizer with its model loaded and an empty preset gallery"""
+    from food_recognition import FoodRecognizer
+    recognizer = FoodRecognizer(model_dir=benchmark_model_dir(backbone), backbone=backbone, **kwargs)
+    recognizer.preset_dir = Path(tempfile.mkdtemp(prefix='eatelligence-presets-'))
+    recognizer._ensure_model()
+    return recognizer
+
+
+def bundled_images() -> list:
+    """The dish photos shipped in the app directory, as RGB images"""
+    paths = sorted(path for pattern in IMAGE_PATTERNS for path in APP_DIR.glob(pattern))
+    return [Image.open(path).convert('RGB') for path in paths]
+
+
+def sample_images(n: int, seed: int = 0) -> list:
+    """n distinct images: random crops of the bundled photos"""
+    rng = np.random.default_rng(seed)
+    photos = bundled_images()
+    images = []
+    for i in range(n):
+        photo = photos[i % len(photos)]
+        width, height = photo.size
+        left, top = rng.integers(0, width // 4), rng.integers(0, height // 4)
+        images.append(photo.crop((left, top, left + 3 * width // 4, top + 3 * height // 4)))
+    return images
@@ -0,0 +1,56 @@
+"""
+Benchmark: cost of the per-stage latency spans.
+
+Times a bare span with the histograms off, on, and inside a trace, then
+recognize_food() end to end (caches disabled) with stage timing off and
+on, and prints the stage percentiles gathered in the second run.
+
+Run from the app directory:
+    python -m benchmarks.stage_timing
+"""
+import time
+from benchmarks.recognizer_setup import benchmark_recognizer, sample_images
+from stage_timing import StageTimer
+
+N_SPANS = 200_000
+N_IMAGES = 16
+
+
+def span_ns(timer: StageTimer) -> float:
+    start = time.perf_counter()
+    for _ in range(N_SPANS):
+        with timer.span('stage'):
+            pass
+    return (time.perf_counter() - start) / N_SPANS * 1e9
+
+
+def main():
+    start = time.perf_counter()
+    for _ in range(N_SPANS):
+        pass
+    loop_ns = (time.perf_counter() - start) / N_SPANS * 1e9
+
+    print(f"{'span':>10} {'ns':>6}")
+    print(f"{'off':>10} {span_ns(StageTimer(enabled=False)) - loop_ns:>6.0f}")
+    print(f"{'on':>10} {span_ns(StageTimer(enabled=True)) - loop_ns:>6.0f}")
+    timer = StageTimer(enabled=False)
+    with timer.trace():
+        print(f"{'traced':>10} {span_ns(timer) - loop_ns:>6.0f}")
+
+    images = sample_images(N_IMAGES)
+    for enabled in (False, True):
+        recognizer = benchmark_recognizer(feature_cache_size=0, result_cache_size=0, stage_timing=enabled)
+        recognizer.recognize_food(images[0])
+        start = time.perf_counter()
+        for image in images:
+            recognizer.recognize_food(image)
+        ms = (time.perf_counter() - start) / N_IMAGES * 1000
+        print(f"recognize_food with stage timing {'on' if enabled else 'off'}: {ms:.1f} ms/image")
+
+    print(f"{'stage':>15} {'count':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    for stage, stats in recognizer.latency_stats().items():
+        print(f"{stage:>15} {stats['count']:>6} {stats['p50_ms']:>8.3f} {stats['p99_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: substring food search, str.contains scan vs trigram index.
+
+Run from the app directory:
+    python -m benchmarks.substring_search
+"""
+import time
+import numpy as np
+import pandas as pd
+from search_index import NgramIndex
+
+SIZES = [1_000, 10_000, 100_000]
+WORDS = [
+    'masala', 'dosa', 'paneer', 'dal', 'aloo', 'gobi', 'tikka', 'biryani', 'curry', 'rice',
+    'paratha', 'sabzi', 'kofta', 'chaat', 'halwa', 'pulao', 'bhaji', 'korma', 'raita', 'vada'
+]
+QUERIES = ['dosa', 'paneer tikka', 'kofta curry', 'halwa', 'zzz', 'masala']
+
+
+def make_names(n_rows: int, seed: int = 0) -> pd.Series:
+    """Synthetic dish names built from common words"""
+    rng = np.random.default_rng(seed)
+    words = rng.choice(WORDS, size=(n_rows, 3))
+    return pd.Series([f"{' '.join(row).title()} {i}" for i, row in enumerate(words)], dtype=object)
+
+
+def time_per_call(fn, queries, repeat: int) -> float:
+    """Return the mean latency of fn over queries in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - start) / (repeat * len(queries)) * 1e3
+
+
+def main():
+    print(f"{'rows':>8} {'build (ms)':>11} {'scan (ms)':>10} {'index (ms)':>11} {'speedup':>8}")
+    for n_rows in SIZES:
+        names = make_names(n_rows)
+
+        start = time.perf_counter()
+        index = NgramIndex(names)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        scan_ms = time_per_call(lambda q: names.str.contains(q, case=False, na=False), QUERIES, 3)
+        index_ms = time_per_call(index.contains, QUERIES, 10)
+        print(f"{n_rows:>8} {build_ms:>11.1f} {scan_ms:>10.2f} {index_ms:>11.3f} {scan_ms / index_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Benchmark: recognition throughput with inference in-process vs in 1 to
+`cores` worker processes.
+
+Concurrent caller threads (one per worker, at least 4) recognize distinct
+images (caches disabled) through one shared FoodRecognizer, as Streamlit
+sessions do.
+
+Run from the app directory:
+    python -m benchmarks.worker_pool
+"""
+import time
+from benchmarks.concurrency import run_callers
+from benchmarks.recognizer_setup import benchmark_recognizer, sample_images
+from thread_budget import available_cores
+
+REQUESTS = 32
+
+
+def main():
+    images = sample_images(REQUESTS)
+    cores = available_cores()
+    print(f"{cores} cores")
+    print(f"{'workers':>8} {'startup s':>10} {'images/s':>9}")
+    for workers in [0] + sorted({1, max(1, cores // 2), cores}):
+        start = time.perf_counter()
+        recognizer = benchmark_recognizer(feature_cache_size=0, result_cache_size=0, workers=workers)
+        startup = time.perf_counter() - start
+        recognizer.recognize_food(images[0])
+        seconds, _ = run_callers(recognizer, images, max(4, workers))
+        print(f"{workers or 'in-proc':>8} {startup:>10.1f} {REQUESTS / seconds:>9.1f}")
+        if recognizer.worker_pool is not None:
+            recognizer.worker_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Binary, memory-mappable snapshots of the nutrition catalogs.
+
+A snapshot holds one cleaned catalog in columnar form:
+
+    snapshots/<csv stem>/
+        manifest.json      format version, source file signature, column dtypes
+        Calories.npy ...   one .npy file per numeric column
+        names.bin          UTF-8 food names, back to back
+        name_offsets.npy   int64 offsets into names.bin (rows + 1 entries)
+
+Numeric columns are opened with np.load(mmap_mode='r'), so processes on the
+same host share the pages through the OS page cache and a cold start costs
+a few small reads instead of a pandas CSV parse.
+
+Build the snapshots from the app directory with:
+    python -m catalog_snapshot
+"""
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+NUMERIC_COLUMNS = ['Calories', 'Protein', 'Fat', 'Carbs']
+
+
+def snapshot_path(source_path: str, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """Return the directory holding the snapshot for a catalog CSV"""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(snapshot_dir, stem)
+
+
+def write_snapshot(df: pd.DataFrame, source_path: str, source_digest: str,
+                   snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """
+    Write a cleaned catalog as a binary snapshot.
+
+    Args:
+        df (pd.DataFrame): Cleaned catalog with Food, Calories, Protein, Fat and Carbs
+        source_path (str): CSV file the catalog was loaded from
+        source_digest (str): SHA-1 of the CSV contents, used to detect stale snapshots
+        snapshot_dir (str): Root directory for snapshots
+
+    Returns:
+        str: Directory the snapshot was written to
+    """
+    target = snapshot_path(source_path, snapshot_dir)
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    # Write into a temporary directory and swap it in, so readers never see
+    # a half-written snapshot
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=snapshot_dir)
+    try:
+        for col in NUMERIC_COLUMNS:
+            np.save(os.path.join(tmp_dir, f'{col}.npy'), np.ascontiguousarray(df[col].to_numpy()))
+
+        encoded = [name.encode('utf-8') for name in df['Food']]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(name) for name in encoded])
+        np.save(os.path.join(tmp_dir, 'name_offsets.npy'), offsets)
+        with open(os.path.join(tmp_dir, 'names.bin'), 'wb') as f:
+            f.write(b''.join(encoded))
+
+        stat = os.stat(source_path)
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'source': os.path.basename(source_path),
+            'source_sha1': source_digest,
+            'source_size': stat.st_size,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'rows': len(df),
+            'columns': {col: str(df[col].dtype) for col in NUMERIC_COLUMNS}
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(tmp_dir, target)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return target
+
+
+def read_snapshot(source_path: str, source_digest: str,
+                  snapshot_dir: str = SNAPSHOT_DIR) -> pd.DataFrame:
+    """
+    Load the snapshot for a catalog CSV if it is present and current.
+
+    Args:
+        source_path (str): CSV file the snapshot was built from
+        source_digest (str): SHA-1 of the current CSV contents
+        snapshot_dir (str): Root directory for snapshots
+
+    Returns:
+        pd.DataFrame: The catalog, with memory-mapped numeric columns, or None
+        if there is no snapshot, it was built by another format version, or
+        the CSV has changed since it was built
+    """
+    target = snapshot_path(source_path, snapshot_dir)
+    manifest_path = os.path.join(target, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SNAPSHOT_VERSION or manifest.get('source_sha1') != source_digest:
+        return None
+
+    columns = {}
+    with open(os.path.join(target, 'names.bin'), 'rb') as f:
+        names = f.read()
+    offsets = np.load(os.path.join(target, 'name_offsets.npy'))
+    columns['Food'] = [
+        names[start:end].decode('utf-8') for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+    for col in NUMERIC_COLUMNS:
+        # A plain ndarray view of the mapping, so pandas treats it like any other column
+        columns[col] = np.asarray(np.load(os.path.join(target, f'{col}.npy'), mmap_mode='r'))
+
+    if any(len(values) != manifest['rows'] for values in columns.values()):
+        return None
+
+    return pd.DataFrame(columns, copy=False)
+
+
+def main():
+    """Build snapshots for every bundled catalog CSV"""
+    from nutrition_utils import build_catalog_snapshots
+
+    for target in build_catalog_snapshots():
+        print(f"Wrote {target}")
+
+
+if __name__ == "__main__":
+    main()
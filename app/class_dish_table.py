@@ -0,0 +1,159 @@
+"""
+Precompiled ImageNet class -> dish lookup table.
+
+The recognizer maps a predicted ImageNet label to a dish by fuzzy matching
+it against the synonym lexicon. There are only 1000 labels, so the answer
+depends on nothing but the class index: the table stores it for every
+class and a prediction becomes an array index.
+
+The table is saved as a versioned artifact next to the model
+(class_dishes.json). It records digests of the labels and of the lexicon
+it was built from, and is rebuilt when either changes. Build it with:
+    python -m class_dish_table
+"""
+import hashlib
+import json
+import os
+import numpy as np
+
+TABLE_VERSION = 1
+TABLE_FILE = 'class_dishes.json'
+
+
+def labels_digest(labels) -> str:
+    """Fingerprint of the class labels, in order"""
+    return hashlib.sha1(json.dumps(list(labels)).encode()).hexdigest()
+
+
+def lexicon_digest(food_mapping: dict, threshold: float) -> str:
+    """Fingerprint of the synonym lexicon and match threshold"""
+    return hashlib.sha1(json.dumps([food_mapping, threshold], sort_keys=True).encode()).hexdigest()
+
+
+class ClassDishTable:
+    """
+    Dish (or None for no match) per class index.
+
+    Args:
+        dishes (list): Dish name or None for every class
+        labels_digest (str): labels_digest() of the labels the table was built for
+        lexicon_digest (str): lexicon_digest() of the lexicon it was built with
+    """
+
+    def __init__(self, dishes: list, labels_digest: str = None, lexicon_digest: str = None):
+        self.dishes = list(dishes)
+        self.labels_digest = labels_digest
+        self.lexicon_digest = lexicon_digest
+
+        # Dense ids so per-dish probabilities can be summed with np.bincount
+        self.dish_names = sorted({dish for dish in self.dishes if dish is not None})
+        ids = {dish: i for i, dish in enumerate(self.dish_names)}
+        self.dish_ids = np.array([ids.get(dish, -1) for dish in self.dishes], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.dishes)
+
+    def dish(self, class_index: int) -> str:
+        """The dish for a class, or None if its label matches no dish"""
+        return self.dishes[class_index]
+
+    @classmethod
+    def build(cls, labels, match, labels_digest: str = None, lexicon_digest: str = None):
+        """
+        Build the table by matching every label once.
+
+        Args:
+            labels (list): Class labels, by class index
+            match: Callable mapping a label to a dish name or None
+        """
+        return cls([match(label) for label in labels], labels_digest, lexicon_digest)
+
+    def aggregate(self, probabilities, k: int = 5) -> list:
+        """
+        Rank dishes by the summed probability of their classes among the top k.
+
+        Args:
+            probabilities: Class probabilities (e.g. softmax of the logits)
+            k (int): Number of top classes to aggregate (default: 5)
+
+        Returns:
+            list: (dish, probability) pairs, most likely first; classes
+            without a dish are left out
+        """
+        probabilities = np.asarray(probabilities, dtype=np.float64).ravel()
+        k = min(k, len(probabilities))
+        top = np.argpartition(-probabilities, k - 1)[:k]
+        top = top[self.dish_ids[top] >= 0]
+        if len(top) == 0:
+            return []
+        sums = np.bincount(self.dish_ids[top], weights=probabilities[top], minlength=len(self.dish_names))
+        found = np.flatnonzero(sums)
+        order = found[np.argsort(-sums[found], kind='stable')]
+        return [(self.dish_names[i], float(sums[i])) for i in order]
+
+    def save(self, path: str):
+        """Write the table as JSON, replacing any previous file atomically"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({
+                'version': TABLE_VERSION,
+                'labels_digest': self.labels_digest,
+                'lexicon_digest': self.lexicon_digest,
+                'dishes': self.dishes
+            }, f)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Read a saved table.
+
+        Returns:
+            ClassDishTable: The table, or None if missing, unreadable or another version
+        """
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != TABLE_VERSION:
+            return None
+        return cls(data['dishes'], data.get('labels_digest'), data.get('lexicon_digest'))
+
+
+def load_or_build(labels, match, lexicon: str, model_dir: str) -> ClassDishTable:
+    """
+    Load the table for these labels and lexicon, rebuilding and saving it if stale.
+
+    Args:
+        labels (list): Class labels, by class index
+        match: Callable mapping a label to a dish name or None
+        lexicon (str): lexicon_digest() of the matcher's lexicon
+        model_dir (str): Artifact directory holding class_dishes.json
+    """
+    path = os.path.join(model_dir, TABLE_FILE)
+    digest = labels_digest(labels)
+    table = ClassDishTable.load(path)
+    if table is not None and table.labels_digest == digest and table.lexicon_digest == lexicon:
+        return table
+
+    table = ClassDishTable.build(labels, match, digest, lexicon)
+    try:
+        table.save(path)
+    except OSError:
+        # A read-only artifact directory only costs rebuilding at startup
+        pass
+    return table
+
+
+def main():
+    from food_recognition import FoodRecognizer
+
+    recognizer = FoodRecognizer()
+    table = recognizer.build_class_table()
+    matched = sum(dish is not None for dish in table.dishes)
+    print(f"{matched} of {len(table)} classes map to a dish; saved to {os.path.join(recognizer.model_dir, TABLE_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
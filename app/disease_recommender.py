@@ -1,13 +1,13 @@
 import pandas as pd
 import numpy as np
-from nutrition_utils import load_nutrition_data
+from nutrition_utils import get_nutrition_catalog
 from typing import Dict, List, Tuple
 import streamlit as st
 
 class DiseaseRecommender:
     def __init__(self):
         try:
-            self.df = load_nutrition_data()
+            self.df = get_nutrition_catalog()
             self._prepare_recommendations()
         except Exception as e:
             st.error(f"Error initializing disease recommender: {str(e)}")
@@ -1,12 +1,13 @@
 import pandas as pd
 import numpy as np
-from nutrition_utils import load_nutrition_data
+from nutrition_utils import get_nutrition_catalog
+from search_index import search_foods
 import random
 from typing import List, Dict, Tuple
 
 class FoodBlender:
     def __init__(self):
-        self.df = load_nutrition_data()
+        self.df = get_nutrition_catalog()
         self._categorize_foods()
     
     def _categorize_foods(self):
@@ -86,7 +87,7 @@ class FoodBlender:
         
         for ingredient in ingredients:
             # Try to find the ingredient in the dataset
-            food_data = self.df[self.df['Food'].str.contains(ingredient, case=False, na=False)]
+            food_data = search_foods(ingredient)
             if not food_data.empty:
                 total_calories += food_data['Calories'].iloc[0]
                 total_protein += food_data['Protein'].iloc[0]
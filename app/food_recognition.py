@@ -1,145 +1,147 @@
 import torch
-import torchvision.transforms as transforms
 from PIL import Image
 import numpy as np
-from nutrition_utils import load_nutrition_data
+from nutrition_utils import NutritionRecord, get_nutrition_catalog, get_nutrition_info_many, get_nutrition_table
 import streamlit as st
 import warnings
 import re
 from difflib import SequenceMatcher
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
+from fuzzy_match import FuzzyMatcher
+from food_synonyms import FOOD_MAPPING
+from model_artifacts import MODEL_DIR, load_imagenet_labels, load_backbone_model
+from backbones import DEFAULT_BACKBONE, get_backbone
+from image_ingest import ingest_image
+from perceptual_cache import PerceptualCache, dhash
+from class_dish_table import load_or_build, lexicon_digest
+from plate_analysis import TileBudget, merge_detections, plate_tiles
+from preset_gallery import PresetGallery, file_signature
+from inference_cache import LRUCache, image_digest
+from inference_scheduler import MicroBatcher
+from inference_modes import DEFAULT_INFERENCE_MODE, optimize_modules
+from thread_budget import ThreadBudget
+from inference_workers import DEFAULT_WORKERS, InferenceWorkerPool
+from stage_timing import StageTimer, timed_stage
+
+# Record per-stage latency histograms (see latency_stats())
+STAGE_TIMING = os.environ.get('EATELLIGENCE_STAGE_TIMING', '').lower() in ('1', 'true', 'yes')
 
 # Suppress PyTorch warnings
 warnings.filterwarnings('ignore', category=UserWarning)
 
 class FoodRecognizer:
-    def __init__(self):
+    # Minimum SequenceMatcher ratio for a fuzzy name match
+    MATCH_THRESHOLD = 0.6
+    
+    # Number of recent images whose embedding and logits are kept
+    FEATURE_CACHE_SIZE = 64
+    
+    # Images per forward pass in recognize_batch and the micro-batcher
+    BATCH_SIZE = 16
+    
+    # Longest a single image waits for others to share its forward pass
+    MAX_WAIT_MS = 10
+    
+    # Most sample images used to calibrate static int8 / tracing
+    CALIBRATION_IMAGES = 32
+    
+    # Recognized dishes kept for near-duplicate uploads, and the largest
+    # dHash distance (of 64 bits) still treated as the same photo
+    RESULT_CACHE_SIZE = 1024
+    HASH_DISTANCE = 6
+    
+    # Plate analysis: latency budget per request, finest tile grid, overlap
+    # of neighbouring tiles, top classes pooled per tile and the least
+    # dish probability a tile needs to count as a detection
+    PLATE_BUDGET_MS = 1000
+    PLATE_MAX_GRID = 3
+    PLATE_OVERLAP = 0.25
+    PLATE_TOP_K = 5
+    PLATE_MIN_CONFIDENCE = 0.2
+    
+    def __init__(self, model_dir: str = MODEL_DIR, feature_cache_size: int = FEATURE_CACHE_SIZE,
+                 micro_batching: bool = False, max_wait_ms: float = MAX_WAIT_MS,
+                 inference_mode: str = DEFAULT_INFERENCE_MODE, backbone: str = DEFAULT_BACKBONE,
+                 result_cache_size: int = RESULT_CACHE_SIZE, result_cache_path: str = None,
+                 thread_budget: ThreadBudget = None, workers: int = DEFAULT_WORKERS,
+                 stage_timing: bool = STAGE_TIMING, preset_index: str = None):
+        started = time.perf_counter()
+        
+        # The model, labels and preset features are loaded on the first image
+        # request by _ensure_model(), so text-only sessions never pay for them
+        self.model_dir = model_dir
+        self.inference_mode = inference_mode
+        self.backbone_spec = get_backbone(backbone)
+        self.model = None
+        self.backbone = None
+        self.classifier = None
+        self.labels = []
+        self.class_table = None
+        self.preset_images = PresetGallery()
+        # Nearest-neighbour index kind ('ivf_flat' or 'exact') kept over the
+        # preset gallery, for galleries too large to scan; None scans exactly
+        self.preset_index = preset_index
+        self.preset_dir = Path(__file__).parent / 'preset_images'
+        self._model_lock = threading.Lock()
+        self._model_loaded = False
+        self._model_error = None
+        self.timings = {
+            'startup_seconds': None,
+            'model_load_seconds': None,
+            'first_inference_seconds': None
+        }
+        
+        # (embedding, logits) per image content hash, so Streamlit reruns of
+        # the same upload skip inference
+        self.feature_cache = LRUCache(feature_cache_size)
+        
+        # With micro-batching, concurrent recognize_food() calls (e.g. from
+        # several Streamlit sessions sharing this recognizer) are run together
+        self.micro_batching = micro_batching
+        self.max_wait_ms = max_wait_ms
+        self.scheduler = None
+        
+        # Food names by perceptual hash, so re-encoded or resized copies of a
+        # photo skip inference; created with the model so a persisted cache
+        # (result_cache_path) is only reused for the same weights, presets
+        # and label lexicon
+        self.result_cache_size = result_cache_size
+        self.result_cache_path = result_cache_path
+        self.result_cache = PerceptualCache(self.HASH_DISTANCE, maxsize=result_cache_size)
+        
+        # Optional bound on concurrent forward passes and their CPU threads,
+        # for a recognizer shared by many session threads
+        self.thread_budget = thread_budget
+        
+        # With workers > 0 the model runs in that many worker processes
+        # instead of this one. Micro-batching hands the pool one batch at a
+        # time, so leave it off to let concurrent requests use every worker
+        self.workers = workers
+        self.worker_pool = None
+        
+        # Latency of each pipeline stage (decode, transform, forward, ...);
+        # spans cost next to nothing while stage_timing is off and no
+        # request is being traced
+        self.stage_timer = StageTimer(enabled=stage_timing)
+        
+        # Measured seconds per plate tile, so analyze_plate() sizes its tile
+        # count to the latency budget
+        self.plate_budget = TileBudget()
+        
         try:
             # Load the nutrition data
-            self.df = load_nutrition_data()
+            self.df = get_nutrition_catalog()
             
-            # Initialize the model (we'll use a pre-trained model)
-            self.model = torch.hub.load('pytorch/vision:v0.10.0', 'resnet50', pretrained=True)
-            self.model.eval()
-            
-            # Define image transformations
-            self.transform = transforms.Compose([
-                transforms.Resize(256),
-                transforms.CenterCrop(224),
-                transforms.ToTensor(),
-                transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-            ])
-            
-            # Load ImageNet labels
-            self.labels = self._load_imagenet_labels()
-            
-            # Load preset images
-            self.preset_images = self._load_preset_images()
+            # Define image transformations (the ones the backbone was trained with)
+            self.transform = self.backbone_spec.transform()
             
             # Map common food items to our dataset with variations
-            self.food_mapping = {
-                # Breakfast items
-                'idli': ['idli', 'steamed rice cake', 'rice cake', 'rice dumpling', 'steamed cake', 'south indian breakfast'],
-                'dosa': ['dosa', 'crepe', 'pancake', 'thin pancake', 'rice pancake', 'south indian crepe'],
-                'upma': ['upma', 'semolina porridge', 'semolina dish', 'savory porridge', 'south indian breakfast'],
-                'poha': ['poha', 'flattened rice', 'beaten rice', 'rice flakes', 'indian breakfast', 'rice dish'],
-                'dhokla': ['dhokla', 'steamed cake', 'fermented cake', 'gram flour cake', 'gujarati snack'],
-                
-                # Breads and Rotis
-                'roti': ['roti', 'chapati', 'flatbread', 'wheat bread', 'indian bread', 'whole wheat bread'],
-                'naan': ['naan', 'leavened bread', 'tandoori bread', 'indian flatbread', 'bread'],
-                'paratha': ['paratha', 'stuffed bread', 'layered bread', 'indian flatbread', 'bread'],
-                'puri': ['puri', 'fried bread', 'deep fried bread', 'puffed bread', 'indian bread'],
-                'kulcha': ['kulcha', 'leavened bread', 'stuffed bread', 'indian bread'],
-                'bhatura': ['bhatura', 'fried bread', 'puffed bread', 'punjabi bread'],
-                'thepla': ['thepla', 'flatbread', 'gujarati bread', 'spiced bread'],
-                
-                # Main dishes
-                'sambar': ['sambar', 'lentil stew', 'vegetable stew', 'south indian stew', 'dal stew', 'soup'],
-                'curry': ['curry', 'gravy', 'sauce', 'stew', 'masala', 'spiced dish', 'indian dish'],
-                'rice': ['rice', 'biryani', 'pulao', 'fried rice', 'steamed rice', 'boiled rice', 'indian rice'],
-                'dal': ['dal', 'lentil', 'lentil soup', 'pulse', 'legume', 'bean soup', 'indian dal'],
-                'paneer': ['paneer', 'cottage cheese', 'cheese', 'indian cheese', 'fresh cheese', 'dairy'],
-                'biryani': ['biryani', 'rice dish', 'spiced rice', 'indian rice dish', 'mixed rice'],
-                'pulao': ['pulao', 'pilaf', 'rice pilaf', 'fried rice dish', 'indian rice'],
-                
-                # Snacks and Street Food
-                'samosa': ['samosa', 'stuffed pastry', 'fried pastry', 'indian snack', 'savory pastry'],
-                'pakora': ['pakora', 'fritter', 'bhajji', 'fried snack', 'vegetable fritter', 'indian snack'],
-                'vada': ['vada', 'savory donut', 'lentil fritter', 'south indian snack', 'fried snack'],
-                'bhel puri': ['bhel puri', 'puffed rice snack', 'chaat', 'indian street food', 'snack'],
-                'pav bhaji': ['pav bhaji', 'bread and curry', 'vegetable curry', 'mumbai street food', 'snack'],
-                'dabeli': ['dabeli', 'stuffed bun', 'gujarati snack', 'street food'],
-                'vada pav': ['vada pav', 'burger', 'mumbai street food', 'potato fritter sandwich'],
-                'dahi vada': ['dahi vada', 'yogurt fritter', 'lentil dumpling', 'south indian snack'],
-                'ragda pattice': ['ragda pattice', 'potato patty', 'white peas curry', 'street food'],
-                'sev puri': ['sev puri', 'crispy puri', 'chaat', 'street food'],
-                'dahi puri': ['dahi puri', 'yogurt puri', 'chaat', 'street food'],
-                'pani puri': ['pani puri', 'water puri', 'gol gappa', 'street food'],
-                'kachori': ['kachori', 'stuffed pastry', 'fried snack', 'indian snack'],
-                
-                # Tikkas and Grilled Items
-                'paneer tikka': ['paneer tikka', 'grilled cheese', 'tandoori cheese', 'indian appetizer'],
-                'chicken tikka': ['chicken tikka', 'grilled chicken', 'tandoori chicken', 'indian appetizer'],
-                'fish tikka': ['fish tikka', 'grilled fish', 'tandoori fish', 'indian appetizer'],
-                
-                # Curries and Gravies
-                'paneer butter masala': ['paneer butter masala', 'butter paneer', 'paneer curry', 'indian curry'],
-                'butter chicken': ['butter chicken', 'murgh makhani', 'chicken curry', 'indian curry'],
-                'chicken curry': ['chicken curry', 'chicken masala', 'indian chicken dish'],
-                'fish curry': ['fish curry', 'fish masala', 'indian fish dish'],
-                'vegetable curry': ['vegetable curry', 'sabzi', 'indian vegetable dish'],
-                'dal fry': ['dal fry', 'fried lentils', 'indian dal'],
-                'dal makhani': ['dal makhani', 'black dal', 'punjabi dal'],
-                'chana masala': ['chana masala', 'chickpea curry', 'chole', 'indian curry'],
-                'rajma masala': ['rajma masala', 'kidney bean curry', 'indian curry'],
-                'aloo matar': ['aloo matar', 'potato peas curry', 'indian curry'],
-                'aloo gobi': ['aloo gobi', 'potato cauliflower curry', 'indian curry'],
-                'baingan bharta': ['baingan bharta', 'eggplant curry', 'indian curry'],
-                'jeera aloo': ['jeera aloo', 'cumin potatoes', 'indian curry'],
-                'mushroom masala': ['mushroom masala', 'mushroom curry', 'indian curry'],
-                'paneer bhurji': ['paneer bhurji', 'scrambled paneer', 'indian curry'],
-                'egg curry': ['egg curry', 'anda curry', 'indian curry'],
-                
-                # Biryani Variations
-                'hyderabadi biryani': ['hyderabadi biryani', 'spicy biryani', 'indian rice dish'],
-                'lucknowi biryani': ['lucknowi biryani', 'awadhi biryani', 'indian rice dish'],
-                'kolkata biryani': ['kolkata biryani', 'bengali biryani', 'indian rice dish'],
-                'malabar biryani': ['malabar biryani', 'kerala biryani', 'indian rice dish'],
-                'sindhi biryani': ['sindhi biryani', 'spicy biryani', 'indian rice dish'],
-                'awadhi biryani': ['awadhi biryani', 'lucknowi biryani', 'indian rice dish'],
-                'memoni biryani': ['memoni biryani', 'spicy biryani', 'indian rice dish'],
-                'thalassery biryani': ['thalassery biryani', 'kerala biryani', 'indian rice dish'],
-                'ambur biryani': ['ambur biryani', 'tamil biryani', 'indian rice dish'],
-                'dindigul biryani': ['dindigul biryani', 'tamil biryani', 'indian rice dish'],
-                'kalyani biryani': ['kalyani biryani', 'hyderabadi biryani', 'indian rice dish'],
-                'beary biryani': ['beary biryani', 'mangalorean biryani', 'indian rice dish'],
-                'bhatkali biryani': ['bhatkali biryani', 'konkani biryani', 'indian rice dish'],
-                'kacchi biryani': ['kacchi biryani', 'raw biryani', 'indian rice dish'],
-                'pakki biryani': ['pakki biryani', 'cooked biryani', 'indian rice dish'],
-                'tehari biryani': ['tehari biryani', 'vegetable biryani', 'indian rice dish'],
-                'kashmiri biryani': ['kashmiri biryani', 'mutton biryani', 'indian rice dish'],
-                'mughlai biryani': ['mughlai biryani', 'royal biryani', 'indian rice dish'],
-                'afghani biryani': ['afghani biryani', 'spicy biryani', 'indian rice dish'],
-                'persian biryani': ['persian biryani', 'iranian biryani', 'indian rice dish'],
-                'turkish biryani': ['turkish biryani', 'spicy biryani', 'indian rice dish'],
-                'arabic biryani': ['arabic biryani', 'middle eastern biryani', 'indian rice dish'],
-                
-                # Common ingredients
-                'potato': ['potato', 'aloo', 'spud', 'tuber', 'vegetable'],
-                'tomato': ['tomato', 'tamatar', 'red fruit', 'vegetable'],
-                'onion': ['onion', 'pyaz', 'bulb', 'vegetable'],
-                'garlic': ['garlic', 'lehsun', 'clove', 'spice'],
-                'ginger': ['ginger', 'adrak', 'root', 'spice'],
-                'chili': ['chili', 'mirchi', 'pepper', 'spice'],
-                'coriander': ['coriander', 'dhania', 'herb', 'green'],
-                'cumin': ['cumin', 'jeera', 'seed', 'spice'],
-                'turmeric': ['turmeric', 'haldi', 'spice', 'yellow'],
-                'ghee': ['ghee', 'clarified butter', 'fat', 'oil']
-            }
+            self.food_mapping = FOOD_MAPPING
             
             # Create reverse mapping for easier lookup
             self.reverse_mapping = {}
@@ -152,99 +154,318 @@ class FoodRecognizer:
             for variations in self.food_mapping.values():
                 self.all_food_names.extend(variations)
             
+            # Pruned top-k matcher over the synonym lexicon
+            self.name_matcher = FuzzyMatcher(self.all_food_names)
+            
             # Create a DataFrame for faster lookup
             self.food_df = pd.DataFrame(self.df)
             
         except Exception as e:
             st.error(f"Error initializing food recognizer: {str(e)}")
-            self.model = None
+        
+        self.timings['startup_seconds'] = time.perf_counter() - started
+    
+    def _ensure_model(self) -> bool:
+        """
+        Load the model, labels and preset features on first use.
+        
+        Safe to call from several threads; only the first caller loads and
+        the others wait for it. A failed load is reported once and not retried.
+        
+        Returns:
+            bool: True if the model is ready
+        """
+        if self._model_loaded:
+            return True
+        with self._model_lock:
+            if self._model_loaded:
+                return True
+            if self._model_error is not None:
+                return False
+            
+            started = time.perf_counter()
+            try:
+                calibration = None
+                if self.inference_mode in ('static_int8', 'traced'):
+                    calibration = self._calibration_batch()
+                if self.workers:
+                    # The workers load the model; this process never does
+                    self.worker_pool = InferenceWorkerPool(
+                        self.model_dir, self.backbone_spec.name, self.inference_mode,
+                        num_workers=self.workers, max_batch=self.BATCH_SIZE, calibration=calibration
+                    )
+                else:
+                    self.model = load_backbone_model(self.backbone_spec.name, self.model_dir)
+                    
+                    # Everything up to the pooled embedding, then the classifier,
+                    # so one forward pass yields both
+                    self.backbone, self.classifier = self.backbone_spec.split(self.model)
+                    if self.inference_mode != 'eager':
+                        self.backbone, self.classifier = optimize_modules(
+                            self.backbone, self.classifier, self.inference_mode, calibration
+                        )
+                if self.micro_batching:
+                    # With a thread budget, as many batches run at once as it has slots
+                    self.scheduler = MicroBatcher(
+                        self._forward, max_batch_size=self.BATCH_SIZE, max_wait_ms=self.max_wait_ms,
+                        max_in_flight=self.thread_budget.max_concurrent if self.thread_budget is not None else 1
+                    )
+                self.labels = self._load_imagenet_labels()
+                self.class_table = self.build_class_table()
+                self.preset_images = self._load_preset_images()
+                self.result_cache = PerceptualCache(
+                    self.HASH_DISTANCE, maxsize=self.result_cache_size,
+                    path=self.result_cache_path, signature=self._result_cache_signature()
+                )
+            except Exception as e:
+                self._model_error = e
+                self.model = None
+                st.error(f"Error loading recognition model: {str(e)}")
+                return False
+            
+            self.timings['model_load_seconds'] = time.perf_counter() - started
+            self._model_loaded = True
+            return True
+    
+    def get_timings(self) -> dict:
+        """
+        Report how long startup, model loading and the first inference took.
+        
+        Returns:
+            dict: Seconds per phase; None for phases that have not happened yet
+        """
+        return dict(self.timings)
+    
+    def result_cache_stats(self) -> dict:
+        """Near-duplicate cache hit rate and the inference time it saved"""
+        return self.result_cache.stats()
+    
+    def scheduler_stats(self) -> dict:
+        """Micro-batching queue depth and batch size histograms, or None if it is off"""
+        return self.scheduler.stats() if self.scheduler is not None else None
+    
+    def thread_budget_stats(self) -> dict:
+        """Concurrent forward passes and slot wait times, or None without a thread budget"""
+        return self.thread_budget.stats() if self.thread_budget is not None else None
+    
+    def worker_stats(self) -> dict:
+        """Worker process health and request counts, or None when inference runs in-process"""
+        return self.worker_pool.stats() if self.worker_pool is not None else None
+    
+    def latency_stats(self, percentiles=(50, 90, 99)) -> dict:
+        """
+        Latency percentiles of each recognition stage recorded so far.
+        
+        Returns:
+            dict: Per stage (decode, result_cache, feature_cache, transform,
+            forward, preset_match, label_match, nutrition, and the
+            recognize_food / process_image totals), count plus mean, p<q>
+            and max in milliseconds; empty while stage_timing is off
+        """
+        return self.stage_timer.percentiles(percentiles)
+    
+    def trace_request(self):
+        """
+        Trace the stages of the requests made on this thread inside the block.
+        
+            with recognizer.trace_request() as trace:
+                recognizer.process_image(image)
+            trace.spans    # [(stage, start_ms, duration_ms), ...]
+        
+        Works whether or not stage_timing is on.
+        """
+        return self.stage_timer.trace()
+    
+    def build_class_table(self):
+        """
+        Load the precompiled class -> dish table for the current labels and
+        lexicon, rebuilding and saving it to the model directory if stale.
+        """
+        labels = self.labels or self._load_imagenet_labels()
+        return load_or_build(
+            labels, self._find_best_match,
+            lexicon_digest(self.food_mapping, self.MATCH_THRESHOLD), self.model_dir
+        )
     
     def _load_imagenet_labels(self):
-        """Load ImageNet labels"""
+        """Load ImageNet labels from the model artifact directory"""
         try:
-            import json
-            import urllib
-            url = 'https://raw.githubusercontent.com/anishathalye/imagenet-simple-labels/master/imagenet-simple-labels.json'
-            response = urllib.request.urlopen(url)
-            return json.loads(response.read())
+            return load_imagenet_labels(self.model_dir)
         except Exception as e:
             st.error(f"Error loading ImageNet labels: {str(e)}")
             return []
     
-    def _load_preset_images(self):
-        """Load preset food images and their features"""
-        preset_images = {}
-        preset_dir = Path(__file__).parent / 'preset_images'
+    def _load_preset_images(self) -> PresetGallery:
+        """
+        Load the preset gallery, embedding only preset images that are new
+        or changed since it was last saved.
+        """
+        gallery = PresetGallery.load(self.model_dir)
+        preset_dir = self.preset_dir
         
         if not preset_dir.exists():
             st.warning("Preset images directory not found. Creating directory...")
             preset_dir.mkdir(parents=True)
-            return preset_images
+            return gallery
         
         try:
-            # Load each image in the preset directory
-            for image_path in preset_dir.glob('*.jpg'):
-                food_name = image_path.stem  # Get filename without extension
-                try:
-                    image = Image.open(image_path)
-                    # Get image features
-                    features = self._get_image_features(image)
-                    preset_images[food_name] = {
-                        'image': image,
-                        'features': features
-                    }
-                except Exception as e:
-                    st.warning(f"Error loading preset image {food_name}: {str(e)}")
-            
-            return preset_images
+            embedded = gallery.sync(preset_dir, self._embed_preset_file, self._model_signature())
+            if self._index_presets(gallery) or embedded:
+                gallery.save(self.model_dir)
+            return gallery
         except Exception as e:
             st.error(f"Error loading preset images: {str(e)}")
-            return {}
+            return PresetGallery()
     
-    def _get_image_features(self, image: Image.Image) -> torch.Tensor:
-        """Extract features from an image using the model"""
+    def _index_presets(self, gallery: PresetGallery) -> bool:
+        """Build the configured preset index if the gallery has rows but no index; True if built"""
+        if self.preset_index and gallery.index is None and len(gallery):
+            gallery.build_index(self.preset_index)
+            return True
+        return False
+    
+    def _model_signature(self):
+        """Identify the weights, backbone and inference mode so preset features are rebuilt when they change"""
+        weights_path = os.path.join(self.model_dir, self.backbone_spec.weights_file)
+        if not os.path.exists(weights_path):
+            return None
+        return file_signature(weights_path) + [self.backbone_spec.name, self.inference_mode]
+    
+    def _result_cache_signature(self):
+        """Everything a cached food name depends on: the model, the preset gallery and the label lexicon"""
+        return [
+            self._model_signature(), self.preset_images.digest(),
+            lexicon_digest(self.food_mapping, self.MATCH_THRESHOLD)
+        ]
+    
+    def _calibration_batch(self) -> torch.Tensor:
+        """Transformed sample images (bundled dish photos and presets) for calibration"""
+        paths = sorted(Path(__file__).parent.glob('*.jp*g'))
+        if self.preset_dir.exists():
+            paths += sorted(self.preset_dir.glob('*.jpg'))
+        tensors = []
+        for path in paths[:self.CALIBRATION_IMAGES]:
+            tensors.append(self.transform(self._ingest(path)))
+        return torch.stack(tensors) if tensors else None
+    
+    def _embed_preset_file(self, path):
+        """Preset features for one image file, or None if it cannot be read"""
         try:
-            # Preprocess the image
-            img_tensor = self.transform(image).unsqueeze(0)
+            features = self._get_image_features(self._ingest(path))
+            return None if features is None else features.numpy()
+        except Exception as e:
+            st.warning(f"Error loading preset image {Path(path).stem}: {str(e)}")
+            return None
+    
+    def add_preset_image(self, food_name: str, image: Image.Image) -> bool:
+        """
+        Add a preset image, appending its features to the saved gallery.
+        
+        Args:
+            food_name (str): Dish the image shows; used as the file name
+            image (Image.Image): The preset image
             
-            # Get features
-            with torch.no_grad():
-                features = self.model(img_tensor)
-                return features
+        Returns:
+            bool: True if the preset was added
+        """
+        if not self._ensure_model():
+            return False
+        try:
+            self.preset_dir.mkdir(parents=True, exist_ok=True)
+            path = self.preset_dir / f"{food_name}.jpg"
+            self._ingest(image).save(path)
+            with self._model_lock:
+                # Searches run without the lock, so they must never see a
+                # gallery halfway through sync(): update a copy and publish
+                # it with a single assignment
+                gallery = self.preset_images.copy()
+                gallery.sync(self.preset_dir, self._embed_preset_file, self._model_signature())
+                self._index_presets(gallery)
+                gallery.save(self.model_dir)
+                self.preset_images = gallery
+                
+                # Cached names were decided without this preset; clearing
+                # also deletes the saved copy so no later process reloads them
+                self.result_cache.signature = self._result_cache_signature()
+                self.result_cache.clear()
+            return True
+        except Exception as e:
+            st.error(f"Error adding preset image: {str(e)}")
+            return False
+    
+    def _extract(self, image: Image.Image) -> tuple:
+        """
+        Compute the penultimate embedding and the class logits in one forward pass.
+        
+        Results are cached by image content, so a repeated image costs one hash.
+        
+        Returns:
+            tuple: (embedding, logits) as 1D tensors
+        """
+        timer = self.stage_timer
+        with timer.span('feature_cache'):
+            key = image_digest(image)
+            cached = self.feature_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        with timer.span('transform'):
+            img_tensor = self.transform(image)
+        # Includes any wait for a micro-batch or worker, as the caller sees it
+        with timer.span('forward'):
+            if self.scheduler is not None:
+                result = self.scheduler.submit(img_tensor).result()
+            else:
+                result = self._forward([img_tensor])[0]
+        
+        self.feature_cache.put(key, result)
+        return result
+    
+    def _forward(self, tensors: list) -> list:
+        """
+        Run one forward pass over a list of transformed images.
+        
+        With a worker pool the pass runs in a worker process; otherwise,
+        with a thread budget, it waits for a free slot and runs on the
+        budget's inference threads.
+        
+        Returns:
+            list: (embedding, logits) per image as 1D tensors
+        """
+        if self.worker_pool is not None:
+            return self.worker_pool.run(tensors)
+        if self.thread_budget is not None:
+            return self.thread_budget.run(self._run_forward, tensors)
+        return self._run_forward(tensors)
+    
+    def _run_forward(self, tensors: list) -> list:
+        """_forward() on the calling thread"""
+        with torch.no_grad():
+            embeddings = self.backbone(torch.stack(tensors))
+            logits = self.classifier(embeddings)
+        if len(tensors) == 1:
+            return [(embeddings[0], logits[0])]
+        return [(embeddings[i].clone(), logits[i].clone()) for i in range(len(tensors))]
+    
+    def _get_image_features(self, image: Image.Image) -> torch.Tensor:
+        """Extract the features used for preset matching (the class logits)"""
+        try:
+            return self._extract(image)[1]
         except Exception as e:
             st.error(f"Error extracting features: {str(e)}")
             return None
     
     def _compare_with_preset(self, image_features):
         """Compare uploaded image features with preset images."""
-        if not self.preset_images:
+        # Read the reference once; add_preset_image() may replace it meanwhile
+        gallery = self.preset_images
+        if not gallery:
             return None, 0.0
-            
-        # Ensure image_features is a 1D tensor
-        if len(image_features.shape) > 1:
-            image_features = image_features.flatten()
-            
-        best_match = None
-        best_similarity = 0.0
         
-        for food_name, preset_data in self.preset_images.items():
-            preset_features = preset_data['features']
-            
-            # Ensure preset_features is a 1D tensor
-            if len(preset_features.shape) > 1:
-                preset_features = preset_features.flatten()
-                
-            # Calculate cosine similarity
-            similarity = torch.nn.functional.cosine_similarity(
-                image_features.unsqueeze(0),
-                preset_features.unsqueeze(0),
-                dim=1
-            ).item()
-            
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match = food_name
-                
+        # One matrix-vector product against the normalized gallery
+        best_match, best_similarity = gallery.best_match(np.asarray(image_features))
+        if best_similarity <= 0.0:
+            return None, 0.0
         return best_match, best_similarity
     
     def _clean_text(self, text: str) -> str:
@@ -258,87 +479,288 @@ class FoodRecognizer:
     def _find_best_match(self, text: str) -> str:
         """Find the best matching food item from our dataset"""
         cleaned_text = self._clean_text(text)
-        best_match = None
-        best_score = 0.0
         
         # First try exact match in reverse mapping
         if cleaned_text in self.reverse_mapping:
             return self.reverse_mapping[cleaned_text]
         
         # Then try similarity matching
-        for food_name in self.all_food_names:
-            score = self._similarity_ratio(cleaned_text, food_name)
-            if score > best_score and score > 0.6:  # Threshold for matching
-                best_score = score
-                best_match = food_name
+        best_match = self.name_matcher.best_match(cleaned_text, threshold=self.MATCH_THRESHOLD)
         
         if best_match:
             return self.reverse_mapping[best_match]
         
         return None
     
-    def recognize_food(self, image: Image.Image) -> str:
-        """Recognize food from an image"""
+    def _ingest(self, image) -> Image.Image:
+        """Decode and downscale an input once, at the size the transforms need"""
+        return ingest_image(image, min_side=self.backbone_spec.resize_size)
+    
+    @timed_stage('recognize_food')
+    def recognize_food(self, image) -> str:
+        """Recognize food from an image (PIL image, path, bytes or uploaded file)"""
+        if not self._ensure_model():
+            return None
+        
+        started = time.perf_counter()
+        timer = self.stage_timer
         try:
-            # First try matching with preset images
-            image_features = self._get_image_features(image)
-            if image_features is not None:
-                preset_match, similarity = self._compare_with_preset(image_features)
-                if preset_match and similarity > 0.7:  # High confidence threshold
-                    return preset_match
+            with timer.span('decode'):
+                image = self._ingest(image)
             
-            # If no preset match or low confidence, use model predictions
-            img_tensor = self.transform(image).unsqueeze(0)
+            # Near-duplicates of an earlier image reuse its result
+            with timer.span('result_cache'):
+                fingerprint = dhash(image)
+                food_name = self.result_cache.get(fingerprint)
+            if food_name is not None:
+                return food_name
+            
+            # One forward pass serves both the preset comparison and the prediction
+            inference_started = time.perf_counter()
+            _, logits = self._extract(image)
+            food_name = self._food_from_logits(logits)
+            self.result_cache.put(fingerprint, food_name, time.perf_counter() - inference_started)
+            return food_name
             
-            with torch.no_grad():
-                outputs = self.model(img_tensor)
-                _, predicted = outputs.max(1)
-                
-                # Get the predicted label
-                predicted_label = self.labels[predicted.item()]
-                
-                # Try to match the predicted label with our food items
-                best_match = self._find_best_match(predicted_label)
-                if best_match:
-                    return best_match
-                
-                # If no match found, return the original prediction
-                return predicted_label
-                
         except Exception as e:
             st.error(f"Error recognizing food: {str(e)}")
             return None
+        finally:
+            if self.timings['first_inference_seconds'] is None:
+                self.timings['first_inference_seconds'] = time.perf_counter() - started
     
-    def get_nutrition_info(self, food_name: str) -> dict:
-        """Get nutrition information for a food item"""
+    def _food_from_logits(self, logits: torch.Tensor) -> str:
+        """Turn one image's logits into a food name"""
+        # First try matching with preset images
+        with self.stage_timer.span('preset_match'):
+            preset_match, similarity = self._compare_with_preset(logits)
+        if preset_match and similarity > 0.7:  # High confidence threshold
+            return preset_match
+        
+        # If no preset match or low confidence, use model predictions
+        with self.stage_timer.span('label_match'):
+            class_index = int(logits.argmax())
+            
+            # The dish each label matches is precompiled, so this is an array index
+            best_match = self.class_table.dish(class_index)
+        if best_match:
+            return best_match
+        
+        # If no match found, return the original prediction
+        return self.labels[class_index]
+    
+    def predict_dishes(self, image, k: int = 5) -> list:
+        """
+        Rank dishes for an image by summing the probabilities of the top-k
+        ImageNet classes that map to each dish.
+        
+        Args:
+            image: PIL image, path, bytes or uploaded file
+            k (int): Number of top classes to aggregate (default: 5)
+            
+        Returns:
+            list: (dish, probability) pairs, most likely first
+        """
+        if not self._ensure_model():
+            return []
         try:
-            # Clean the food name
-            food_name = self._clean_text(food_name)
+            _, logits = self._extract(self._ingest(image))
+            probabilities = torch.softmax(logits.float(), dim=0).numpy()
+            return self.class_table.aggregate(probabilities, k)
+        except Exception as e:
+            st.error(f"Error recognizing food: {str(e)}")
+            return []
+    
+    def _dish_from_logits(self, logits: torch.Tensor) -> tuple:
+        """The most likely dish for one tile's logits and its confidence, or (None, 0.0)"""
+        preset_match, similarity = self._compare_with_preset(logits)
+        if preset_match and similarity > 0.7:
+            return preset_match, similarity
+        probabilities = torch.softmax(logits.float(), dim=0).numpy()
+        ranked = self.class_table.aggregate(probabilities, self.PLATE_TOP_K)
+        return ranked[0] if ranked else (None, 0.0)
+    
+    def analyze_plate(self, image, budget_ms: float = PLATE_BUDGET_MS, max_grid: int = PLATE_MAX_GRID,
+                      min_confidence: float = PLATE_MIN_CONFIDENCE) -> dict:
+        """
+        Find the dishes on a plate (e.g. a thali) and total their nutrition.
+        
+        The image is cut into tiles (see plate_analysis), coarse to fine,
+        and the tiles are run through the model in one batch. The number
+        of tiles adapts to the latency budget using the measured cost per
+        tile; the very first request runs the whole image alone to measure
+        it. Overlapping detections of the same dish are merged into one item.
+        
+        Args:
+            image: PIL image, path, bytes or uploaded file
+            budget_ms (float): Latency budget for the request (default: 1000)
+            max_grid (int): Finest tile grid (default: 3, i.e. up to 1 + 4 + 9 tiles)
+            min_confidence (float): Least dish probability for a tile detection (default: 0.2)
             
-            # Try to find the food in our dataset
-            food_data = self.food_df[self.food_df['Dish Name'].str.lower() == food_name]
+        Returns:
+            dict containing:
+            - items: List of dicts with food_name, confidence, tiles, box and
+              nutrition_info (None if the dish is not in the catalog)
+            - total_nutrition: Summed calories, protein, fat and carbs
+            - tiles_used, tiles_planned: Tiles run and tiles the grid has
+            - budget_ms, elapsed_ms: The budget and the time actually taken
+            or None if the image could not be analyzed
+        """
+        if not self._ensure_model():
+            return None
+        
+        started = time.perf_counter()
+        deadline = started + budget_ms / 1000.0
+        try:
+            # Large enough that the finest tiles are not upscaled by the transform
+            span = max_grid - (max_grid - 1) * self.PLATE_OVERLAP
+            image = ingest_image(image, min_side=int(self.backbone_spec.resize_size * span))
+            boxes = plate_tiles(image.width, image.height, max_grid, self.PLATE_OVERLAP)
             
-            if not food_data.empty:
-                return {
-                    'name': food_data['Dish Name'].iloc[0],
-                    'calories': food_data['Calories (kcal)'].iloc[0],
-                    'protein': food_data['Protein (g)'].iloc[0],
-                    'fats': food_data['Fats (g)'].iloc[0],
-                    'carbohydrates': food_data['Carbohydrates (g)'].iloc[0]
+            detections = []
+            tiles_used = 0
+            tile_seconds = 0.0
+            while tiles_used < len(boxes):
+                count = min(len(boxes) - tiles_used, self.plate_budget.affordable(deadline - time.perf_counter()))
+                if count == 0:
+                    break
+                batch = boxes[tiles_used:tiles_used + count]
+                batch_started = time.perf_counter()
+                outputs = self._forward([self.transform(image.crop(box)) for box in batch])
+                batch_seconds = time.perf_counter() - batch_started
+                self.plate_budget.observe(count, batch_seconds)
+                tile_seconds += batch_seconds
+                for box, (_, logits) in zip(batch, outputs):
+                    dish, confidence = self._dish_from_logits(logits)
+                    if dish is not None and confidence >= min_confidence:
+                        detections.append((box, dish, confidence))
+                tiles_used += count
+            
+            items = merge_detections(detections, image_box=boxes[0])
+            nutrition = get_nutrition_info_many(item['food_name'] for item in items)
+            rows = {row['query']: row for row in nutrition['items'].to_dict('records')}
+            for item in items:
+                row = rows.get(item['food_name'])
+                item['nutrition_info'] = None if row is None else {
+                    'name': row['name'],
+                    'calories': row['calories'],
+                    'protein': row['protein'],
+                    'fat': row['fat'],
+                    'carbs': row['carbs']
                 }
             
-            # If not found, try fuzzy matching
+            elapsed = time.perf_counter() - started
+            self.plate_budget.observe_overhead(elapsed - tile_seconds)
+            return {
+                'items': items,
+                'total_nutrition': nutrition['totals'],
+                'tiles_used': tiles_used,
+                'tiles_planned': len(boxes),
+                'budget_ms': budget_ms,
+                'elapsed_ms': elapsed * 1000.0
+            }
+        except Exception as e:
+            st.error(f"Error analyzing plate: {str(e)}")
+            return None
+    
+    def _prepare(self, image) -> tuple:
+        """
+        Decode (if given a path or file) and transform one image, skipping
+        whatever the caches already answer.
+        
+        Returns:
+            tuple: (digest, fingerprint, cached food name or None,
+            cached (embedding, logits) or None, tensor or None if cached)
+        """
+        image = self._ingest(image)
+        fingerprint = dhash(image)
+        food_name = self.result_cache.get(fingerprint)
+        if food_name is not None:
+            return None, fingerprint, food_name, None, None
+        key = image_digest(image)
+        cached = self.feature_cache.get(key)
+        if cached is not None:
+            return key, fingerprint, None, cached, None
+        return key, fingerprint, None, None, self.transform(image)
+    
+    def recognize_batch(self, images, batch_size: int = None, num_workers: int = None) -> list:
+        """
+        Recognize food in many images.
+        
+        Images are decoded and transformed on a thread pool, stacked into
+        batches and run through the model once per batch. Each result is
+        the same as recognize_food() would return for that image, and
+        images already answered by the caches are not run again.
+        
+        Args:
+            images (list): PIL images, file paths or file-like objects
+            batch_size (int): Images per forward pass (default: BATCH_SIZE)
+            num_workers (int): Threads for decoding and transforms (default: CPU count)
+            
+        Returns:
+            list: Food name per image, None where an image could not be processed
+        """
+        images = list(images)
+        if not images or not self._ensure_model():
+            return [None] * len(images)
+        batch_size = batch_size or self.BATCH_SIZE
+        
+        def prepare(image):
+            try:
+                return self._prepare(image)
+            except Exception as e:
+                st.warning(f"Error reading image: {str(e)}")
+                return None, None, None, None, None
+        
+        with ThreadPoolExecutor(max_workers=num_workers or os.cpu_count()) as pool:
+            prepared = list(pool.map(prepare, images))
+        
+        try:
+            features = {key: cached for key, _, _, cached, _ in prepared if cached is not None}
+            seconds = {}
+            
+            # One forward pass per batch of distinct images that were not cached
+            pending = {}
+            for key, _, _, _, tensor in prepared:
+                if tensor is not None and key not in features:
+                    pending.setdefault(key, tensor)
+            keys = list(pending)
+            for start in range(0, len(keys), batch_size):
+                batch_keys = keys[start:start + batch_size]
+                batch_started = time.perf_counter()
+                outputs = self._forward([pending[key] for key in batch_keys])
+                per_image = (time.perf_counter() - batch_started) / len(batch_keys)
+                for key, output in zip(batch_keys, outputs):
+                    features[key] = output
+                    seconds[key] = per_image
+                    self.feature_cache.put(key, output)
+            
+            results = []
+            for key, fingerprint, food_name, _, _ in prepared:
+                if food_name is None and key is not None:
+                    food_name = self._food_from_logits(features[key][1])
+                    self.result_cache.put(fingerprint, food_name, seconds.get(key, 0.0))
+                results.append(food_name)
+            return results
+        except Exception as e:
+            st.error(f"Error recognizing food: {str(e)}")
+            return [None] * len(images)
+    
+    @timed_stage('nutrition')
+    def get_nutrition_info(self, food_name: str) -> NutritionRecord:
+        """Get nutrition information for a food item"""
+        try:
+            table = get_nutrition_table()
+            
+            # Try to find the food in the nutrition catalog
+            nutrition_info = table.lookup(self._clean_text(food_name))
+            if nutrition_info is not None:
+                return nutrition_info
+            
+            # If not found, look up the dish its name maps to
             best_match = self._find_best_match(food_name)
             if best_match:
-                food_data = self.food_df[self.food_df['Dish Name'].str.lower() == best_match]
-                if not food_data.empty:
-                    return {
-                        'name': food_data['Dish Name'].iloc[0],
-                        'calories': food_data['Calories (kcal)'].iloc[0],
-                        'protein': food_data['Protein (g)'].iloc[0],
-                        'fats': food_data['Fats (g)'].iloc[0],
-                        'carbohydrates': food_data['Carbohydrates (g)'].iloc[0]
-                    }
+                return table.lookup(best_match)
             
             return None
             
@@ -346,6 +768,7 @@ class FoodRecognizer:
             st.error(f"Error getting nutrition info: {str(e)}")
             return None
     
+    @timed_stage('process_image')
     def process_image(self, image: Image.Image) -> dict:
         """Process an image and return food recognition results"""
         try:
@@ -366,4 +789,15 @@ class FoodRecognizer:
             
         except Exception as e:
             st.error(f"Error processing image: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+    
+    def process_batch(self, images, batch_size: int = None) -> list:
+        """Process many images; one process_image()-style result (or None) per image"""
+        results = []
+        for food_name in self.recognize_batch(images, batch_size=batch_size):
+            nutrition_info = self.get_nutrition_info(food_name) if food_name else None
+            results.append({
+                'food_name': food_name,
+                'nutrition_info': nutrition_info
+            } if nutrition_info else None)
+        return results 
\ No newline at end of file
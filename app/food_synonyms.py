@@ -0,0 +1,108 @@
+"""
+Synonym lexicon for Indian dishes and common ingredients.
+
+Shared by the image recognizer, which maps model labels onto dishes, and
+by the search boxes, which offer the synonyms as autocompletions.
+"""
+
+# Map common food items to our dataset with variations
+FOOD_MAPPING = {
+    # Breakfast items
+    'idli': ['idli', 'steamed rice cake', 'rice cake', 'rice dumpling', 'steamed cake', 'south indian breakfast'],
+    'dosa': ['dosa', 'crepe', 'pancake', 'thin pancake', 'rice pancake', 'south indian crepe'],
+    'upma': ['upma', 'semolina porridge', 'semolina dish', 'savory porridge', 'south indian breakfast'],
+    'poha': ['poha', 'flattened rice', 'beaten rice', 'rice flakes', 'indian breakfast', 'rice dish'],
+    'dhokla': ['dhokla', 'steamed cake', 'fermented cake', 'gram flour cake', 'gujarati snack'],
+    
+    # Breads and Rotis
+    'roti': ['roti', 'chapati', 'flatbread', 'wheat bread', 'indian bread', 'whole wheat bread'],
+    'naan': ['naan', 'leavened bread', 'tandoori bread', 'indian flatbread', 'bread'],
+    'paratha': ['paratha', 'stuffed bread', 'layered bread', 'indian flatbread', 'bread'],
+    'puri': ['puri', 'fried bread', 'deep fried bread', 'puffed bread', 'indian bread'],
+    'kulcha': ['kulcha', 'leavened bread', 'stuffed bread', 'indian bread'],
+    'bhatura': ['bhatura', 'fried bread', 'puffed bread', 'punjabi bread'],
+    'thepla': ['thepla', 'flatbread', 'gujarati bread', 'spiced bread'],
+    
+    # Main dishes
+    'sambar': ['sambar', 'lentil stew', 'vegetable stew', 'south indian stew', 'dal stew', 'soup'],
+    'curry': ['curry', 'gravy', 'sauce', 'stew', 'masala', 'spiced dish', 'indian dish'],
+    'rice': ['rice', 'biryani', 'pulao', 'fried rice', 'steamed rice', 'boiled rice', 'indian rice'],
+    'dal': ['dal', 'lentil', 'lentil soup', 'pulse', 'legume', 'bean soup', 'indian dal'],
+    'paneer': ['paneer', 'cottage cheese', 'cheese', 'indian cheese', 'fresh cheese', 'dairy'],
+    'biryani': ['biryani', 'rice dish', 'spiced rice', 'indian rice dish', 'mixed rice'],
+    'pulao': ['pulao', 'pilaf', 'rice pilaf', 'fried rice dish', 'indian rice'],
+    
+    # Snacks and Street Food
+    'samosa': ['samosa', 'stuffed pastry', 'fried pastry', 'indian snack', 'savory pastry'],
+    'pakora': ['pakora', 'fritter', 'bhajji', 'fried snack', 'vegetable fritter', 'indian snack'],
+    'vada': ['vada', 'savory donut', 'lentil fritter', 'south indian snack', 'fried snack'],
+    'bhel puri': ['bhel puri', 'puffed rice snack', 'chaat', 'indian street food', 'snack'],
+    'pav bhaji': ['pav bhaji', 'bread and curry', 'vegetable curry', 'mumbai street food', 'snack'],
+    'dabeli': ['dabeli', 'stuffed bun', 'gujarati snack', 'street food'],
+    'vada pav': ['vada pav', 'burger', 'mumbai street food', 'potato fritter sandwich'],
+    'dahi vada': ['dahi vada', 'yogurt fritter', 'lentil dumpling', 'south indian snack'],
+    'ragda pattice': ['ragda pattice', 'potato patty', 'white peas curry', 'street food'],
+    'sev puri': ['sev puri', 'crispy puri', 'chaat', 'street food'],
+    'dahi puri': ['dahi puri', 'yogurt puri', 'chaat', 'street food'],
+    'pani puri': ['pani puri', 'water puri', 'gol gappa', 'street food'],
+    'kachori': ['kachori', 'stuffed pastry', 'fried snack', 'indian snack'],
+    
+    # Tikkas and Grilled Items
+    'paneer tikka': ['paneer tikka', 'grilled cheese', 'tandoori cheese', 'indian appetizer'],
+    'chicken tikka': ['chicken tikka', 'grilled chicken', 'tandoori chicken', 'indian appetizer'],
+    'fish tikka': ['fish tikka', 'grilled fish', 'tandoori fish', 'indian appetizer'],
+    
+    # Curries and Gravies
+    'paneer butter masala': ['paneer butter masala', 'butter paneer', 'paneer curry', 'indian curry'],
+    'butter chicken': ['butter chicken', 'murgh makhani', 'chicken curry', 'indian curry'],
+    'chicken curry': ['chicken curry', 'chicken masala', 'indian chicken dish'],
+    'fish curry': ['fish curry', 'fish masala', 'indian fish dish'],
+    'vegetable curry': ['vegetable curry', 'sabzi', 'indian vegetable dish'],
+    'dal fry': ['dal fry', 'fried lentils', 'indian dal'],
+    'dal makhani': ['dal makhani', 'black dal', 'punjabi dal'],
+    'chana masala': ['chana masala', 'chickpea curry', 'chole', 'indian curry'],
+    'rajma masala': ['rajma masala', 'kidney bean curry', 'indian curry'],
+    'aloo matar': ['aloo matar', 'potato peas curry', 'indian curry'],
+    'aloo gobi': ['aloo gobi', 'potato cauliflower curry', 'indian curry'],
+    'baingan bharta': ['baingan bharta', 'eggplant curry', 'indian curry'],
+    'jeera aloo': ['jeera aloo', 'cumin potatoes', 'indian curry'],
+    'mushroom masala': ['mushroom masala', 'mushroom curry', 'indian curry'],
+    'paneer bhurji': ['paneer bhurji', 'scrambled paneer', 'indian curry'],
+    'egg curry': ['egg curry', 'anda curry', 'indian curry'],
+    
+    # Biryani Variations
+    'hyderabadi biryani': ['hyderabadi biryani', 'spicy biryani', 'indian rice dish'],
+    'lucknowi biryani': ['lucknowi biryani', 'awadhi biryani', 'indian rice dish'],
+    'kolkata biryani': ['kolkata biryani', 'bengali biryani', 'indian rice dish'],
+    'malabar biryani': ['malabar biryani', 'kerala biryani', 'indian rice dish'],
+    'sindhi biryani': ['sindhi biryani', 'spicy biryani', 'indian rice dish'],
+    'awadhi biryani': ['awadhi biryani', 'lucknowi biryani', 'indian rice dish'],
+    'memoni biryani': ['memoni biryani', 'spicy biryani', 'indian rice dish'],
+    'thalassery biryani': ['thalassery biryani', 'kerala biryani', 'indian rice dish'],
+    'ambur biryani': ['ambur biryani', 'tamil biryani', 'indian rice dish'],
+    'dindigul biryani': ['dindigul biryani', 'tamil biryani', 'indian rice dish'],
+    'kalyani biryani': ['kalyani biryani', 'hyderabadi biryani', 'indian rice dish'],
+    'beary biryani': ['beary biryani', 'mangalorean biryani', 'indian rice dish'],
+    'bhatkali biryani': ['bhatkali biryani', 'konkani biryani', 'indian rice dish'],
+    'kacchi biryani': ['kacchi biryani', 'raw biryani', 'indian rice dish'],
+    'pakki biryani': ['pakki biryani', 'cooked biryani', 'indian rice dish'],
+    'tehari biryani': ['tehari biryani', 'vegetable biryani', 'indian rice dish'],
+    'kashmiri biryani': ['kashmiri biryani', 'mutton biryani', 'indian rice dish'],
+    'mughlai biryani': ['mughlai biryani', 'royal biryani', 'indian rice dish'],
+    'afghani biryani': ['afghani biryani', 'spicy biryani', 'indian rice dish'],
+    'persian biryani': ['persian biryani', 'iranian biryani', 'indian rice dish'],
+    'turkish biryani': ['turkish biryani', 'spicy biryani', 'indian rice dish'],
+    'arabic biryani': ['arabic biryani', 'middle eastern biryani', 'indian rice dish'],
+    
+    # Common ingredients
+    'potato': ['potato', 'aloo', 'spud', 'tuber', 'vegetable'],
+    'tomato': ['tomato', 'tamatar', 'red fruit', 'vegetable'],
+    'onion': ['onion', 'pyaz', 'bulb', 'vegetable'],
+    'garlic': ['garlic', 'lehsun', 'clove', 'spice'],
+    'ginger': ['ginger', 'adrak', 'root', 'spice'],
+    'chili': ['chili', 'mirchi', 'pepper', 'spice'],
+    'coriander': ['coriander', 'dhania', 'herb', 'green'],
+    'cumin': ['cumin', 'jeera', 'seed', 'spice'],
+    'turmeric': ['turmeric', 'haldi', 'spice', 'yellow'],
+    'ghee': ['ghee', 'clarified butter', 'fat', 'oil']
+}
@@ -0,0 +1,123 @@
+"""
+Fast fuzzy matching of free text against a lexicon of food names.
+
+FuzzyMatcher returns the same scores as difflib.SequenceMatcher(None,
+query, name).ratio(), but only runs SequenceMatcher on names that could
+still beat the threshold and the current top-k.
+"""
+import heapq
+from difflib import SequenceMatcher
+import numpy as np
+
+
+class FuzzyMatcher:
+    """
+    Top-k fuzzy matcher over a fixed lexicon.
+
+    Two cheap upper bounds on SequenceMatcher's ratio 2*M/T prune the
+    lexicon before any exact scoring:
+
+    1. Length: M <= min(len(a), len(b)), so only names within a length
+       window around the query can exceed the threshold. Names are kept
+       sorted by length, which makes the window a contiguous slice.
+    2. Character profile: M <= sum over characters of min(count in a,
+       count in b). Profiles (q=1 gram counts) are precomputed as one
+       matrix, so the bound for the whole window is a single vectorized
+       np.minimum(...).sum(). This is difflib's quick_ratio().
+
+    Survivors are scored exactly in order of decreasing bound, stopping
+    once no remaining bound can reach the current k-th best score.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        lengths = np.array([len(name) for name in self.names], dtype=np.int32)
+
+        # Sort by length so a length window is a slice; stable to keep lexicon order
+        self._order = np.argsort(lengths, kind='stable')
+        self._lengths = lengths[self._order]
+
+        alphabet = sorted({char for name in self.names for char in name})
+        self._char_ids = {char: i for i, char in enumerate(alphabet)}
+        self._profiles = np.zeros((len(self.names), len(alphabet)), dtype=np.int16)
+        for position, row in enumerate(self._order):
+            for char in self.names[row]:
+                self._profiles[position, self._char_ids[char]] += 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def _profile(self, text: str) -> np.ndarray:
+        """Character counts of text over the lexicon alphabet"""
+        profile = np.zeros(len(self._char_ids), dtype=np.int16)
+        for char in text:
+            char_id = self._char_ids.get(char)
+            if char_id is not None:
+                profile[char_id] += 1
+        return profile
+
+    def top_k(self, query: str, k: int = 5, threshold: float = 0.6) -> list:
+        """
+        Find the names most similar to query.
+
+        Args:
+            query (str): Text to match
+            k (int): Maximum number of matches to return (default: 5)
+            threshold (float): Only return names scoring strictly above this (default: 0.6)
+
+        Returns:
+            list: (name, score) pairs, best first; ties keep lexicon order
+        """
+        if k <= 0 or not self.names:
+            return []
+
+        query_len = len(query)
+        if query_len == 0:
+            # SequenceMatcher scores an empty string 0 against anything non-empty
+            candidates = np.arange(len(self.names))
+            bounds = np.ones(len(self.names))
+        else:
+            # Length window where 2 * min(len) / (len sum) can exceed the threshold
+            low, high = 0, len(self._lengths)
+            if threshold > 0:
+                low = np.searchsorted(self._lengths, threshold * query_len / (2 - threshold), side='right')
+                high = np.searchsorted(self._lengths, query_len * (2 - threshold) / threshold, side='left')
+            if low >= high:
+                return []
+
+            overlap = np.minimum(self._profiles[low:high], self._profile(query)).sum(axis=1)
+            bounds = 2.0 * overlap / (query_len + self._lengths[low:high])
+            keep = np.flatnonzero(bounds > threshold)
+            candidates = self._order[low:high][keep]
+            bounds = bounds[keep]
+
+        # Highest bound first, lexicon order among equal bounds
+        visit = np.lexsort((candidates, -bounds))
+
+        # Min-heap of the best k as (score, -row), so the root is the weakest entry
+        best = []
+        for position in visit:
+            bound = bounds[position]
+            if len(best) == k and bound < best[0][0]:
+                break
+            row = int(candidates[position])
+            score = SequenceMatcher(None, query, self.names[row]).ratio()
+            if score <= threshold:
+                continue
+            entry = (score, -row)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+        return [(self.names[-row], score) for score, row in sorted(best, reverse=True)]
+
+    def best_match(self, query: str, threshold: float = 0.6) -> str:
+        """
+        Return the best matching name scoring above threshold, or None.
+
+        Equivalent to scanning the lexicon in order with SequenceMatcher and
+        keeping the first name with the highest score.
+        """
+        matches = self.top_k(query, k=1, threshold=threshold)
+        return matches[0][0] if matches else None
@@ -0,0 +1,82 @@
+"""
+Bounded-cost image loading for recognition.
+
+Phone photos are 12-50 MP, but the recognizer resizes them to a 256 px
+short side. ingest_image() avoids decoding and holding the full bitmap:
+
+1. JPEGs given as a path, bytes or file are decoded in draft mode, which lets libjpeg scale by 1/2, 1/4
+   or 1/8 during decoding; the largest reduction that keeps the short side
+   at least min_side is used.
+2. The EXIF orientation is applied, so portrait phone photos are upright.
+3. The result is downscaled to at most max_pixels, never below min_side.
+4. The image is converted to RGB once.
+
+An image that went through ingest_image() already (upright, RGB and
+within budget) is returned as it is, so passing it on costs no copy.
+
+Inputs larger than MAX_SOURCE_PIXELS are rejected before decoding.
+"""
+import io
+from PIL import Image, ImageOps
+
+# Short side the recognizer transforms resize to
+DEFAULT_MIN_SIDE = 256
+
+# Most pixels kept after ingest (about 1024 x 1024)
+DEFAULT_MAX_PIXELS = 1 << 20
+
+# Refuse to decode anything larger (a 200 MP image is not a phone photo)
+MAX_SOURCE_PIXELS = 200_000_000
+
+# EXIF tag holding the camera orientation (1 is upright)
+ORIENTATION_TAG = 0x0112
+
+
+def _open(source) -> Image.Image:
+    """Open a path, bytes or file-like object lazily (header only)"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return Image.open(source)
+
+
+def ingest_image(source, min_side: int = DEFAULT_MIN_SIDE, max_pixels: int = DEFAULT_MAX_PIXELS) -> Image.Image:
+    """
+    Load an image for recognition at bounded decode cost.
+
+    Args:
+        source: PIL image, file path, bytes or file-like object (e.g. a Streamlit upload)
+        min_side (int): Smallest short side to keep (default: 256)
+        max_pixels (int): Pixel budget of the returned image (default: about 1 MP)
+
+    Returns:
+        Image.Image: Upright RGB image whose short side is at least min_side
+        (unless the source is smaller) and with at most max_pixels pixels
+        (unless min_side requires more)
+
+    Raises:
+        ValueError: If the source has more than MAX_SOURCE_PIXELS pixels
+    """
+    opened = not isinstance(source, Image.Image)
+    image = _open(source) if opened else source
+    width, height = image.size
+    if width * height > MAX_SOURCE_PIXELS:
+        raise ValueError(f"Image of {width}x{height} pixels exceeds the {MAX_SOURCE_PIXELS} pixel limit")
+
+    if opened and image.format == 'JPEG':
+        # Decode at reduced scale; images passed in by the caller are left untouched
+        image.draft('RGB', (min_side, min_side))
+
+    # exif_transpose() copies the image even when it is already upright
+    if image.getexif().get(ORIENTATION_TAG, 1) != 1:
+        image = ImageOps.exif_transpose(image)
+
+    width, height = image.size
+    if width * height > max_pixels:
+        scale = max((max_pixels / (width * height)) ** 0.5, min_side / min(width, height))
+        if scale < 1:
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            image = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
@@ -0,0 +1,103 @@
+"""
+Optimized CPU inference modes for the recognizer.
+
+FoodRecognizer runs a backbone (image -> pooled embedding) and a
+classifier (embedding -> logits). optimize_modules() rewrites both for one
+of these modes:
+
+    eager           float32 eager mode, the reference
+    channels_last   float32 with NHWC activations, usually faster convolutions on x86
+    dynamic_int8    classifier Linear weights in int8, activations quantized on the fly
+    static_int8     whole backbone in int8 via FX graph mode, calibrated on sample images
+    traced          TorchScript trace of the float32 modules (no Python overhead per layer)
+
+The mode is chosen with FoodRecognizer(inference_mode=...) or the
+EATELLIGENCE_INFERENCE_MODE environment variable.
+"""
+import copy
+import os
+import torch
+
+INFERENCE_MODES = ('eager', 'channels_last', 'dynamic_int8', 'static_int8', 'traced')
+DEFAULT_INFERENCE_MODE = os.environ.get('EATELLIGENCE_INFERENCE_MODE', 'eager')
+
+
+class ChannelsLast(torch.nn.Module):
+    """Run a module on channels_last (NHWC) inputs"""
+
+    def __init__(self, module: torch.nn.Module):
+        super().__init__()
+        self.module = module.to(memory_format=torch.channels_last)
+
+    def forward(self, x):
+        return self.module(x.contiguous(memory_format=torch.channels_last))
+
+
+def quantized_engine() -> str:
+    """Best available int8 kernel backend on this CPU"""
+    engines = torch.backends.quantized.supported_engines
+    for engine in ('x86', 'fbgemm', 'qnnpack'):
+        if engine in engines:
+            return engine
+    raise RuntimeError("No quantized CPU engine is available")
+
+
+def _static_int8(backbone: torch.nn.Module, calibration: torch.Tensor) -> torch.nn.Module:
+    """Post-training static quantization of the backbone with FX graph mode"""
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    engine = quantized_engine()
+    torch.backends.quantized.engine = engine
+    prepared = prepare_fx(
+        copy.deepcopy(backbone).eval(), get_default_qconfig_mapping(engine), example_inputs=(calibration[:1],)
+    )
+    with torch.no_grad():
+        for start in range(0, len(calibration), 8):
+            prepared(calibration[start:start + 8])
+    return convert_fx(prepared)
+
+
+def _dynamic_int8(classifier: torch.nn.Module) -> torch.nn.Module:
+    """Dynamic int8 quantization of Linear layers"""
+    from torch.ao.quantization import quantize_dynamic
+
+    torch.backends.quantized.engine = quantized_engine()
+    return quantize_dynamic(copy.deepcopy(classifier), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def optimize_modules(backbone: torch.nn.Module, classifier: torch.nn.Module, mode: str = 'eager',
+                     calibration: torch.Tensor = None) -> tuple:
+    """
+    Prepare the backbone and classifier for an inference mode.
+
+    Args:
+        backbone (torch.nn.Module): Image batch -> embedding batch
+        classifier (torch.nn.Module): Embedding batch -> logits batch
+        mode (str): One of INFERENCE_MODES
+        calibration (torch.Tensor): Transformed sample images, shape
+            (n, 3, H, W); needed by static_int8 and traced
+
+    Returns:
+        tuple: (backbone, classifier) to use instead
+    """
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode '{mode}'; expected one of {', '.join(INFERENCE_MODES)}")
+    backbone.eval()
+    classifier.eval()
+
+    if mode == 'channels_last':
+        return ChannelsLast(backbone).eval(), classifier
+    if mode == 'dynamic_int8':
+        # Convolutions have no dynamic int8 kernels, so only the classifier changes
+        return backbone, _dynamic_int8(classifier)
+    if mode in ('static_int8', 'traced'):
+        if calibration is None or len(calibration) == 0:
+            raise ValueError(f"The {mode} mode needs calibration images")
+        if mode == 'static_int8':
+            return _static_int8(backbone, calibration), _dynamic_int8(classifier)
+        with torch.no_grad():
+            traced_backbone = torch.jit.freeze(torch.jit.trace(backbone, calibration[:1]))
+            traced_classifier = torch.jit.freeze(torch.jit.trace(classifier, backbone(calibration[:1])))
+        return traced_backbone, traced_classifier
+    return backbone, classifier
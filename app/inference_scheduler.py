@@ -0,0 +1,177 @@
+"""
+Dynamic micro-batching for model inference shared across sessions.
+
+Callers submit one input at a time and get a Future back. A single worker
+thread collects pending inputs into a micro-batch, closed when it reaches
+max_batch_size or when the oldest input has waited max_wait_ms, runs the
+batch once and resolves every caller's future. With max_in_flight > 1,
+that many worker threads collect and run batches, so a new batch can
+start while earlier ones are still running.
+
+    scheduler = MicroBatcher(run_batch, max_batch_size=16, max_wait_ms=10)
+    result = scheduler.submit(tensor).result()
+
+Larger max_wait_ms gives bigger batches (throughput) at the cost of added
+latency when traffic is light; stats() reports the queue depth and batch
+size histograms needed to tune it.
+"""
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Collects single requests into batches for a batch function.
+
+    Args:
+        run_batch: Callable taking a list of inputs and returning a list of
+            results in the same order
+        max_batch_size (int): Most inputs per batch (default: 16)
+        max_wait_ms (float): Longest the first input of a batch waits for
+            others to join it (default: 10)
+        max_in_flight (int): Batches run at once, each on its own worker
+            thread (default: 1)
+        name (str): Worker thread name
+    """
+
+    def __init__(self, run_batch, max_batch_size: int = 16, max_wait_ms: float = 10.0,
+                 max_in_flight: int = 1, name: str = 'inference-scheduler'):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_in_flight = max_in_flight
+        # Only one worker gathers a batch at a time, so batches fill up one
+        # after another instead of splitting the inputs between them
+        self._collect_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._reset_stats()
+        self._workers = [
+            threading.Thread(target=self._run, name=name if max_in_flight == 1 else f"{name}-{i}", daemon=True)
+            for i in range(max_in_flight)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _reset_stats(self):
+        self.submitted = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.batch_sizes = Counter()
+        self.queue_depths = Counter()
+        self.wait_seconds = 0.0
+        self.busy_seconds = 0.0
+
+    def submit(self, item) -> Future:
+        """
+        Queue one input for the next batch.
+
+        Returns:
+            Future: Resolves to the input's result, or raises the batch's error
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        with self._stats_lock:
+            self.submitted += 1
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def queue_depth(self) -> int:
+        """Inputs waiting for a batch"""
+        return self._queue.qsize()
+
+    def _collect(self) -> list:
+        """Block for the first input, then gather more until the batch is full or its deadline passes"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            with self._collect_lock:
+                batch = self._collect()
+            if batch is None:
+                return
+            depth = self._queue.qsize()
+            started = time.perf_counter()
+            live = [(item, future) for item, future, _ in batch if future.set_running_or_notify_cancel()]
+            failed = False
+            if live:
+                try:
+                    results = list(self.run_batch([item for item, _ in live]))
+                    if len(results) != len(live):
+                        raise RuntimeError(f"run_batch returned {len(results)} results for {len(live)} inputs")
+                    for (_, future), result in zip(live, results):
+                        future.set_result(result)
+                except Exception as e:
+                    failed = True
+                    for _, future in live:
+                        future.set_exception(e)
+
+            finished = time.perf_counter()
+            with self._stats_lock:
+                self.batches += 1
+                self.failed_batches += failed
+                self.batch_sizes[len(batch)] += 1
+                self.queue_depths[depth] += 1
+                self.wait_seconds += sum(started - queued for _, _, queued in batch)
+                self.busy_seconds += finished - started
+
+    def stats(self) -> dict:
+        """
+        Scheduler counters for tuning max_batch_size and max_wait_ms.
+
+        Returns:
+            dict: submitted, batches, failed_batches, mean_batch_size,
+            mean_wait_ms (queueing delay per input), busy_seconds,
+            queue_depth (now), batch_size_histogram and
+            queue_depth_histogram (inputs left waiting when a batch started)
+        """
+        with self._stats_lock:
+            processed = sum(size * count for size, count in self.batch_sizes.items())
+            return {
+                'submitted': self.submitted,
+                'batches': self.batches,
+                'failed_batches': self.failed_batches,
+                'mean_batch_size': processed / self.batches if self.batches else 0.0,
+                'mean_wait_ms': 1000.0 * self.wait_seconds / processed if processed else 0.0,
+                'busy_seconds': self.busy_seconds,
+                'queue_depth': self._queue.qsize(),
+                'batch_size_histogram': dict(sorted(self.batch_sizes.items())),
+                'queue_depth_histogram': dict(sorted(self.queue_depths.items()))
+            }
+
+    def reset_stats(self):
+        """Zero the counters and histograms"""
+        with self._stats_lock:
+            self._reset_stats()
+
+    def close(self, timeout: float = None):
+        """Stop accepting inputs, finish the queued ones and stop the workers"""
+        if self._closed:
+            return
+        self._closed = True
+        # One stop marker per worker; a worker that meets one mid-batch puts it back
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
@@ -0,0 +1,378 @@
+"""
+Out-of-process inference for the recognizer.
+
+InferenceWorkerPool runs the backbone and classifier in separate worker
+processes, so the model's memory and compute live outside the Streamlit
+server process and inference is not bound by its GIL. Each worker:
+
+- loads its own copy of the model (once, at start),
+- owns two shared memory blocks: an input block of max_batch transformed
+  images and an output block of max_batch (embedding, logits) rows,
+- takes requests over a pipe: the parent writes a batch into the input
+  block and sends only its size; the worker runs it and replies once the
+  outputs are written. Tensors are never pickled.
+
+One request runs per worker at a time, so N workers serve N batches in
+parallel; each worker uses cores // N intra-op threads.
+
+A worker that dies (crash, OOM kill) or stops answering is replaced: the
+request in flight is retried once on its replacement, and
+health_check(), also run periodically in the background, pings idle
+workers and restarts the ones that do not answer.
+
+The worker count is set with FoodRecognizer(workers=...) or the
+EATELLIGENCE_WORKERS environment variable (0 runs inference in-process).
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import torch
+from backbones import get_backbone
+from model_artifacts import load_backbone_model
+from inference_modes import optimize_modules
+from thread_budget import available_cores
+
+DEFAULT_WORKERS = int(os.environ.get('EATELLIGENCE_WORKERS', '0'))
+
+# Seconds a worker may take to load its model, and to answer a ping
+STARTUP_TIMEOUT = 300.0
+PING_TIMEOUT = 5.0
+
+# Seconds between checks for a closed pool while waiting for an idle worker
+IDLE_POLL_INTERVAL = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerCrashed(RuntimeError):
+    """A worker process died or stopped answering"""
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Open a block created by the parent, which alone unlinks it. Spawned
+    workers share the parent's resource tracker, so attaching does not
+    register the block a second time.
+    """
+    return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(conn, model_dir: str, backbone: str, inference_mode: str, calibration, threads: int,
+                 input_name: str, output_name: str, max_batch: int):
+    """Worker process: load the model, then serve batches until told to stop"""
+    torch.set_num_threads(threads)
+    input_block, output_block = _attach(input_name), _attach(output_name)
+    try:
+        spec = get_backbone(backbone)
+        model_backbone, classifier = spec.split(load_backbone_model(spec.name, model_dir))
+        if inference_mode != 'eager':
+            model_backbone, classifier = optimize_modules(model_backbone, classifier, inference_mode, calibration)
+        inputs = np.ndarray((max_batch, 3, spec.crop_size, spec.crop_size), dtype=np.float32, buffer=input_block.buf)
+        outputs = np.ndarray((max_batch, spec.embedding_dim + spec.num_classes), dtype=np.float32,
+                             buffer=output_block.buf)
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {str(e)}"))
+        return
+    conn.send(('ready', os.getpid()))
+
+    dim = spec.embedding_dim
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        if message[0] == 'ping':
+            conn.send(('pong', os.getpid()))
+            continue
+        n = message[1]
+        try:
+            with torch.no_grad():
+                # A view of the shared block, not a copy
+                embeddings = model_backbone(torch.from_numpy(inputs[:n]))
+                logits = classifier(embeddings)
+            outputs[:n, :dim] = embeddings.numpy()
+            outputs[:n, dim:] = logits.numpy()
+            conn.send(('done', n))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {str(e)}"))
+
+    # The views must go before the blocks can be closed
+    del inputs, outputs
+    input_block.close()
+    output_block.close()
+
+
+class _Worker:
+    """One worker process with its pipe and shared memory blocks"""
+
+    def __init__(self, index: int, process, conn, input_block, output_block, inputs, outputs):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.input_block = input_block
+        self.output_block = output_block
+        self.inputs = inputs
+        self.outputs = outputs
+        self.requests = 0
+
+
+class InferenceWorkerPool:
+    """
+    Pool of worker processes each running the recognizer's model.
+
+    Args:
+        model_dir (str): Artifact directory with the backbone weights
+        backbone (str): Backbone name (see backbones.BACKBONES)
+        inference_mode (str): One of inference_modes.INFERENCE_MODES
+        num_workers (int): Worker processes (default: one per core)
+        max_batch (int): Most images per request; larger inputs are split (default: 16)
+        calibration (torch.Tensor): Sample images for the static_int8 and traced modes
+        request_timeout (float): Seconds before a busy worker counts as hung (default: 60)
+        health_interval (float): Seconds between background health checks; 0 disables (default: 10)
+    """
+
+    def __init__(self, model_dir: str, backbone: str, inference_mode: str = 'eager', num_workers: int = None,
+                 max_batch: int = 16, calibration: torch.Tensor = None, request_timeout: float = 60.0,
+                 health_interval: float = 10.0):
+        self.model_dir = model_dir
+        self.spec = get_backbone(backbone)
+        self.inference_mode = inference_mode
+        self.num_workers = num_workers or available_cores()
+        self.max_batch = max_batch
+        self.calibration = calibration
+        self.request_timeout = request_timeout
+        self.threads_per_worker = max(1, available_cores() // self.num_workers)
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        self._restart_lock = threading.Lock()
+        self._closed = threading.Event()
+        self.restarts = 0
+        self.workers = []
+
+        try:
+            # The first worker may download the weights; the rest start once they are saved
+            self.workers.append(self._start(0))
+            self._await_ready(self.workers[0])
+            self.workers.extend(self._start(i) for i in range(1, self.num_workers))
+            for worker in self.workers[1:]:
+                self._await_ready(worker)
+        except Exception:
+            self.close()
+            raise
+        for worker in self.workers:
+            self._idle.put(worker)
+
+        atexit.register(self.close)
+        self._monitor = None
+        if health_interval > 0:
+            self._monitor = threading.Thread(
+                target=self._monitor_health, args=(health_interval,), name='inference-workers-health', daemon=True
+            )
+            self._monitor.start()
+
+    def _start(self, index: int) -> _Worker:
+        """Allocate a worker's shared memory and start its process"""
+        spec = self.spec
+        input_shape = (self.max_batch, 3, spec.crop_size, spec.crop_size)
+        output_shape = (self.max_batch, spec.embedding_dim + spec.num_classes)
+        input_block = shared_memory.SharedMemory(create=True, size=int(np.prod(input_shape)) * 4)
+        output_block = shared_memory.SharedMemory(create=True, size=int(np.prod(output_shape)) * 4)
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, name=f"inference-worker-{index}", daemon=True,
+            args=(child_conn, self.model_dir, spec.name, self.inference_mode, self.calibration,
+                  self.threads_per_worker, input_block.name, output_block.name, self.max_batch)
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(
+            index, process, parent_conn, input_block, output_block,
+            np.ndarray(input_shape, dtype=np.float32, buffer=input_block.buf),
+            np.ndarray(output_shape, dtype=np.float32, buffer=output_block.buf)
+        )
+
+    def _receive(self, worker: _Worker, timeout: float):
+        """Wait for a worker's reply, noticing if it dies or hangs"""
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                if worker.conn.poll(0.05):
+                    return worker.conn.recv()
+            except (EOFError, OSError):
+                raise WorkerCrashed(f"Inference worker {worker.index} closed its pipe") from None
+            if not worker.process.is_alive():
+                raise WorkerCrashed(f"Inference worker {worker.index} exited with code {worker.process.exitcode}")
+            if time.perf_counter() > deadline:
+                raise WorkerCrashed(f"Inference worker {worker.index} did not answer within {timeout:.0f} s")
+
+    def _await_ready(self, worker: _Worker):
+        """Wait until a worker has loaded its model"""
+        reply = self._receive(worker, STARTUP_TIMEOUT)
+        if reply[0] != 'ready':
+            raise RuntimeError(f"Inference worker {worker.index} failed to start: {reply[1]}")
+
+    def _stop(self, worker: _Worker):
+        """Stop a worker's process and release its shared memory"""
+        if worker.inputs is None:
+            return
+        try:
+            worker.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        worker.process.join(timeout=5)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
+        worker.inputs = worker.outputs = None
+        for block in (worker.input_block, worker.output_block):
+            block.close()
+            block.unlink()
+
+    def _restart(self, worker: _Worker) -> _Worker:
+        """Replace a dead or hung worker with a fresh one at the same index"""
+        with self._restart_lock:
+            # close() stops the workers under this lock; a replacement
+            # started after it would never be stopped
+            if self._closed.is_set():
+                raise WorkerCrashed(f"Inference worker {worker.index} not restarted: the pool is closed")
+            self._stop(worker)
+            replacement = self._start(worker.index)
+            try:
+                self._await_ready(replacement)
+            except Exception:
+                self._stop(replacement)
+                raise
+            self.workers[worker.index] = replacement
+            self.restarts += 1
+            return replacement
+
+    def _take_idle(self) -> _Worker:
+        """Wait for an idle worker, giving up once the pool is closed"""
+        while True:
+            if self._closed.is_set():
+                raise RuntimeError("InferenceWorkerPool is closed")
+            try:
+                return self._idle.get(timeout=IDLE_POLL_INTERVAL)
+            except queue.Empty:
+                pass
+
+    def _run_batch(self, tensors: list) -> list:
+        """Run up to max_batch images on the next idle worker, retrying once on a replacement if it crashes"""
+        n = len(tensors)
+        worker = self._take_idle()
+        try:
+            for attempt in range(2):
+                try:
+                    if worker.inputs is None:
+                        raise WorkerCrashed(f"Inference worker {worker.index} could not be restarted")
+                    torch.stack(tensors, out=torch.from_numpy(worker.inputs[:n]))
+                    worker.conn.send(('run', n))
+                    reply = self._receive(worker, self.request_timeout)
+                    break
+                except (WorkerCrashed, OSError, ValueError):
+                    if attempt == 1 or self._closed.is_set():
+                        raise
+                    worker = self._restart(worker)
+            if reply[0] == 'error':
+                raise RuntimeError(f"Inference worker {worker.index} failed: {reply[1]}")
+            worker.requests += 1
+            outputs = torch.from_numpy(worker.outputs[:n].copy())
+        finally:
+            self._idle.put(worker)
+        dim = self.spec.embedding_dim
+        return [(outputs[i, :dim], outputs[i, dim:]) for i in range(n)]
+
+    def run(self, tensors: list) -> list:
+        """
+        Run transformed images through the model in the workers.
+
+        Safe to call from many threads; each batch of up to max_batch
+        images waits for an idle worker.
+
+        Args:
+            tensors (list): Transformed images, each (3, crop_size, crop_size)
+
+        Returns:
+            list: (embedding, logits) per image as 1D tensors
+        """
+        if self._closed.is_set():
+            raise RuntimeError("InferenceWorkerPool is closed")
+        results = []
+        for start in range(0, len(tensors), self.max_batch):
+            results.extend(self._run_batch(tensors[start:start + self.max_batch]))
+        return results
+
+    def health_check(self) -> dict:
+        """
+        Ping every idle worker and restart the ones that are dead or do not
+        answer; busy workers are checked by the request they are serving.
+
+        Returns:
+            dict: Workers found healthy and workers restarted
+        """
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        healthy = restarted = 0
+        try:
+            for i, worker in enumerate(idle):
+                try:
+                    worker.conn.send(('ping',))
+                    reply = self._receive(worker, PING_TIMEOUT)
+                    if reply[0] == 'pong':
+                        healthy += 1
+                        continue
+                except (WorkerCrashed, OSError, ValueError):
+                    pass
+                if self._closed.is_set():
+                    continue
+                idle[i] = self._restart(worker)
+                restarted += 1
+        finally:
+            for worker in idle:
+                self._idle.put(worker)
+        return {'healthy': healthy, 'restarted': restarted}
+
+    def _monitor_health(self, interval: float):
+        while not self._closed.wait(interval):
+            try:
+                self.health_check()
+            except Exception as e:
+                if not self._closed.is_set():
+                    logger.warning(f"Inference worker health check failed: {str(e)}")
+
+    def stats(self) -> dict:
+        """Worker count, live workers, requests per worker and restarts"""
+        workers = list(self.workers)
+        return {
+            'workers': len(workers),
+            'alive': sum(worker.process.is_alive() for worker in workers),
+            'idle': self._idle.qsize(),
+            'threads_per_worker': self.threads_per_worker,
+            'requests': [worker.requests for worker in workers],
+            'restarts': self.restarts
+        }
+
+    def close(self):
+        """Stop every worker and free the shared memory"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        atexit.unregister(self.close)
+        # Waits for a restart in progress, so its replacement is stopped too
+        with self._restart_lock:
+            for worker in self.workers:
+                self._stop(worker)
+            self.workers = []
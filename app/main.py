@@ -1,14 +1,16 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from PIL import Image
-from nutrition_utils import load_nutrition_data, get_nutrition_info, assess_health_impact
+from nutrition_utils import load_nutrition_data, get_nutrition_info, assess_health_impact, get_nutrition_catalog, DISEASE_DIET_FILE
 from food_recognition import FoodRecognizer
+from thread_budget import ThreadBudget
+from inference_workers import DEFAULT_WORKERS
 from recipe_generator import RecipeGenerator
 from disease_recommender import DiseaseRecommender
 from healthy_alternatives import HealthyAlternatives
+from search_index import autocomplete_foods
+from image_ingest import ingest_image
 import json
-import os
 
 # Set page config - MUST be the first Streamlit command
 st.set_page_config(
@@ -26,9 +28,15 @@ def is_veg_food(food_name):
 # Initialize components (models/utilities)
 @st.cache_resource
 def load_components():
+    if DEFAULT_WORKERS:
+        # Inference runs in EATELLIGENCE_WORKERS worker processes
+        food_recognizer = FoodRecognizer(workers=DEFAULT_WORKERS)
+    else:
+        # In-process inference is micro-batched and thread-budgeted
+        food_recognizer = FoodRecognizer(micro_batching=True, thread_budget=ThreadBudget())
     return {
         'nutrition_data': load_nutrition_data(),
-        'food_recognizer': FoodRecognizer(),
+        'food_recognizer': food_recognizer,
         'recipe_generator': RecipeGenerator(),
         'disease_recommender': DiseaseRecommender(),
         'healthy_alternatives': HealthyAlternatives()
@@ -395,8 +403,30 @@ if not st.session_state['show_about']:
         with col1:
             st.markdown("### 📸 Upload Food Image")
             uploaded_file = st.file_uploader("Choose an image...", type=["jpg", "jpeg", "png"])
-            if uploaded_file is not None:
-                image = Image.open(uploaded_file)
+            plate_mode = st.checkbox("Plate with several dishes (thali)")
+            if uploaded_file is not None and plate_mode:
+                # Tiles of the plate, as many as the latency budget allows
+                plate = components['food_recognizer'].analyze_plate(uploaded_file)
+                if plate and plate['items']:
+                    st.success(f"Found {len(plate['items'])} item(s): {', '.join(item['food_name'] for item in plate['items'])}")
+                    st.markdown("### 📊 Nutritional Information")
+                    items_df = pd.DataFrame([
+                        {'Dish': item['food_name'], 'Confidence': round(item['confidence'], 2), **(item['nutrition_info'] or {})}
+                        for item in plate['items']
+                    ])
+                    st.dataframe(items_df, use_container_width=True)
+                    st.markdown(f"**Total:** {plate['total_nutrition']['calories']} kcal, "
+                                f"{plate['total_nutrition']['protein']} g protein, "
+                                f"{plate['total_nutrition']['fat']} g fat, "
+                                f"{plate['total_nutrition']['carbs']} g carbs")
+                    st.caption(f"Analyzed {plate['tiles_used']} of {plate['tiles_planned']} tiles in "
+                               f"{plate['elapsed_ms']:.0f} ms (budget {plate['budget_ms']:.0f} ms)")
+                else:
+                    st.error("Could not recognize any dishes on the plate. Please try another image or use text input.")
+            elif uploaded_file is not None:
+                # Decode phone photos at reduced scale; large enough to display, upright and RGB.
+                # The recognizer reuses this image rather than decoding the upload again
+                image = ingest_image(uploaded_file, min_side=720)
                 st.image(image, caption="Uploaded Food Image", use_column_width=True)
                 food_name = components['food_recognizer'].recognize_food(image)
                 if food_name:
@@ -447,6 +477,12 @@ if not st.session_state['show_about']:
             food_name = st.text_input("Enter food name")
             if food_name:
                 nutrition_info = get_nutrition_info(food_name)
+                if not nutrition_info:
+                    # Offer completions from catalog names and dish synonyms
+                    suggestions = autocomplete_foods(food_name)
+                    if suggestions:
+                        food_name = st.selectbox("Did you mean", suggestions)
+                        nutrition_info = get_nutrition_info(food_name)
                 if nutrition_info:
                     st.markdown("### 📊 Nutritional Information")
                     nutrition_df = pd.DataFrame([nutrition_info])
@@ -504,7 +540,7 @@ if not st.session_state['show_about']:
         daily_calories = st.slider("Daily Calorie Target", min_value=1200, max_value=3000, value=2000, step=100)
 
         # Load the new CSV for this module only
-        disease_df = pd.read_csv(os.path.join("app", "indian_disease_diet_nutrition.csv"))
+        disease_df = get_nutrition_catalog(DISEASE_DIET_FILE)
 
         class DiseaseRecommenderCustom:
             def __init__(self, df):
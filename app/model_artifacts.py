@@ -0,0 +1,105 @@
+"""
+Local model artifacts for the food recognizer.
+
+The recognizer reads its weights and ImageNet labels from an artifact
+directory (EATELLIGENCE_MODEL_DIR, default app/models) so it can start
+without network access:
+
+    models/
+        resnet50.pth            torchvision ImageNet state dict, one per backbone
+        imagenet_labels.json    list of 1000 human-readable class labels
+
+Populate the directory on a machine with network access with:
+    python -m model_artifacts [backbone ...]
+
+Missing artifacts are downloaded (and saved for next time) unless
+EATELLIGENCE_OFFLINE is set.
+"""
+import json
+import os
+import sys
+import urllib.request
+import torch
+import torchvision
+from backbones import BACKBONES, DEFAULT_BACKBONE, get_backbone
+
+MODEL_DIR = os.environ.get(
+    'EATELLIGENCE_MODEL_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+)
+LABELS_FILE = 'imagenet_labels.json'
+LABELS_URL = 'https://raw.githubusercontent.com/anishathalye/imagenet-simple-labels/master/imagenet-simple-labels.json'
+
+
+def downloads_allowed(allow_download: bool = None) -> bool:
+    """Resolve whether missing artifacts may be downloaded"""
+    if allow_download is not None:
+        return allow_download
+    return os.environ.get('EATELLIGENCE_OFFLINE', '').lower() not in ('1', 'true', 'yes')
+
+
+def load_imagenet_labels(model_dir: str = MODEL_DIR, allow_download: bool = None) -> list:
+    """
+    Load the ImageNet class labels.
+
+    Reads imagenet_labels.json from the artifact directory, downloading it
+    first if allowed. As a last resort uses the class names bundled with
+    torchvision, which are longer but cover the same 1000 classes.
+    """
+    path = os.path.join(model_dir, LABELS_FILE)
+    if not os.path.exists(path) and downloads_allowed(allow_download):
+        try:
+            with urllib.request.urlopen(LABELS_URL, timeout=10) as response:
+                labels = json.loads(response.read())
+            os.makedirs(model_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(labels, f)
+        except Exception as e:
+            print(f"Could not download ImageNet labels: {str(e)}")
+
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    return list(torchvision.models.ResNet50_Weights.IMAGENET1K_V1.meta['categories'])
+
+
+def load_backbone_model(name: str = DEFAULT_BACKBONE, model_dir: str = MODEL_DIR,
+                        allow_download: bool = None) -> torch.nn.Module:
+    """
+    Build a registered backbone with ImageNet weights from the artifact directory.
+
+    Raises:
+        FileNotFoundError: If the weights are missing and downloads are not allowed
+    """
+    spec = get_backbone(name)
+    path = os.path.join(model_dir, spec.weights_file)
+    if not os.path.exists(path):
+        if not downloads_allowed(allow_download):
+            raise FileNotFoundError(
+                f"Model weights not found at {path}; run 'python -m model_artifacts {name}' where network is available"
+            )
+        state_dict = spec.weights.get_state_dict(progress=False)
+        os.makedirs(model_dir, exist_ok=True)
+        torch.save(state_dict, path)
+
+    return spec.build(torch.load(path, map_location='cpu', weights_only=True))
+
+
+def fetch_artifacts(model_dir: str = MODEL_DIR, backbones=(DEFAULT_BACKBONE,)):
+    """Download the labels and the weights of the given backbones into model_dir"""
+    for name in backbones:
+        load_backbone_model(name, model_dir, allow_download=True)
+    load_imagenet_labels(model_dir, allow_download=True)
+
+
+def main():
+    backbones = sys.argv[1:] or [DEFAULT_BACKBONE]
+    if backbones == ['all']:
+        backbones = list(BACKBONES)
+    fetch_artifacts(backbones=backbones)
+    print(f"Model artifacts are in {MODEL_DIR}")
+
+
+if __name__ == "__main__":
+    main()
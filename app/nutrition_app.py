@@ -1,5 +1,6 @@
 import streamlit as st
 from nutrition_utils import load_nutrition_data
+from search_index import search_foods, autocomplete_foods
 import pandas as pd
 
 # Set page config
@@ -29,8 +30,8 @@ try:
     )
     
     if food_name:
-        # Search for the food (case-insensitive)
-        results = df[df['Food'].str.contains(food_name, case=False, na=False)]
+        # Search for the food (case-insensitive) through the trigram index
+        results = search_foods(food_name)
         
         if len(results) > 0:
             # Display the results
@@ -55,6 +56,9 @@ try:
                 st.divider()
         else:
             st.warning("No matching food items found. Try a different search term.")
+            suggestions = autocomplete_foods(food_name)
+            if suggestions:
+                st.caption("Suggestions: " + ", ".join(suggestions))
     
     # Show a sample of available foods
     with st.expander("View Available Foods"):
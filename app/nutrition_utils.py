@@ -1,140 +1,621 @@
 import pandas as pd
 import numpy as np
 import os
+import hashlib
+import threading
+from collections.abc import Mapping
 from pathlib import Path
 import streamlit as st
+from catalog_snapshot import SNAPSHOT_DIR, read_snapshot, write_snapshot
 
-def load_nutrition_data() -> pd.DataFrame:
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_NUTRITION_FILE = os.path.join(DATA_DIR, 'Indian_Food_Nutrition_Processed.csv')
+DISEASE_DIET_FILE = os.path.join(DATA_DIR, 'indian_disease_diet_nutrition.csv')
+GENERAL_NUTRITION_FILE = os.path.join(DATA_DIR, 'nutrition_data.csv')
+
+# Catalogs compiled into binary snapshots by build_catalog_snapshots()
+CATALOG_FILES = [DEFAULT_NUTRITION_FILE, DISEASE_DIET_FILE, GENERAL_NUTRITION_FILE]
+
+
+def _read_nutrition_csv(file_path: str) -> pd.DataFrame:
     """
-    Load and clean Indian food nutrition data from a CSV file.
+    Read a nutrition CSV and clean it into the standard catalog format.
     
-    Returns:
-        pd.DataFrame: Cleaned and standardized nutrition data
-        
     The function:
     1. Loads the CSV file
     2. Removes rows with null values
     3. Standardizes columns: 'Calories', 'Protein', 'Fat', 'Carbs'
     4. Renames columns to match standard format
     """
+    # Load the data
+    df = pd.read_csv(file_path)
+    
+    # Rename columns to standard format
+    column_mapping = {
+        'Dish Name': 'Food',
+        'Calories (kcal)': 'Calories',
+        'Protein (g)': 'Protein',
+        'Fats (g)': 'Fat',
+        'Carbohydrates (g)': 'Carbs'
+    }
+    df = df.rename(columns=column_mapping)
+    
+    # Select only the columns we need
+    columns_to_keep = ['Food', 'Calories', 'Protein', 'Fat', 'Carbs']
+    df = df[columns_to_keep]
+    
+    # Remove rows with null values
+    df = df.dropna()
+    
+    # Convert numeric columns to float
+    numeric_columns = ['Calories', 'Protein', 'Fat', 'Carbs']
+    for col in numeric_columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    # Remove any rows that became NaN after conversion
+    df = df.dropna(subset=numeric_columns)
+    
+    # Reset index after dropping rows
+    df = df.reset_index(drop=True)
+    
+    return df
+
+
+def _file_digest(file_path: str) -> str:
+    """Return the SHA-1 hex digest of a file's contents"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_catalog(file_path: str, digest: str, snapshot_dir: str = SNAPSHOT_DIR):
+    """
+    Load a cleaned catalog, preferring its binary snapshot.
+    
+    Returns:
+        tuple: (DataFrame, source) where source is 'snapshot' or 'csv'
+    """
     try:
-        # Get the directory of the current file
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(current_dir, 'Indian_Food_Nutrition_Processed.csv')
-        
-        # Load the data
-        df = pd.read_csv(file_path)
+        df = read_snapshot(file_path, digest, snapshot_dir)
+        if df is not None:
+            return df, 'snapshot'
+    except Exception as e:
+        print(f"Ignoring unreadable catalog snapshot for {file_path}: {str(e)}")
+    return _read_nutrition_csv(file_path), 'csv'
+
+
+def build_catalog_snapshots(files=None, snapshot_dir: str = SNAPSHOT_DIR) -> list:
+    """
+    Compile nutrition CSVs into binary snapshots.
+    
+    Args:
+        files (list): CSV files to compile (default: CATALOG_FILES)
+        snapshot_dir (str): Root directory for snapshots
         
-        # Rename columns to standard format
-        column_mapping = {
-            'Dish Name': 'Food',
-            'Calories (kcal)': 'Calories',
-            'Protein (g)': 'Protein',
-            'Fats (g)': 'Fat',
-            'Carbohydrates (g)': 'Carbs'
-        }
-        df = df.rename(columns=column_mapping)
+    Returns:
+        list: Directories the snapshots were written to
+    """
+    targets = []
+    for file_path in files or CATALOG_FILES:
+        df = _read_nutrition_csv(file_path)
+        targets.append(write_snapshot(df, file_path, _file_digest(file_path), snapshot_dir))
+    return targets
+
+
+class _CatalogEntry:
+    """A loaded catalog plus the file signature it was built from"""
+    
+    def __init__(self, df: pd.DataFrame, source: str, mtime_ns: int, size: int, digest: str, version: int):
+        self.df = df
+        self.source = source
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.version = version
+        # Structures derived from this version of the catalog (indexes, tables, ...)
+        self.derived = {}
+
+
+class NutritionCatalogCache:
+    """
+    Process-wide cache of cleaned nutrition catalogs, keyed by file path.
+    
+    Each catalog is loaded once and shared by every caller, from its binary
+    snapshot when a current one exists and from the CSV otherwise. A cheap
+    stat() on every access detects changes to the file's mtime or size; the
+    file is then re-hashed and only reloaded if its contents actually changed.
+    
+    The cached DataFrames are shared and must be treated as read-only. Use
+    load_nutrition_data() when a private, mutable copy is needed.
+    """
+    
+    def __init__(self, snapshot_dir: str = SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self._lock = threading.RLock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.snapshot_loads = 0
+    
+    def _entry(self, file_path: str) -> _CatalogEntry:
+        """Return an up-to-date cache entry for file_path, loading it if needed"""
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
         
-        # Select only the columns we need
-        columns_to_keep = ['Food', 'Calories', 'Protein', 'Fat', 'Carbs']
-        df = df[columns_to_keep]
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None:
+                if entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                    self.hits += 1
+                    return entry
+                
+                # The file was touched; only reload if its contents changed
+                digest = _file_digest(file_path)
+                if digest == entry.digest:
+                    entry.mtime_ns = stat.st_mtime_ns
+                    entry.size = stat.st_size
+                    self.hits += 1
+                    return entry
+                self.reloads += 1
+                version = entry.version + 1
+            else:
+                self.misses += 1
+                digest = _file_digest(file_path)
+                version = 1
+            
+            df, source = _load_catalog(file_path, digest, self.snapshot_dir)
+            if source == 'snapshot':
+                self.snapshot_loads += 1
+            entry = _CatalogEntry(
+                df,
+                source,
+                stat.st_mtime_ns,
+                stat.st_size,
+                digest,
+                version
+            )
+            self._entries[file_path] = entry
+            return entry
+    
+    def get(self, file_path: str = DEFAULT_NUTRITION_FILE) -> pd.DataFrame:
+        """Return the shared, read-only catalog for file_path"""
+        return self._entry(file_path).df
+    
+    def digest(self, file_path: str = DEFAULT_NUTRITION_FILE) -> str:
+        """Return the SHA-1 of the catalog file the cached catalog was loaded from"""
+        return self._entry(file_path).digest
+    
+    def versioned(self, file_path: str = DEFAULT_NUTRITION_FILE) -> tuple:
+        """
+        Return the digest and the catalog of one cached version together.
         
-        # Remove rows with null values
-        df = df.dropna()
+        Reading both from the same entry guarantees the digest describes
+        exactly this DataFrame, even if the file is reloaded concurrently.
         
-        # Convert numeric columns to float
-        numeric_columns = ['Calories', 'Protein', 'Fat', 'Carbs']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        Returns:
+            tuple: (digest, df)
+        """
+        entry = self._entry(file_path)
+        return entry.digest, entry.df
+    
+    def derived(self, key: str, factory, file_path: str = DEFAULT_NUTRITION_FILE):
+        """
+        Return a structure derived from a catalog, building it on first use.
         
-        # Remove any rows that became NaN after conversion
-        df = df.dropna(subset=numeric_columns)
+        Derived structures are memoized per catalog version, so they are
+        rebuilt automatically after the underlying file is reloaded.
         
-        # Reset index after dropping rows
-        df = df.reset_index(drop=True)
+        Args:
+            key (str): Name of the derived structure
+            factory: Callable taking the catalog DataFrame and returning the structure
+            file_path (str): Catalog file the structure is derived from
+        """
+        entry = self._entry(file_path)
+        with self._lock:
+            if key not in entry.derived:
+                entry.derived[key] = factory(entry.df)
+            return entry.derived[key]
+    
+    def stats(self) -> dict:
+        """Return hit/miss/reload counters for the cache"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'snapshot_loads': self.snapshot_loads,
+                'entries': len(self._entries)
+            }
+    
+    def clear(self):
+        """Drop all cached catalogs and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.reloads = 0
+            self.snapshot_loads = 0
+
+
+# Shared by every module in the process
+catalog_cache = NutritionCatalogCache()
+
+
+def get_nutrition_catalog(file_path: str = DEFAULT_NUTRITION_FILE) -> pd.DataFrame:
+    """
+    Get the shared nutrition catalog.
+    
+    The returned DataFrame is cached process-wide and must not be modified.
+    Falls back to a small built-in catalog if the file cannot be loaded.
+    """
+    try:
+        return catalog_cache.get(file_path)
+    except Exception as e:
+        print(f"Error loading nutrition data: {str(e)}")
+        return _fallback_nutrition_data()
+
+
+def catalog_cache_stats() -> dict:
+    """Return hit/miss/reload counters for the shared nutrition catalog cache"""
+    return catalog_cache.stats()
+
+
+def _fallback_nutrition_data() -> pd.DataFrame:
+    """Basic DataFrame with some common Indian foods"""
+    return pd.DataFrame({
+        'Food': ['Idli', 'Dosa', 'Sambar', 'Upma', 'Poha'],
+        'Calories': [39, 133, 90, 150, 250],
+        'Protein': [1.9, 3.7, 4.5, 4.0, 6.0],
+        'Fat': [0.2, 3.9, 2.0, 3.0, 2.0],
+        'Carbs': [7.8, 22.0, 12.0, 25.0, 45.0]
+    })
+
+
+def load_nutrition_data(file_path: str = DEFAULT_NUTRITION_FILE) -> pd.DataFrame:
+    """
+    Load and clean Indian food nutrition data from a CSV file.
+    
+    Args:
+        file_path (str): CSV file to load (default: the bundled Indian food catalog)
+    
+    Returns:
+        pd.DataFrame: Cleaned and standardized nutrition data
         
-        return df
+    The data comes from the shared catalog cache, so the CSV is only parsed
+    again when the file changes. The returned DataFrame is a private copy
+    that the caller may modify.
+    """
+    try:
+        return catalog_cache.get(file_path).copy()
     except Exception as e:
         print(f"Error loading nutrition data: {str(e)}")
         # Return a basic DataFrame with some common Indian foods as fallback
-        return pd.DataFrame({
-            'Food': ['Idli', 'Dosa', 'Sambar', 'Upma', 'Poha'],
-            'Calories': [39, 133, 90, 150, 250],
-            'Protein': [1.9, 3.7, 4.5, 4.0, 6.0],
-            'Fat': [0.2, 3.9, 2.0, 3.0, 2.0],
-            'Carbs': [7.8, 22.0, 12.0, 25.0, 45.0]
-        })
+        return _fallback_nutrition_data()
+
+class NutritionRecord(Mapping):
+    """
+    Nutrition values for a single food.
+    
+    A lightweight read-only mapping with the same keys as the dicts returned
+    by get_nutrition_info() before, so it can be indexed, passed to
+    assess_health_impact() or turned into a DataFrame row unchanged.
+    """
+    
+    __slots__ = ('name', 'calories', 'protein', 'fat', 'carbs')
+    
+    def __init__(self, name: str, calories: float, protein: float, fat: float, carbs: float):
+        self.name = name
+        self.calories = calories
+        self.protein = protein
+        self.fat = fat
+        self.carbs = carbs
+    
+    def __getitem__(self, key):
+        if key in NutritionRecord.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return iter(NutritionRecord.__slots__)
+    
+    def __len__(self):
+        return len(NutritionRecord.__slots__)
+    
+    def __repr__(self):
+        return f"NutritionRecord({dict(self)!r})"
+
+
+class NutritionTable:
+    """
+    Compact, array-backed nutrition catalog.
+    
+    Nutrient values are stored as NumPy float32 columns and food names are
+    indexed by their lowercased form, so a lookup by name is a single dict
+    probe instead of a scan over the whole catalog. When a name occurs more
+    than once, the first row wins, as with the previous DataFrame filter.
+    """
+    
+    NUTRIENT_COLUMNS = ['Calories', 'Protein', 'Fat', 'Carbs']
+    
+    def __init__(self, names, calories, protein, fat, carbs):
+        self.names = np.asarray(names, dtype=object)
+        self.calories = np.asarray(calories, dtype=np.float32)
+        self.protein = np.asarray(protein, dtype=np.float32)
+        self.fat = np.asarray(fat, dtype=np.float32)
+        self.carbs = np.asarray(carbs, dtype=np.float32)
+        
+        # Normalized name -> first row with that name
+        self.name_index = {}
+        for row, name in enumerate(self.names):
+            self.name_index.setdefault(name.lower(), row)
+        # Built on first batch lookup
+        self._key_index = None
+        self._key_rows = None
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'NutritionTable':
+        """Build a table from a cleaned nutrition DataFrame"""
+        return cls(
+            df['Food'].to_numpy(dtype=object),
+            df['Calories'].to_numpy(),
+            df['Protein'].to_numpy(),
+            df['Fat'].to_numpy(),
+            df['Carbs'].to_numpy()
+        )
+    
+    def __len__(self):
+        return len(self.names)
+    
+    @property
+    def key_index(self) -> pd.Index:
+        """pd.Index over the normalized names, aligned with key_rows"""
+        if self._key_index is None:
+            self._key_rows = np.fromiter(self.name_index.values(), dtype=np.int64, count=len(self.name_index))
+            self._key_index = pd.Index(list(self.name_index.keys()), dtype=object)
+        return self._key_index
+    
+    def find_many(self, food_names) -> np.ndarray:
+        """
+        Resolve many names (case-insensitive) in one vectorized join.
+        
+        Returns:
+            np.ndarray: Row for each name, or -1 where the name is not in the catalog
+        """
+        keys = pd.Series(food_names, dtype=object).str.lower()
+        positions = self.key_index.get_indexer(keys)
+        return np.where(positions >= 0, self._key_rows[positions], -1)
+    
+    def find(self, food_name: str) -> int:
+        """Return the row for food_name (case-insensitive), or -1 if absent"""
+        return self.name_index.get(food_name.lower(), -1)
+    
+    def record(self, row: int) -> NutritionRecord:
+        """Return the nutrition record stored at a row"""
+        # str() gives the shortest decimal that round-trips the float32 value,
+        # so 2.7 reads back as 2.7 rather than 2.700000047683716
+        return NutritionRecord(
+            self.names[row],
+            float(str(self.calories[row])),
+            float(str(self.protein[row])),
+            float(str(self.fat[row])),
+            float(str(self.carbs[row]))
+        )
+    
+    def lookup(self, food_name: str) -> NutritionRecord:
+        """Return the record for food_name (case-insensitive), or None if absent"""
+        row = self.name_index.get(food_name.lower())
+        if row is None:
+            return None
+        return self.record(row)
+
 
-def get_nutrition_info(food_name: str) -> dict:
+def get_nutrition_table(file_path: str = DEFAULT_NUTRITION_FILE) -> NutritionTable:
+    """
+    Get the shared NutritionTable for a catalog.
+    
+    The table is built once per catalog version and rebuilt automatically
+    when the catalog file changes.
+    """
+    try:
+        return catalog_cache.derived('nutrition_table', NutritionTable.from_frame, file_path)
+    except Exception as e:
+        print(f"Error loading nutrition data: {str(e)}")
+        return NutritionTable.from_frame(_fallback_nutrition_data())
+
+
+def get_nutrition_info(food_name: str) -> NutritionRecord:
     """
     Get nutrition information for a specific food
     """
     try:
-        df = load_nutrition_data()
-        food_data = df[df['Food'].str.lower() == food_name.lower()]
-        
-        if not food_data.empty:
-            return {
-                'name': food_data['Food'].iloc[0],
-                'calories': float(food_data['Calories'].iloc[0]),
-                'protein': float(food_data['Protein'].iloc[0]),
-                'fat': float(food_data['Fat'].iloc[0]),
-                'carbs': float(food_data['Carbs'].iloc[0])
-            }
-        return None
+        return get_nutrition_table().lookup(food_name)
     except Exception as e:
         st.error(f"Error getting nutrition info: {str(e)}")
         return None
 
+def get_nutrition_info_many(food_names) -> dict:
+    """
+    Get nutrition information for many foods at once, e.g. a meal or day log.
+    
+    Names are resolved case-insensitively in one vectorized join against the
+    catalog; repeated names count once per occurrence.
+    
+    Args:
+        food_names: Sequence of food names
+        
+    Returns:
+        dict containing:
+        - items: DataFrame with one row per matched name, in input order
+          (query, name, calories, protein, fat, carbs)
+        - totals: Dictionary with summed calories, protein, fat and carbs
+        - unmatched: List of names not found in the catalog
+    """
+    table = get_nutrition_table()
+    food_names = list(food_names)
+    rows = table.find_many(food_names)
+    matched = rows >= 0
+    matched_rows = rows[matched]
+    
+    items = pd.DataFrame({
+        'query': np.asarray(food_names, dtype=object)[matched],
+        'name': table.names[matched_rows],
+        'calories': table.calories[matched_rows],
+        'protein': table.protein[matched_rows],
+        'fat': table.fat[matched_rows],
+        'carbs': table.carbs[matched_rows]
+    })
+    totals = {
+        nutrient: round(float(np.sum(items[nutrient].to_numpy(), dtype=np.float64)), 2)
+        for nutrient in ['calories', 'protein', 'fat', 'carbs']
+    }
+    unmatched = [name for name, found in zip(food_names, matched) if not found]
+    
+    return {
+        'items': items,
+        'totals': totals,
+        'unmatched': unmatched
+    }
+
+
+# Health impact messages per category, indexed by impact code
+IMPACT_MESSAGES = {
+    'Calorie Content': (
+        "Low calorie content, good for weight management",
+        "Moderate calorie content, suitable for regular consumption",
+        "High calorie content, consume in moderation"
+    ),
+    'Protein Content': (
+        "High protein content, good for muscle building and satiety",
+        "Moderate protein content, contributes to daily protein needs",
+        "Low protein content, consider pairing with protein-rich foods"
+    ),
+    'Fat Content': (
+        "Low fat content, good for heart health",
+        "Moderate fat content, provides essential fatty acids",
+        "High fat content, consume in moderation"
+    ),
+    'Carbohydrate Content': (
+        "Low carbohydrate content, suitable for low-carb diets",
+        "Moderate carbohydrate content, provides energy",
+        "High carbohydrate content, good for energy but monitor intake"
+    ),
+    'Overall Health Impact': (
+        "Positive: This food is generally healthy and nutritious",
+        "Moderate: This food can be part of a balanced diet",
+        "Caution: Consume in moderation and balance with other foods"
+    )
+}
+IMPACT_CATEGORIES = list(IMPACT_MESSAGES)
+
+
 def assess_health_impact(nutrition_info):
     """
     Assess the health impact of a food item based on its nutritional values.
     Returns a dictionary of health impacts and their descriptions.
     """
-    impacts = {}
-    
-    # Calorie assessment
     calories = nutrition_info.get('calories', 0)
-    if calories < 200:
-        impacts['Calorie Content'] = "Low calorie content, good for weight management"
-    elif calories < 400:
-        impacts['Calorie Content'] = "Moderate calorie content, suitable for regular consumption"
-    else:
-        impacts['Calorie Content'] = "High calorie content, consume in moderation"
-    
-    # Protein assessment
     protein = nutrition_info.get('protein', 0)
-    if protein > 15:
-        impacts['Protein Content'] = "High protein content, good for muscle building and satiety"
-    elif protein > 8:
-        impacts['Protein Content'] = "Moderate protein content, contributes to daily protein needs"
-    else:
-        impacts['Protein Content'] = "Low protein content, consider pairing with protein-rich foods"
-    
-    # Fat assessment
     fat = nutrition_info.get('fat', 0)
-    if fat < 5:
-        impacts['Fat Content'] = "Low fat content, good for heart health"
-    elif fat < 15:
-        impacts['Fat Content'] = "Moderate fat content, provides essential fatty acids"
-    else:
-        impacts['Fat Content'] = "High fat content, consume in moderation"
-    
-    # Carbohydrate assessment
     carbs = nutrition_info.get('carbs', 0)
-    if carbs < 20:
-        impacts['Carbohydrate Content'] = "Low carbohydrate content, suitable for low-carb diets"
-    elif carbs < 40:
-        impacts['Carbohydrate Content'] = "Moderate carbohydrate content, provides energy"
-    else:
-        impacts['Carbohydrate Content'] = "High carbohydrate content, good for energy but monitor intake"
+    
+    codes = {
+        'Calorie Content': 0 if calories < 200 else 1 if calories < 400 else 2,
+        'Protein Content': 0 if protein > 15 else 1 if protein > 8 else 2,
+        'Fat Content': 0 if fat < 5 else 1 if fat < 15 else 2,
+        'Carbohydrate Content': 0 if carbs < 20 else 1 if carbs < 40 else 2
+    }
     
     # Overall health impact
     if calories < 300 and protein > 10 and fat < 10:
-        impacts['Overall Health Impact'] = "Positive: This food is generally healthy and nutritious"
+        codes['Overall Health Impact'] = 0
     elif calories < 500 and protein > 8 and fat < 15:
-        impacts['Overall Health Impact'] = "Moderate: This food can be part of a balanced diet"
+        codes['Overall Health Impact'] = 1
     else:
-        impacts['Overall Health Impact'] = "Caution: Consume in moderation and balance with other foods"
+        codes['Overall Health Impact'] = 2
+    
+    return impact_messages(codes)
+
+
+def _nutrient_column(data, name: str, n_rows: int) -> np.ndarray:
+    """Get a nutrient column by catalog ('Calories') or record ('calories') name"""
+    for key in (name, name.lower()):
+        if key in data:
+            return np.asarray(data[key], dtype=np.float64)
+    # Missing nutrients count as 0, like nutrition_info.get(..., 0)
+    return np.zeros(n_rows)
+
+
+def assess_health_impact_batch(data) -> pd.DataFrame:
+    """
+    Assess the health impact of many foods at once.
+    
+    Vectorized equivalent of assess_health_impact(): instead of message text
+    it returns one small integer code per category, indexing into
+    IMPACT_MESSAGES (0 = best, 2 = consume in moderation).
     
-    return impacts
+    Args:
+        data: DataFrame or dict of equal-length arrays with Calories, Protein,
+            Fat and Carbs columns (catalog or lowercase record names)
+            
+    Returns:
+        pd.DataFrame: int8 impact codes, one column per category in
+        IMPACT_CATEGORIES, aligned with the input rows
+    """
+    index = data.index if isinstance(data, pd.DataFrame) else None
+    n_rows = len(data) if index is not None else len(next(iter(data.values())))
+    
+    calories = _nutrient_column(data, 'Calories', n_rows)
+    protein = _nutrient_column(data, 'Protein', n_rows)
+    fat = _nutrient_column(data, 'Fat', n_rows)
+    carbs = _nutrient_column(data, 'Carbs', n_rows)
+    
+    def grade(best, moderate):
+        # 0 where best holds, else 1 where moderate holds, else 2
+        return np.where(best, 0, np.where(moderate, 1, 2)).astype(np.int8)
+    
+    codes = {
+        'Calorie Content': grade(calories < 200, calories < 400),
+        'Protein Content': grade(protein > 15, protein > 8),
+        'Fat Content': grade(fat < 5, fat < 15),
+        'Carbohydrate Content': grade(carbs < 20, carbs < 40),
+        'Overall Health Impact': grade(
+            (calories < 300) & (protein > 10) & (fat < 10),
+            (calories < 500) & (protein > 8) & (fat < 15)
+        )
+    }
+    return pd.DataFrame(codes, index=index)
+
+
+def impact_messages(codes) -> dict:
+    """
+    Turn one row of impact codes into the assess_health_impact() dictionary.
+    
+    Args:
+        codes: Mapping (dict, Series or DataFrame row) from category to impact code
+    """
+    return {category: IMPACT_MESSAGES[category][int(codes[category])] for category in IMPACT_CATEGORIES}
+
+
+def decode_impact_codes(codes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn a frame of impact codes into message text.
+    
+    Each column becomes a Categorical over its message tuple, so decoding
+    does not build a string per row.
+    """
+    return pd.DataFrame({
+        category: pd.Categorical.from_codes(codes[category], categories=IMPACT_MESSAGES[category])
+        for category in IMPACT_CATEGORIES
+    }, index=codes.index)
+
+
+def get_catalog_health_impacts(file_path: str = DEFAULT_NUTRITION_FILE) -> pd.DataFrame:
+    """
+    Get precomputed impact codes for every food in a catalog.
+    
+    Computed once per catalog version; rows line up with get_nutrition_catalog().
+    """
+    return catalog_cache.derived('health_impacts', assess_health_impact_batch, file_path)
@@ -0,0 +1,225 @@
+"""
+Recognition result cache for near-duplicate images.
+
+Re-encoded, resized or recompressed copies of a photo have different bytes
+but almost the same difference hash (dHash): a 64-bit fingerprint of
+whether each pixel of a 9x8 grayscale thumbnail is brighter than its
+right neighbour. Two images are treated as the same photo when their
+hashes differ in at most max_distance bits.
+
+Lookups use a multi-index hash: the 64 bits are split into
+max_distance + 1 chunks, and by the pigeonhole principle any hash within
+max_distance bits agrees exactly with the query on at least one chunk.
+Each chunk has its own table, so a lookup only compares the query with
+hashes sharing a chunk instead of scanning the cache.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+CACHE_VERSION = 1
+HASH_BITS = 64
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    Difference hash of an image.
+
+    Args:
+        image (Image.Image): Image to fingerprint
+        hash_size (int): Thumbnail height; the hash has hash_size**2 bits (default: 8)
+
+    Returns:
+        int: The hash as an unsigned integer
+    """
+    thumbnail = image.convert('L').resize((hash_size + 1, hash_size), Image.BOX)
+    pixels = thumbnail.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits"""
+    return bin(a ^ b).count('1')
+
+
+class PerceptualCache:
+    """
+    Bounded LRU map from image hashes to recognition results, matched by
+    Hamming distance.
+
+    Args:
+        max_distance (int): Largest Hamming distance counted as the same photo (default: 6)
+        maxsize (int): Most entries kept; least recently used are evicted (default: 1024)
+        path (str): Optional JSON file the cache is loaded from and saved to
+        signature: Identifies the model; a saved cache with another signature is ignored
+        save_every (int): With a path, save after this many new results (default: 32)
+    """
+
+    def __init__(self, max_distance: int = 6, maxsize: int = 1024, path: str = None, signature=None,
+                 save_every: int = 32):
+        self.max_distance = max_distance
+        self.maxsize = maxsize
+        self.path = path
+        self.signature = signature
+        self.save_every = save_every
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+        # Chunk boundaries covering all HASH_BITS bits
+        chunks = max_distance + 1
+        bounds = [round(i * HASH_BITS / chunks) for i in range(chunks + 1)]
+        self._chunks = [(low, (1 << (high - low)) - 1) for low, high in zip(bounds, bounds[1:])]
+
+        self._entries = OrderedDict()
+        self._tables = [{} for _ in self._chunks]
+        self.lookups = 0
+        self.hits = 0
+        self.saved_seconds = 0.0
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _keys(self, value: int):
+        return [(value >> shift) & mask for shift, mask in self._chunks]
+
+    def _find(self, value: int):
+        """Closest stored hash within max_distance, or None"""
+        if value in self._entries:
+            return value
+        best, best_distance = None, self.max_distance + 1
+        seen = set()
+        for table, key in zip(self._tables, self._keys(value)):
+            for candidate in table.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = hamming(value, candidate)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+        return best
+
+    def get(self, value: int, default=None):
+        """
+        Look up the result stored for the closest matching hash.
+
+        Returns:
+            The stored result, or default if no hash is within max_distance
+        """
+        with self._lock:
+            self.lookups += 1
+            match = self._find(value)
+            if match is None:
+                return default
+            self._entries.move_to_end(match)
+            result, seconds = self._entries[match]
+            self.hits += 1
+            self.saved_seconds += seconds
+            return result
+
+    def put(self, value: int, result, seconds: float = 0.0):
+        """
+        Store a result under a hash.
+
+        Args:
+            value (int): Image hash
+            result: Recognition result (must be JSON serializable to persist)
+            seconds (float): Time it took to compute, credited on every later hit
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._insert(value, result, seconds)
+            self._unsaved += 1
+            save = self.path and self._unsaved >= self.save_every
+        if save:
+            self.save()
+
+    def _insert(self, value: int, result, seconds: float):
+        """Store an entry and evict beyond maxsize; the caller holds the lock"""
+        if value not in self._entries:
+            for table, key in zip(self._tables, self._keys(value)):
+                table.setdefault(key, set()).add(value)
+        self._entries[value] = (result, seconds)
+        self._entries.move_to_end(value)
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            for table, key in zip(self._tables, self._keys(evicted)):
+                bucket = table[key]
+                bucket.discard(evicted)
+                if not bucket:
+                    del table[key]
+
+    def clear(self):
+        """Drop every entry, including the saved file; metrics are kept"""
+        with self._lock:
+            self._entries.clear()
+            self._tables = [{} for _ in self._chunks]
+            self._unsaved = 0
+        if self.path:
+            with self._save_lock:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+
+    def stats(self) -> dict:
+        """Lookups, hits, hit rate, inference seconds saved by hits, and size"""
+        with self._lock:
+            return {
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+                'saved_seconds': self.saved_seconds,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+
+    def save(self, path: str = None):
+        """Write the entries, least recently used first, to a JSON file"""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            self._unsaved = 0
+            data = {
+                'version': CACHE_VERSION,
+                'signature': self.signature,
+                'max_distance': self.max_distance,
+                'entries': [[f"{value:016x}", result, seconds] for value, (result, seconds) in self._entries.items()]
+            }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._save_lock:
+            with open(path + '.tmp', 'w') as f:
+                json.dump(data, f)
+            os.replace(path + '.tmp', path)
+
+    def load(self, path: str = None) -> int:
+        """
+        Add the entries saved in a JSON file.
+
+        Returns:
+            int: Entries loaded; 0 if the file is unreadable or from another model
+        """
+        path = path or self.path
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('version') != CACHE_VERSION or data.get('signature') != self.signature:
+            return 0
+        entries = data.get('entries', [])
+        if self.maxsize <= 0:
+            return 0
+        with self._lock:
+            for value, result, seconds in entries:
+                self._insert(int(value, 16), result, seconds)
+        return len(entries)
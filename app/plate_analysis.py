@@ -0,0 +1,148 @@
+"""
+Tiling and detection merging for multi-dish plate (thali) photos.
+
+A single center crop only sees one dish. For a plate, the image is cut
+into tiles at increasing grid sizes:
+
+    level 1   the whole image
+    level 2   2 x 2 sliding windows
+    level 3   3 x 3 sliding windows
+    ...
+
+Windows of one level overlap by `overlap` of their side, and within a
+level the tiles nearest the center come first. Tiles are run coarse to
+fine, so truncating the list to what a latency budget affords still
+covers the whole plate, just at a coarser scale.
+
+Each tile yields at most one dish detection. Detections of the same dish
+whose tiles overlap are one item; the same dish in separate parts of the
+plate is reported as separate items. The whole-image tile overlaps every
+other tile, so it never links detections; it only makes an item of a dish
+no finer tile found.
+"""
+
+
+def plate_tiles(width: int, height: int, max_grid: int = 3, overlap: float = 0.25) -> list:
+    """
+    Tile boxes for an image, coarse to fine.
+
+    Args:
+        width (int): Image width
+        height (int): Image height
+        max_grid (int): Finest grid (max_grid x max_grid windows) (default: 3)
+        overlap (float): Fraction of a window shared with its neighbour (default: 0.25)
+
+    Returns:
+        list: (left, top, right, bottom) boxes
+    """
+    boxes = []
+    for grid in range(1, max_grid + 1):
+        # Window size such that `grid` windows with the overlap span the side
+        span = grid - (grid - 1) * overlap
+        tile_width, tile_height = width / span, height / span
+        step_x, step_y = tile_width * (1 - overlap), tile_height * (1 - overlap)
+        level = []
+        for row in range(grid):
+            for col in range(grid):
+                left, top = round(col * step_x), round(row * step_y)
+                level.append((left, top, min(width, round(left + tile_width)), min(height, round(top + tile_height))))
+        center_x, center_y = width / 2, height / 2
+        level.sort(key=lambda box: ((box[0] + box[2]) / 2 - center_x) ** 2 + ((box[1] + box[3]) / 2 - center_y) ** 2)
+        boxes.extend(level)
+    return boxes
+
+
+def boxes_overlap(a: tuple, b: tuple) -> bool:
+    """Whether two (left, top, right, bottom) boxes share any area"""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def merge_detections(detections: list, image_box: tuple = None) -> list:
+    """
+    Merge per-tile detections into plate items.
+
+    Detections of the same dish are grouped into connected components of
+    overlapping tiles; each component is one item.
+
+    Args:
+        detections (list): (box, dish, confidence) per tile that found a dish
+        image_box (tuple): Box of the whole-image tile; its detections are
+            kept only for dishes that no finer tile detected
+
+    Returns:
+        list: Items as dicts with food_name, confidence (highest of its
+        tiles), tiles (count) and box (bounding box of its tiles), most
+        confident first
+    """
+    by_dish = {}
+    for box, dish, confidence in detections:
+        by_dish.setdefault(dish, []).append((box, confidence))
+
+    items = []
+    for dish, found in by_dish.items():
+        # Linking through the whole image would merge separate servings
+        finer = [detection for detection in found if detection[0] != image_box]
+        if finer:
+            found = finer
+        unvisited = list(range(len(found)))
+        while unvisited:
+            component = [unvisited.pop(0)]
+            for i in component:
+                linked = [j for j in unvisited if boxes_overlap(found[i][0], found[j][0])]
+                for j in linked:
+                    unvisited.remove(j)
+                component.extend(linked)
+            boxes = [found[i][0] for i in component]
+            items.append({
+                'food_name': dish,
+                'confidence': max(found[i][1] for i in component),
+                'tiles': len(component),
+                'box': (
+                    min(box[0] for box in boxes), min(box[1] for box in boxes),
+                    max(box[2] for box in boxes), max(box[3] for box in boxes)
+                )
+            })
+    items.sort(key=lambda item: -item['confidence'])
+    return items
+
+
+class TileBudget:
+    """
+    Running estimates of the seconds one tile costs (crop, transform and
+    its share of the forward pass) and of the fixed cost of a request
+    (decoding, merging, nutrition lookup), used to decide how many tiles
+    fit in the time left.
+
+    Args:
+        smoothing (float): Weight of the newest measurement (default: 0.3)
+    """
+
+    def __init__(self, smoothing: float = 0.3):
+        self.smoothing = smoothing
+        self.seconds_per_tile = None
+        self.overhead_seconds = 0.0
+
+    def _smooth(self, estimate, measured: float) -> float:
+        return measured if estimate is None else estimate + self.smoothing * (measured - estimate)
+
+    def observe(self, tiles: int, seconds: float):
+        """Record that a batch of tiles took this long"""
+        if tiles > 0:
+            self.seconds_per_tile = self._smooth(self.seconds_per_tile, seconds / tiles)
+
+    def observe_overhead(self, seconds: float):
+        """Record the time a request spent outside its tile batches"""
+        self.overhead_seconds = self._smooth(self.overhead_seconds, seconds)
+
+    def affordable(self, remaining_seconds: float) -> int:
+        """
+        Tiles expected to finish within the remaining time, leaving the
+        request's fixed cost.
+
+        Before anything is measured a single tile is allowed, so the first
+        batch calibrates the estimate.
+        """
+        remaining_seconds -= self.overhead_seconds
+        if self.seconds_per_tile is None:
+            return 1 if remaining_seconds > 0 else 0
+        return max(0, int(remaining_seconds / self.seconds_per_tile))
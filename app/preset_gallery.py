@@ -0,0 +1,289 @@
+"""
+Preset image gallery as one normalized feature matrix.
+
+Each preset image contributes one L2-normalized row, so the cosine
+similarity of a query against every preset is a single matrix-vector
+product. The matrix is persisted next to the model artifacts:
+
+    preset_gallery.npy      (n_presets, dim) float32 or float16 matrix
+    preset_gallery.json     labels, source file signatures, model signature
+    preset_index.npz        optional nearest-neighbour index (see ann_index)
+
+and sync() only embeds preset images that are new or changed since the
+gallery was saved.
+"""
+import copy
+import hashlib
+import json
+import os
+from pathlib import Path
+import numpy as np
+from ann_index import build_index, load_index
+
+GALLERY_VERSION = 1
+GALLERY_FILE = 'preset_gallery.npy'
+GALLERY_META_FILE = 'preset_gallery.json'
+GALLERY_INDEX_FILE = 'preset_index.npz'
+PRESET_EXTENSIONS = ('.jpg',)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows; all-zero rows stay zero"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def file_signature(path) -> list:
+    """Cheap change detector for a file: [mtime_ns, size]"""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class PresetGallery:
+    """
+    Labelled, pre-normalized feature matrix with top-k cosine search.
+
+    Rows are appended in place (amortized, like a list) so adding a preset
+    never re-embeds the others.
+
+    Small galleries are scanned exactly. For large reference galleries,
+    build_index() attaches an approximate nearest-neighbour index that
+    search() uses instead; new rows are inserted into it as they are added
+    and removed rows are dropped from it.
+    """
+
+    def __init__(self, dim: int = None, dtype=np.float32, model_signature=None):
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.model_signature = model_signature
+        self.labels = []
+        self.sources = []
+        self._matrix = np.empty((0, dim or 0), dtype=self.dtype)
+        self._size = 0
+        self.index = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """The (n_presets, dim) normalized matrix"""
+        return self._matrix[:self._size]
+
+    def add(self, label: str, vector, source: dict = None):
+        """
+        Append one preset.
+
+        Args:
+            label (str): Food name the preset stands for
+            vector: Feature vector of the preset image
+            source (dict): Optional {'path': ..., 'signature': ...} for sync()
+        """
+        row = _normalize(np.ravel(np.asarray(vector)))[0]
+        if self.dim is None:
+            self.dim = len(row)
+            self._matrix = np.empty((0, self.dim), dtype=self.dtype)
+        if len(row) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dimensional vector, got {len(row)}")
+
+        if self._size == len(self._matrix):
+            grown = np.empty((max(8, 2 * len(self._matrix)), self.dim), dtype=self.dtype)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size] = row
+        if self.index is not None:
+            self.index.add(row[None, :], [self._size])
+        self._size += 1
+        self.labels.append(label)
+        self.sources.append(source)
+
+    def copy(self):
+        """
+        Independent copy (matrix, labels and index).
+
+        Galleries are not locked: to change one that other threads search,
+        change a copy and then replace the shared reference with it.
+        """
+        return copy.deepcopy(self)
+
+    def digest(self) -> str:
+        """Fingerprint of the presets (model, labels and source files), to key results that depend on them"""
+        state = [self.model_signature, self.labels, self.sources]
+        return hashlib.sha1(json.dumps(state).encode()).hexdigest()
+
+    def build_index(self, kind: str = 'ivf_flat', **params):
+        """
+        Attach a nearest-neighbour index over the current rows.
+
+        Args:
+            kind (str): 'ivf_flat' (default) or 'exact', see ann_index.build_index
+            **params: Index options such as n_lists and n_probe
+        """
+        self.index = build_index(self.matrix, kind, dtype=self.dtype, **params)
+
+    def remove(self, positions):
+        """
+        Drop presets by position.
+
+        An attached index keeps its structure and only loses the removed
+        rows; it is discarded when no rows are left, since the next rows
+        may come from another model.
+        """
+        keep = np.setdiff1d(np.arange(self._size), np.asarray(list(positions), dtype=np.int64))
+        if self.index is not None and len(keep) < self._size:
+            if len(keep) == 0:
+                self.index = None
+            else:
+                # Row ids shift down past the removed positions
+                mapping = np.full(self._size, -1, dtype=np.int64)
+                mapping[keep] = np.arange(len(keep))
+                self.index.remap_ids(mapping)
+        self._matrix = np.ascontiguousarray(self.matrix[keep])
+        self._size = len(keep)
+        self.labels = [self.labels[i] for i in keep]
+        self.sources = [self.sources[i] for i in keep]
+
+    def search(self, vector, k: int = 1) -> list:
+        """
+        Find the presets most similar to a feature vector.
+
+        Args:
+            vector: Query feature vector (any shape with dim elements)
+            k (int): Number of presets to return (default: 1)
+
+        Returns:
+            list: (label, cosine similarity) pairs, most similar first
+        """
+        if self._size == 0 or k <= 0:
+            return []
+        if self.index is not None:
+            scores, rows = self.index.search(np.ravel(np.asarray(vector, dtype=np.float32)), k)
+            return [(self.labels[i], float(score)) for score, i in zip(scores[0], rows[0]) if i >= 0]
+        query = _normalize(np.ravel(np.asarray(vector, dtype=np.float32)))[0]
+        scores = self.matrix.astype(np.float32, copy=False) @ query
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+        else:
+            top = np.argsort(-scores, kind='stable')
+        return [(self.labels[i], float(scores[i])) for i in top]
+
+    def best_match(self, vector) -> tuple:
+        """Return (label, similarity) of the closest preset, or (None, 0.0)"""
+        matches = self.search(vector, k=1)
+        return matches[0] if matches else (None, 0.0)
+
+    def sync(self, preset_dir, embed, model_signature=None) -> int:
+        """
+        Bring the gallery in line with the images in preset_dir.
+
+        Images that are new or changed since they were added are embedded
+        with embed(path); presets whose file disappeared are dropped. If the
+        model changed, everything is re-embedded.
+
+        Args:
+            preset_dir: Directory of <food name>.jpg images
+            embed: Callable returning a feature vector for an image path
+            model_signature: Identifies the model the features came from
+
+        Returns:
+            int: Number of images embedded
+        """
+        if model_signature != self.model_signature:
+            self.remove(range(self._size))
+            self.model_signature = model_signature
+
+        files = {}
+        for path in sorted(Path(preset_dir).iterdir()):
+            if path.suffix.lower() in PRESET_EXTENSIONS:
+                files[path.name] = path
+
+        stale = []
+        known = set()
+        for position, source in enumerate(self.sources):
+            if source is None:
+                continue
+            path = files.get(source['path'])
+            if path is None or file_signature(path) != source['signature']:
+                stale.append(position)
+            else:
+                known.add(source['path'])
+        if stale:
+            self.remove(stale)
+
+        embedded = 0
+        for name, path in files.items():
+            if name in known:
+                continue
+            vector = embed(path)
+            if vector is None:
+                continue
+            self.add(path.stem, vector, {'path': name, 'signature': file_signature(path)})
+            embedded += 1
+        return embedded
+
+    def save(self, directory):
+        """Write the matrix and metadata, replacing the previous files atomically"""
+        os.makedirs(directory, exist_ok=True)
+        matrix_path = os.path.join(directory, GALLERY_FILE)
+        meta_path = os.path.join(directory, GALLERY_META_FILE)
+
+        with open(matrix_path + '.tmp', 'wb') as f:
+            np.save(f, self.matrix)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({
+                'version': GALLERY_VERSION,
+                'dim': self.dim,
+                'dtype': self.dtype.name,
+                'model_signature': self.model_signature,
+                'labels': self.labels,
+                'sources': self.sources
+            }, f)
+        os.replace(matrix_path + '.tmp', matrix_path)
+        os.replace(meta_path + '.tmp', meta_path)
+
+        index_path = os.path.join(directory, GALLERY_INDEX_FILE)
+        if self.index is not None:
+            with open(index_path + '.tmp', 'wb') as f:
+                self.index.save(f)
+            os.replace(index_path + '.tmp', index_path)
+        elif os.path.exists(index_path):
+            os.remove(index_path)
+
+    @classmethod
+    def load(cls, directory, dtype=np.float32):
+        """
+        Read a saved gallery.
+
+        Returns:
+            PresetGallery: The gallery, or an empty one if none is saved or it is unreadable
+        """
+        matrix_path = os.path.join(directory, GALLERY_FILE)
+        meta_path = os.path.join(directory, GALLERY_META_FILE)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('version') != GALLERY_VERSION:
+                return cls(dtype=dtype)
+            matrix = np.load(matrix_path)
+            if len(matrix) != len(meta['labels']):
+                return cls(dtype=dtype)
+        except (OSError, ValueError, KeyError):
+            return cls(dtype=dtype)
+
+        gallery = cls(meta['dim'], dtype=meta['dtype'], model_signature=meta['model_signature'])
+        gallery._matrix = np.ascontiguousarray(matrix, dtype=gallery.dtype)
+        gallery._size = len(matrix)
+        gallery.labels = list(meta['labels'])
+        gallery.sources = list(meta['sources'])
+
+        index_path = os.path.join(directory, GALLERY_INDEX_FILE)
+        if os.path.exists(index_path):
+            try:
+                index = load_index(index_path)
+                if len(index) == len(gallery):
+                    gallery.index = index
+            except (OSError, ValueError, KeyError):
+                pass
+        return gallery
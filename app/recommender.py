@@ -1,75 +1,170 @@
 import pandas as pd
 import numpy as np
-from nutrition_utils import load_nutrition_data
+from nutrition_utils import DEFAULT_NUTRITION_FILE, catalog_cache, get_nutrition_catalog
+from search_index import NgramIndex
 import streamlit as st
 
+class AlternativesIndex:
+    """
+    Precomputed (Calories, Protein_Ratio) index over a catalog.
+
+    Answers "foods with lower calories and a higher protein ratio than X,
+    top n" without filtering and sorting the whole catalog per request:
+
+    - Rows are pre-sorted in the final ranking order (protein ratio
+      descending, then calories ascending, then catalog order), so the
+      foods with a higher ratio than the target are a prefix of that
+      order found by binary search, and the first n of them with lower
+      calories are the answer.
+    - Calories are also kept sorted, so "how many foods have fewer
+      calories" is a binary search, and the lowest-calorie fallback is a
+      slice.
+
+    The index never modifies the catalog, so one instance can be shared by
+    all sessions.
+    """
+
+    # Rows scanned per step when looking for the first n lower-calorie foods
+    SCAN_CHUNK = 256
+
+    # Which relaxation step produced a selection
+    STRICT, LOWER_CALORIES, LOWEST_CALORIES = 1, 2, 3
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        calories = df['Calories'].to_numpy(dtype=np.float64)
+        protein = df['Protein'].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = protein / calories
+        self.calories = calories
+        self.protein_ratio = ratio
+
+        # Ranking order; NaN ratios sort last, as in DataFrame.sort_values
+        rows = np.arange(len(df))
+        self.rank_order = np.lexsort((rows, calories, -ratio))
+        self.rank_position = np.empty_like(self.rank_order)
+        self.rank_position[self.rank_order] = rows
+        self._neg_ratio_ranked = -ratio[self.rank_order]
+        self._calories_ranked = calories[self.rank_order]
+
+        # Stable calorie order, equivalent to DataFrame.nsmallest(keep='first')
+        self.calorie_order = np.argsort(calories, kind='stable')
+        self._calories_sorted = calories[self.calorie_order]
+
+    def _first_lower_calorie(self, max_calories: float, stop: int, n: int) -> np.ndarray:
+        """First n rows in ranking order among the first `stop` with calories < max_calories"""
+        found = []
+        count = 0
+        for start in range(0, stop, self.SCAN_CHUNK):
+            end = min(start + self.SCAN_CHUNK, stop)
+            hits = np.flatnonzero(self._calories_ranked[start:end] < max_calories) + start
+            found.append(hits)
+            count += len(hits)
+            if count >= n:
+                break
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return self.rank_order[np.concatenate(found)[:n]]
+
+    def select(self, target_row: int, n_suggestions: int) -> tuple:
+        """
+        Select the alternative rows for a target food, best first.
+
+        Uses the same criteria and relaxation steps as before:
+        1. Lower calories and a higher protein ratio than the target
+        2. If fewer than n_suggestions, any food with lower calories
+        3. If still fewer, the n_suggestions lowest-calorie foods
+
+        Returns:
+            tuple: (rows, step) where step is STRICT, LOWER_CALORIES or LOWEST_CALORIES
+        """
+        target_calories = self.calories[target_row]
+        target_ratio = self.protein_ratio[target_row]
+
+        # 1. Higher ratio is a prefix of the ranking order
+        if np.isnan(target_ratio):
+            higher_ratio = 0
+        else:
+            higher_ratio = np.searchsorted(self._neg_ratio_ranked, -target_ratio, side='left')
+        rows = self._first_lower_calorie(target_calories, higher_ratio, n_suggestions)
+        if len(rows) >= n_suggestions:
+            return rows, self.STRICT
+
+        # 2. Just lower calories
+        lower_calories = np.searchsorted(self._calories_sorted, target_calories, side='left')
+        if lower_calories >= n_suggestions:
+            rows = self._first_lower_calorie(target_calories, len(self.rank_order), n_suggestions)
+            return rows, self.LOWER_CALORIES
+
+        # 3. The lowest calorie options, in ranking order
+        rows = self.calorie_order[:n_suggestions]
+        return rows[np.argsort(self.rank_position[rows])], self.LOWEST_CALORIES
+
+    def alternative_rows(self, target_row: int, n_suggestions: int) -> np.ndarray:
+        """Select the alternative rows for a target food, best first"""
+        return self.select(target_row, n_suggestions)[0]
+
+    def alternatives(self, target_row: int, n_suggestions: int = 3) -> pd.DataFrame:
+        """Return the alternatives for a target row with improvement metrics"""
+        target_calories = self.df['Calories'].iloc[target_row]
+        target_protein_ratio = self.protein_ratio[target_row]
+
+        rows = self.alternative_rows(target_row, n_suggestions)
+
+        # Select the output columns; the catalog itself is left untouched
+        result = self.df.iloc[rows][['Food', 'Calories', 'Protein', 'Fat', 'Carbs']].copy()
+        result['Protein_Ratio'] = self.protein_ratio[rows]
+
+        # Add improvement metrics
+        result['Calories_Reduction'] = target_calories - result['Calories']
+        result['Protein_Ratio_Improvement'] = result['Protein_Ratio'] - target_protein_ratio
+
+        # Format the output
+        return result.round(2)
+
+
+def get_alternatives_index(file_path: str = DEFAULT_NUTRITION_FILE) -> tuple:
+    """
+    Get the shared AlternativesIndex for a catalog, with the trigram index
+    used to find the target food.
+
+    Both are built once per catalog version from the same DataFrame, so a
+    row found by name always refers to the same food in the AlternativesIndex.
+
+    Returns:
+        tuple: (AlternativesIndex, NgramIndex)
+    """
+    try:
+        return catalog_cache.derived(
+            'alternatives', lambda df: (AlternativesIndex(df), NgramIndex(df['Food'])), file_path
+        )
+    except Exception:
+        df = get_nutrition_catalog(file_path)
+        return AlternativesIndex(df), NgramIndex(df['Food'])
+
 def get_healthier_alternatives(food_name: str, n_suggestions: int = 3) -> pd.DataFrame:
     """
     Suggest healthier alternatives for a given food item based on:
     1. Lower calories
     2. Higher protein-to-calories ratio
-    
+
     Args:
         food_name (str): Name of the food item to find alternatives for
         n_suggestions (int): Number of alternatives to suggest (default: 3)
-        
+
     Returns:
         pd.DataFrame: DataFrame containing the suggested alternatives with their nutrition info
     """
     try:
-        # Load the nutrition data
-        df = load_nutrition_data()
-        
+        index, names = get_alternatives_index()
+
         # Find the target food
-        target_food = df[df['Food'].str.contains(food_name, case=False, na=False)]
-        
-        if len(target_food) == 0:
+        target_rows = names.contains(food_name)
+
+        if len(target_rows) == 0:
             raise ValueError(f"No food found matching '{food_name}'")
-        
-        # Get the target food's nutrition values
-        target_calories = target_food['Calories'].iloc[0]
-        target_protein = target_food['Protein'].iloc[0]
-        target_protein_ratio = target_protein / target_calories
-        
-        # Calculate protein ratio for all foods
-        df['Protein_Ratio'] = df['Protein'] / df['Calories']
-        
-        # Filter for healthier alternatives:
-        # 1. Lower calories than target
-        # 2. Higher protein ratio than target
-        alternatives = df[
-            (df['Calories'] < target_calories) & 
-            (df['Protein_Ratio'] > target_protein_ratio)
-        ]
-        
-        # If we don't have enough alternatives, relax the criteria
-        if len(alternatives) < n_suggestions:
-            # Try with just lower calories
-            alternatives = df[df['Calories'] < target_calories]
-            
-            # If still not enough, take the lowest calorie options
-            if len(alternatives) < n_suggestions:
-                alternatives = df.nsmallest(n_suggestions, 'Calories')
-        
-        # Sort by protein ratio and calories
-        alternatives = alternatives.sort_values(
-            by=['Protein_Ratio', 'Calories'],
-            ascending=[False, True]
-        ).head(n_suggestions)
-        
-        # Select and rename columns for the output
-        result = alternatives[[
-            'Food', 'Calories', 'Protein', 'Fat', 'Carbs', 'Protein_Ratio'
-        ]].copy()
-        
-        # Add improvement metrics
-        result['Calories_Reduction'] = target_calories - result['Calories']
-        result['Protein_Ratio_Improvement'] = result['Protein_Ratio'] - target_protein_ratio
-        
-        # Format the output
-        result = result.round(2)
-        
-        return result
+
+        return index.alternatives(int(target_rows[0]), n_suggestions)
     except Exception as e:
         st.error(f"Error finding healthier alternatives: {str(e)}")
         return pd.DataFrame()
@@ -0,0 +1,271 @@
+"""
+In-memory indexes over catalog food names.
+
+NgramIndex answers case-insensitive "contains" queries from a character
+trigram inverted index, returning exactly the rows that
+df['Food'].str.contains(query, case=False, na=False) would match.
+
+PrefixIndex serves ranked autocompletions from a sorted array of keys.
+"""
+import re
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+from nutrition_utils import (
+    DEFAULT_NUTRITION_FILE, catalog_cache, get_nutrition_catalog, assess_health_impact_batch
+)
+from food_synonyms import FOOD_MAPPING
+
+# Characters that make str.contains() treat the query as a regular expression
+_REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+
+
+def _ngrams(text: str, n: int) -> set:
+    """Return the set of character n-grams in text"""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class NgramIndex:
+    """
+    Character n-gram inverted index for substring search over names.
+
+    Every lowercased name is split into overlapping n-grams and each n-gram
+    maps to the sorted rows containing it. A query intersects the posting
+    lists of its own n-grams, starting from the rarest, and only the
+    surviving candidates are checked with a real substring test, so the
+    work grows with the number of matches rather than the catalog size.
+
+    Queries that str.contains() would interpret as a regex, and queries
+    shorter than n, fall back to checking every name.
+    """
+
+    def __init__(self, names, n: int = 3):
+        self.n = n
+        self.names = [str(name) for name in names]
+        self.lowered = [name.lower() for name in self.names]
+
+        postings = {}
+        for row, name in enumerate(self.lowered):
+            for gram in _ngrams(name, n):
+                postings.setdefault(gram, []).append(row)
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+        # Case-insensitive regex matching folds a few non-ASCII characters that
+        # str.lower() does not, so these names are always checked with the regex
+        self._non_ascii_rows = np.array(
+            [row for row, name in enumerate(self.names) if not name.isascii()], dtype=np.int32
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def _scan(self, query: str) -> np.ndarray:
+        """Match every name the way str.contains(query, case=False) does"""
+        pattern = re.compile(query, flags=re.IGNORECASE)
+        return np.array(
+            [row for row, name in enumerate(self.names) if pattern.search(name)], dtype=np.int32
+        )
+
+    def contains(self, query: str) -> np.ndarray:
+        """
+        Find the names containing query, ignoring case.
+
+        Args:
+            query (str): Text to search for
+
+        Returns:
+            np.ndarray: Matching rows in ascending order
+        """
+        if not query.isascii() or _REGEX_METACHARACTERS.intersection(query):
+            return self._scan(query)
+
+        needle = query.lower()
+        if len(needle) < self.n:
+            return np.array(
+                [row for row, name in enumerate(self.lowered) if needle in name], dtype=np.int32
+            )
+
+        # Intersect posting lists, rarest first
+        lists = []
+        for gram in _ngrams(needle, self.n):
+            rows = self.postings.get(gram)
+            if rows is None:
+                lists = []
+                break
+            lists.append(rows)
+
+        candidates = np.empty(0, dtype=np.int32)
+        if lists:
+            lists.sort(key=len)
+            candidates = lists[0]
+            for rows in lists[1:]:
+                candidates = np.intersect1d(candidates, rows, assume_unique=True)
+                if len(candidates) == 0:
+                    break
+
+        matches = [row for row in candidates.tolist() if needle in self.lowered[row]]
+
+        if len(self._non_ascii_rows):
+            pattern = re.compile(re.escape(query), flags=re.IGNORECASE)
+            found = set(matches)
+            found.update(row for row in self._non_ascii_rows.tolist() if pattern.search(self.names[row]))
+            matches = sorted(found)
+
+        return np.array(matches, dtype=np.int32)
+
+
+def get_searchable_catalog(file_path: str = DEFAULT_NUTRITION_FILE) -> tuple:
+    """
+    Get a catalog together with the trigram index over its food names.
+
+    Both come from one catalog version, so the index rows always line up
+    with the DataFrame, even if the file is reloaded in between calls.
+
+    Returns:
+        tuple: (df, NgramIndex)
+    """
+    try:
+        return catalog_cache.derived('name_search', lambda df: (df, NgramIndex(df['Food'])), file_path)
+    except Exception:
+        # get_nutrition_catalog() falls back to a built-in catalog; index that instead
+        df = get_nutrition_catalog(file_path)
+        return df, NgramIndex(df['Food'])
+
+
+def get_catalog_search_index(file_path: str = DEFAULT_NUTRITION_FILE) -> NgramIndex:
+    """
+    Get the trigram index over a catalog's food names.
+
+    Built once per catalog version; rows line up with get_nutrition_catalog().
+    """
+    return get_searchable_catalog(file_path)[1]
+
+
+def search_foods(query: str, file_path: str = DEFAULT_NUTRITION_FILE) -> pd.DataFrame:
+    """
+    Find catalog foods whose name contains query, ignoring case.
+
+    Same rows, in the same order, as
+    df[df['Food'].str.contains(query, case=False, na=False)].
+    """
+    df, index = get_searchable_catalog(file_path)
+    return df.iloc[index.contains(query)]
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index for ranked autocompletion.
+
+    Each entry is a (key, completion, score) triple. Keys are lowercased and
+    kept in one sorted list, so the keys starting with a prefix form a
+    contiguous range found with two binary searches. The best completions in
+    that range are picked with np.argpartition on a precomputed score array,
+    which keeps a keystroke well under a millisecond even when a short
+    prefix matches thousands of keys.
+    """
+
+    def __init__(self, entries):
+        entries = sorted((key.lower(), -float(score), completion) for key, completion, score in entries)
+        self.keys = [key for key, _, _ in entries]
+        self.completions = np.array([completion for _, _, completion in entries], dtype=object)
+        self.scores = np.array([-score for _, score, _ in entries], dtype=np.float32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _ranked(self, scores: np.ndarray, limit: int) -> np.ndarray:
+        """Positions of the best `limit` scores, best first, key order among ties"""
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+        return top[np.lexsort((top, -scores[top]))]
+
+    def complete(self, prefix: str, k: int = 8) -> list:
+        """
+        Return up to k distinct completions for prefix, best score first.
+
+        Args:
+            prefix (str): What the user has typed so far (case-insensitive)
+            k (int): Maximum number of completions (default: 8)
+        """
+        prefix = prefix.lower()
+        if not prefix or k <= 0:
+            return []
+
+        low = bisect_left(self.keys, prefix)
+        high = bisect_left(self.keys, prefix + '\uffff', low)
+        if low >= high:
+            return []
+
+        scores = self.scores[low:high]
+        completions = self.completions[low:high]
+
+        # Several keys can complete to the same dish; over-fetch, then widen if needed
+        limit = min(len(scores), 4 * k)
+        while True:
+            results = []
+            for position in self._ranked(scores, limit):
+                completion = completions[position]
+                if completion not in results:
+                    results.append(completion)
+                    if len(results) == k:
+                        return results
+            if limit == len(scores):
+                return results
+            limit = len(scores)
+
+
+def _autocomplete_entries(df: pd.DataFrame) -> list:
+    """
+    Autocomplete entries for a catalog: every name and each of its word
+    suffixes, plus synonyms from FOOD_MAPPING that resolve to a catalog dish.
+
+    Completions are ranked by a health score derived from the precomputed
+    impact codes (10 = best on every category); synonyms rank just below
+    the dish names themselves.
+    """
+    codes = assess_health_impact_batch(df)
+    health_scores = 10 - codes.sum(axis=1).to_numpy(dtype=np.float32)
+
+    entries = []
+    first_row = {}
+    for row, name in enumerate(df['Food']):
+        first_row.setdefault(name.lower(), row)
+        words = name.split()
+        for i in range(len(words)):
+            entries.append((' '.join(words[i:]), name, health_scores[row]))
+
+    for dish, synonyms in FOOD_MAPPING.items():
+        row = first_row.get(dish.lower())
+        if row is None:
+            continue
+        name = df['Food'].iloc[row]
+        for synonym in synonyms:
+            entries.append((synonym, name, health_scores[row] - 0.5))
+
+    return entries
+
+
+def get_autocomplete_index(file_path: str = DEFAULT_NUTRITION_FILE) -> PrefixIndex:
+    """
+    Get the autocomplete index over a catalog's names and dish synonyms.
+
+    Built once per catalog version.
+    """
+    try:
+        return catalog_cache.derived(
+            'autocomplete', lambda df: PrefixIndex(_autocomplete_entries(df)), file_path
+        )
+    except Exception:
+        return PrefixIndex(_autocomplete_entries(get_nutrition_catalog(file_path)))
+
+
+def autocomplete_foods(prefix: str, k: int = 8, file_path: str = DEFAULT_NUTRITION_FILE) -> list:
+    """
+    Suggest catalog food names for a partially typed name or synonym.
+
+    Matches the start of a name, the start of any word in it, or the start
+    of a known synonym, e.g. "panc" suggests "Dosa" via "pancake".
+    """
+    return get_autocomplete_index(file_path).complete(prefix, k)
@@ -0,0 +1,217 @@
+"""
+Per-stage latency instrumentation for the recognition pipeline.
+
+Code marks its stages with spans:
+
+    with timer.span('decode'):
+        image = ingest_image(upload)
+
+Every span's duration goes into a histogram for its stage (log-spaced
+buckets, a quarter octave wide, from 1 us to about 2 min), so the
+percentiles() of each stage can be read at any time at a fixed memory
+cost. Estimates are within about 10% of the true value.
+
+A per-request trace is opt-in and works with the histograms on or off:
+
+    with timer.trace() as trace:
+        recognizer.process_image(image)
+    print(trace.spans)   # [(stage, start_ms, duration_ms), ...] by start time
+
+Methods of an object with a `stage_timer` attribute can be timed as a
+whole with the @timed_stage(stage) decorator.
+
+With the histograms off and no trace active on the thread, span() returns
+a shared no-op context manager, so instrumented code costs two attribute
+checks per span.
+"""
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram buckets: 4 per doubling, from MIN_SECONDS up
+MIN_SECONDS = 1e-6
+BUCKETS_PER_OCTAVE = 4
+N_BUCKETS = 4 * 27
+
+
+class LatencyHistogram:
+    """Counts of durations in log-spaced buckets, with the exact count, sum and max"""
+
+    def __init__(self):
+        self.counts = [0] * (N_BUCKETS + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        if seconds <= MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = min(N_BUCKETS, int(BUCKETS_PER_OCTAVE * math.log2(seconds / MIN_SECONDS)) + 1)
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Estimated q-th percentile in seconds (geometric middle of its bucket, at most the max)"""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                if bucket == 0:
+                    return min(MIN_SECONDS, self.max)
+                return min(MIN_SECONDS * 2 ** ((bucket - 0.5) / BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+
+class RequestTrace:
+    """Spans recorded on one thread while a trace() is active"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.total_ms = None
+
+    def add(self, stage: str, started: float, seconds: float):
+        self.spans.append((stage, (started - self.started) * 1000.0, seconds * 1000.0))
+
+    def summary(self) -> dict:
+        """Milliseconds per stage, summed over its spans"""
+        totals = {}
+        for stage, _, duration in self.spans:
+            totals[stage] = totals.get(stage, 0.0) + duration
+        return totals
+
+
+class _NullSpan:
+    """Span used when nothing is recorded"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('timer', 'stage', 'trace', 'started')
+
+    def __init__(self, timer, stage: str, trace: RequestTrace):
+        self.timer = timer
+        self.stage = stage
+        self.trace = trace
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        if self.timer.enabled:
+            self.timer.record(self.stage, seconds)
+        if self.trace is not None:
+            self.trace.add(self.stage, self.started, seconds)
+        return False
+
+
+class StageTimer:
+    """
+    Latency histograms per pipeline stage.
+
+    Args:
+        enabled (bool): Record every span into the histograms (default: False)
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._histograms = {}
+        # Traces active on any thread; while zero, spans skip the thread-local lookup
+        self._tracing = 0
+
+    def span(self, stage: str):
+        """Context manager timing one stage"""
+        if not self.enabled and not self._tracing:
+            return _NULL_SPAN
+        trace = getattr(self._local, 'trace', None)
+        if not self.enabled and trace is None:
+            return _NULL_SPAN
+        return _Span(self, stage, trace)
+
+    def record(self, stage: str, seconds: float):
+        """Add a duration measured elsewhere to a stage's histogram"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.add(seconds)
+
+    @contextmanager
+    def trace(self):
+        """
+        Record every span on this thread until the block exits.
+
+        Yields:
+            RequestTrace: Filled in as the spans finish; at exit the spans
+            are sorted by start time and total_ms is set
+        """
+        outer = getattr(self._local, 'trace', None)
+        trace = RequestTrace()
+        self._local.trace = trace
+        with self._lock:
+            self._tracing += 1
+        try:
+            yield trace
+        finally:
+            trace.total_ms = (time.perf_counter() - trace.started) * 1000.0
+            trace.spans.sort(key=lambda span: span[1])
+            self._local.trace = outer
+            with self._lock:
+                self._tracing -= 1
+
+    def percentiles(self, percentiles=(50, 90, 99)) -> dict:
+        """
+        Latency percentiles per stage.
+
+        Returns:
+            dict: Per stage, count plus mean, p<q> and max in milliseconds
+        """
+        with self._lock:
+            report = {}
+            for stage, histogram in self._histograms.items():
+                stats = {
+                    'count': histogram.count,
+                    'mean_ms': 1000.0 * histogram.total / histogram.count
+                }
+                for q in percentiles:
+                    stats[f"p{q:g}_ms"] = 1000.0 * histogram.percentile(q)
+                stats['max_ms'] = 1000.0 * histogram.max
+                report[stage] = stats
+            return report
+
+    def reset(self):
+        """Drop every histogram"""
+        with self._lock:
+            self._histograms = {}
+
+
+def timed_stage(stage: str):
+    """Decorator timing a method as one stage of its object's stage_timer"""
+    def decorate(method):
+        @functools.wraps(method)
+        def timed(self, *args, **kwargs):
+            with self.stage_timer.span(stage):
+                return method(self, *args, **kwargs)
+        return timed
+    return decorate
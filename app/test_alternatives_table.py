@@ -0,0 +1,56 @@
+import pandas as pd
+import numpy as np
+from app.alternatives_table import AlternativesTable
+from app.recommender import AlternativesIndex
+from app.search_index import NgramIndex
+
+
+def make_catalog(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    words = ['Dal', 'Dosa', 'Paneer', 'Rice', 'Aloo', 'Masala', 'Tikka', 'Curry']
+    return pd.DataFrame({
+        'Food': [f"{rng.choice(words)} {rng.choice(words)} {i % 40}" for i in range(n_rows)],
+        'Calories': rng.choice([50, 100, 150, 200, 300, 450], n_rows),
+        'Protein': rng.choice([1.0, 2.5, 5.0, 10.0], n_rows),
+        'Fat': rng.uniform(0, 20, n_rows).round(1),
+        'Carbs': rng.uniform(0, 60, n_rows).round(1)
+    })
+
+
+def live_alternatives(df, food_name, n_suggestions):
+    """What get_healthier_alternatives() computes for this catalog"""
+    target = int(NgramIndex(df['Food']).contains(food_name)[0])
+    return AlternativesIndex(df).alternatives(target, n_suggestions)
+
+
+def test_table_lookup_matches_live_selection():
+    df = make_catalog(120, seed=0)
+    table = AlternativesTable.build(df, n_suggestions=3)
+    
+    for food_name in df['Food'].iloc[::9]:
+        pd.testing.assert_frame_equal(table.lookup(food_name, df), live_alternatives(df, food_name, 3))
+    assert table.lookup('Not A Dish', df) is None
+
+
+def test_refresh_recomputes_only_affected_entries():
+    df = make_catalog(150, seed=1)
+    table = AlternativesTable.build(df, n_suggestions=3)
+    
+    # Change one food, remove one and append a new one
+    changed = df.copy()
+    changed.loc[10, 'Protein'] = 30.0
+    changed = changed.drop(index=20).reset_index(drop=True)
+    changed.loc[len(changed)] = ['Tikka Dosa Special', 450, 2.5, 10.0, 30.0]
+    
+    refreshed, recomputed = table.refresh(changed)
+    rebuilt = AlternativesTable.build(changed, n_suggestions=3)
+    
+    assert 0 < recomputed < len(rebuilt), "Only the affected entries should be recomputed"
+    assert refreshed.keys == rebuilt.keys
+    for name in ['target_rows', 'rows', 'steps', 'calories_reduction', 'ratio_improvement']:
+        np.testing.assert_array_equal(getattr(refreshed, name), getattr(rebuilt, name), err_msg=name)
+
+
+if __name__ == "__main__":
+    test_table_lookup_matches_live_selection()
+    test_refresh_recomputes_only_affected_entries()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import numpy as np
+from app.ann_index import ExactIndex, IVFFlatIndex, build_index, load_index
+
+
+def _data(n=2000, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n, dim)).astype(np.float32), rng.normal(size=(20, dim)).astype(np.float32)
+
+
+def test_exact_index_matches_brute_force():
+    vectors, queries = _data()
+    index = build_index(vectors, 'exact')
+    scores, ids = index.search(queries, k=5)
+    
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(queries @ unit.T), axis=1)[:, :5]
+    assert np.array_equal(ids, expected)
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+
+def test_ivf_probing_every_list_is_exact():
+    vectors, queries = _data()
+    exact = build_index(vectors, 'exact')
+    ivf = build_index(vectors, 'ivf_flat', n_lists=16, n_probe=16)
+    assert len(ivf) == len(vectors)
+    assert np.array_equal(ivf.search(queries, k=10)[1], exact.search(queries, k=10)[1])
+    
+    # Fewer probes still finds most neighbours
+    approximate = ivf.search(queries, k=10, n_probe=4)[1]
+    expected = exact.search(queries, k=10)[1]
+    found = sum(len(np.intersect1d(a, e)) for a, e in zip(approximate, expected))
+    assert found / expected.size > 0.4
+
+
+def test_incremental_insert_and_round_trip():
+    vectors, queries = _data()
+    ivf = build_index(vectors[:1000], 'ivf_flat', n_lists=8, n_probe=8)
+    ivf.add(vectors[1000:])
+    exact = ExactIndex(vectors.shape[1])
+    exact.add(vectors)
+    assert np.array_equal(ivf.search(queries, k=3)[1], exact.search(queries, k=3)[1])
+    
+    fd, path = tempfile.mkstemp(suffix='.npz')
+    os.close(fd)
+    try:
+        for index in (ivf, exact):
+            index.save(path)
+            loaded = load_index(path)
+            assert type(loaded) is type(index) and len(loaded) == len(index)
+            assert np.array_equal(loaded.search(queries, k=3)[1], index.search(queries, k=3)[1])
+    finally:
+        os.remove(path)
+
+
+def test_small_index_pads_missing_results():
+    scores, ids = build_index(np.eye(3), 'exact').search([1, 0, 0], k=5)
+    assert ids[0].tolist()[:1] == [0] and ids[0].tolist()[3:] == [-1, -1]
+    assert np.isneginf(scores[0, 3:]).all()
+    assert isinstance(IVFFlatIndex(3).search([1, 0, 0], k=2)[1], np.ndarray)
+
+
+if __name__ == "__main__":
+    test_exact_index_matches_brute_force()
+    test_ivf_probing_every_list_is_exact()
+    test_incremental_insert_and_round_trip()
+    test_small_index_pads_missing_results()
+    print("All tests passed!")
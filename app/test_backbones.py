@@ -0,0 +1,29 @@
+import torch
+from PIL import Image
+from app.backbones import BACKBONES, get_backbone
+
+
+def test_every_backbone_splits_into_embedding_and_logits():
+    image = Image.new('RGB', (300, 260), (200, 120, 40))
+    for name, spec in BACKBONES.items():
+        backbone, classifier = spec.split(spec.build())
+        batch = spec.transform()(image).unsqueeze(0)
+        with torch.no_grad():
+            embedding = backbone(batch)
+            logits = classifier(embedding)
+        assert embedding.shape == (1, spec.embedding_dim), name
+        assert logits.shape == (1, 1000), name
+
+
+def test_unknown_backbone_is_rejected():
+    try:
+        get_backbone('vgg11')
+        assert False, "Expected an unknown backbone to be rejected"
+    except ValueError as e:
+        assert 'resnet50' in str(e)
+
+
+if __name__ == "__main__":
+    test_every_backbone_splits_into_embedding_and_logits()
+    test_unknown_backbone_is_rejected()
+    print("All tests passed!")
@@ -0,0 +1,47 @@
+import shutil
+import tempfile
+import numpy as np
+from app.class_dish_table import ClassDishTable, load_or_build, labels_digest
+
+LABELS = ['pizza', 'dosa pancake', 'rock', 'samosa', 'crepe']
+DISHES = {'pizza': 'pizza', 'dosa pancake': 'dosa', 'crepe': 'dosa', 'samosa': 'samosa'}
+
+
+def test_aggregate_sums_probabilities_per_dish():
+    table = ClassDishTable.build(LABELS, DISHES.get)
+    assert table.dish(1) == 'dosa' and table.dish(2) is None
+    
+    probabilities = np.array([0.30, 0.25, 0.2, 0.05, 0.2])
+    assert [dish for dish, _ in table.aggregate(probabilities, k=5)] == ['dosa', 'pizza', 'samosa']
+    assert np.isclose(table.aggregate(probabilities, k=5)[0][1], 0.45)
+    
+    # Only the top-k classes count
+    assert [dish for dish, _ in table.aggregate(probabilities, k=2)] == ['pizza', 'dosa']
+
+
+def test_table_is_reused_until_labels_or_lexicon_change():
+    model_dir = tempfile.mkdtemp()
+    calls = []
+    
+    def match(label):
+        calls.append(label)
+        return DISHES.get(label)
+    
+    try:
+        table = load_or_build(LABELS, match, 'lexicon-1', model_dir)
+        assert table.labels_digest == labels_digest(LABELS) and len(calls) == len(LABELS)
+        
+        assert load_or_build(LABELS, match, 'lexicon-1', model_dir).dishes == table.dishes
+        assert len(calls) == len(LABELS)
+        
+        load_or_build(LABELS, match, 'lexicon-2', model_dir)
+        load_or_build(LABELS[::-1], match, 'lexicon-2', model_dir)
+        assert len(calls) == 3 * len(LABELS)
+    finally:
+        shutil.rmtree(model_dir)
+
+
+if __name__ == "__main__":
+    test_aggregate_sums_probabilities_per_dish()
+    test_table_is_reused_until_labels_or_lexicon_change()
+    print("All tests passed!")
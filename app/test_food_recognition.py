@@ -0,0 +1,267 @@
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+import torch
+import torchvision
+from PIL import Image
+from app.food_recognition import FoodRecognizer
+from app.thread_budget import ThreadBudget
+
+APP_DIR = Path(__file__).parent
+
+
+def _recognizer(model_dir):
+    """Recognizer over randomly initialized weights and an empty preset gallery"""
+    recognizer = FoodRecognizer(model_dir=model_dir)
+    recognizer.preset_dir = Path(model_dir) / 'presets'
+    recognizer.preset_dir.mkdir(exist_ok=True)
+    return recognizer
+
+
+def _with_model_dir(test):
+    def run():
+        model_dir = tempfile.mkdtemp()
+        try:
+            torch.manual_seed(0)
+            torch.save(torchvision.models.resnet50(weights=None).state_dict(), os.path.join(model_dir, 'resnet50.pth'))
+            test(model_dir)
+        finally:
+            shutil.rmtree(model_dir)
+    run.__name__ = test.__name__
+    return run
+
+
+def _images():
+    return [Image.open(APP_DIR / name).convert('RGB') for name in ('dal.jpg', 'idli.jpg', 'poha.jpg')]
+
+
+@_with_model_dir
+def test_model_loads_on_first_image(model_dir):
+    recognizer = _recognizer(model_dir)
+    assert recognizer.model is None
+    assert recognizer.get_timings()['model_load_seconds'] is None
+    
+    assert recognizer.recognize_food(_images()[0]) is not None
+    timings = recognizer.get_timings()
+    assert recognizer.model is not None
+    assert timings['model_load_seconds'] is not None and timings['first_inference_seconds'] is not None
+
+
+@_with_model_dir
+def test_stage_latency_is_recorded_and_traced(model_dir):
+    recognizer = _recognizer(model_dir)
+    image = _images()[0]
+    with recognizer.trace_request() as trace:
+        recognizer.process_image(image)
+    stages = {stage for stage, _, _ in trace.spans}
+    assert {
+        'recognize_food', 'decode', 'result_cache', 'transform', 'forward', 'preset_match', 'label_match', 'nutrition'
+    } <= stages
+    assert trace.spans[0][0] == 'process_image'
+    assert recognizer.latency_stats() == {}
+    
+    recognizer = FoodRecognizer(model_dir=model_dir, stage_timing=True)
+    recognizer.preset_dir = Path(model_dir) / 'presets'
+    recognizer.recognize_food(image)
+    recognizer.recognize_food(image)
+    stats = recognizer.latency_stats()
+    assert stats['recognize_food']['count'] == stats['decode']['count'] == 2
+    assert stats['forward']['count'] == 1
+    assert stats['forward']['p50_ms'] > 0
+
+
+@_with_model_dir
+def test_process_image_returns_catalog_nutrition(model_dir):
+    recognizer = _recognizer(model_dir)
+    idli = _images()[1]
+    assert recognizer.add_preset_image('idli', idli)
+    result = recognizer.process_image(idli)
+    assert result is not None and result['food_name'] == 'idli'
+    nutrition_info = result['nutrition_info']
+    assert nutrition_info is not None and nutrition_info['name'] == 'Idli'
+    assert set(nutrition_info) == {'name', 'calories', 'protein', 'fat', 'carbs'}
+    assert nutrition_info['calories'] > 0
+    
+    # Names outside the catalog resolve through the dish they map to
+    assert recognizer.get_nutrition_info('IDLI')['name'] == 'Idli'
+    assert recognizer.get_nutrition_info('steamed rice cake')['name'] == 'Idli'
+    assert recognizer.get_nutrition_info('qqqq') is None
+
+
+@_with_model_dir
+def test_preset_index_is_kept_across_preset_changes(model_dir):
+    recognizer = FoodRecognizer(model_dir=model_dir, preset_index='exact')
+    recognizer.preset_dir = Path(model_dir) / 'presets'
+    recognizer.preset_dir.mkdir()
+    dal, idli, _ = _images()
+    assert recognizer.add_preset_image('dal', dal)
+    assert recognizer.preset_images.index is not None
+    
+    # Replacing a preset removes its old row and adds the new one; the
+    # gallery searches may still hold is left untouched
+    assert recognizer.add_preset_image('idli', idli)
+    previous = recognizer.preset_images
+    assert recognizer.add_preset_image('dal', idli)
+    assert recognizer.preset_images is not previous
+    assert previous.labels == ['dal', 'idli'] and len(previous.index) == 2
+    assert len(recognizer.preset_images.index) == len(recognizer.preset_images) == 2
+    assert os.path.exists(os.path.join(model_dir, 'preset_index.npz'))
+
+
+@_with_model_dir
+def test_saved_results_are_dropped_when_presets_or_lexicon_change(model_dir):
+    path = os.path.join(model_dir, 'results.json')
+    
+    def recognizer(threshold=FoodRecognizer.MATCH_THRESHOLD):
+        recognizer = FoodRecognizer(model_dir=model_dir, result_cache_path=path)
+        recognizer.MATCH_THRESHOLD = threshold
+        recognizer.preset_dir = Path(model_dir) / 'presets'
+        recognizer.preset_dir.mkdir(exist_ok=True)
+        recognizer._ensure_model()
+        return recognizer
+    
+    dal, idli, _ = _images()
+    first = recognizer()
+    first.recognize_food(dal)
+    first.result_cache.save()
+    assert len(recognizer().result_cache) == 1
+    
+    # A new preset clears the saved results too
+    assert first.add_preset_image('idli', idli)
+    assert not os.path.exists(path) and len(recognizer().result_cache) == 0
+    
+    # Results saved under one lexicon are not reused under another
+    first.recognize_food(dal)
+    first.result_cache.save()
+    assert len(recognizer(threshold=0.9).result_cache) == 0
+
+
+@_with_model_dir
+def test_recognize_batch_matches_single_images(model_dir):
+    recognizer = _recognizer(model_dir)
+    images = _images()
+    expected = [recognizer.recognize_food(image) for image in images]
+    
+    recognizer.feature_cache.clear()
+    assert recognizer.recognize_batch(images + images[:1], batch_size=2) == expected + expected[:1]
+    assert recognizer.recognize_batch([]) == []
+
+
+@_with_model_dir
+def test_micro_batched_requests_match_direct_inference(model_dir):
+    images = _images()
+    expected = [_recognizer(model_dir).recognize_food(image) for image in images]
+    
+    recognizer = FoodRecognizer(model_dir=model_dir, micro_batching=True, max_wait_ms=50)
+    recognizer.preset_dir = Path(model_dir) / 'presets'
+    results = [None] * len(images)
+    
+    def recognize(i):
+        results[i] = recognizer.recognize_food(images[i])
+    
+    threads = [threading.Thread(target=recognize, args=(i,)) for i in range(len(images))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results == expected
+    assert recognizer.scheduler_stats()['submitted'] == len(images)
+    recognizer.scheduler.close()
+
+
+@_with_model_dir
+def test_thread_budget_bounds_concurrent_forward_passes(model_dir):
+    images = _images()
+    expected = [_recognizer(model_dir).recognize_food(image) for image in images]
+    
+    budget = ThreadBudget(intra_op_threads=1, max_concurrent=1)
+    recognizer = FoodRecognizer(model_dir=model_dir, thread_budget=budget)
+    recognizer.preset_dir = Path(model_dir) / 'presets'
+    results = [None] * len(images)
+    
+    def recognize(i):
+        results[i] = recognizer.recognize_food(images[i])
+    
+    threads = [threading.Thread(target=recognize, args=(i,)) for i in range(len(images))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results == expected
+    stats = recognizer.thread_budget_stats()
+    assert stats['calls'] >= len(images) and stats['peak_active'] == 1
+    budget.close()
+    
+    # Micro-batches run on every slot of the budget
+    budget = ThreadBudget(intra_op_threads=1, max_concurrent=2)
+    recognizer = FoodRecognizer(model_dir=model_dir, thread_budget=budget, micro_batching=True)
+    recognizer.preset_dir = Path(model_dir) / 'presets'
+    assert recognizer.recognize_food(images[0]) == expected[0]
+    assert recognizer.scheduler.max_in_flight == 2
+    recognizer.scheduler.close()
+    budget.close()
+
+
+@_with_model_dir
+def test_worker_processes_match_in_process_inference(model_dir):
+    images = _images()
+    expected = [_recognizer(model_dir).recognize_food(image) for image in images]
+    
+    recognizer = FoodRecognizer(model_dir=model_dir, workers=1)
+    recognizer.preset_dir = Path(model_dir) / 'presets'
+    try:
+        assert [recognizer.recognize_food(image) for image in images] == expected
+        assert recognizer.model is None
+        assert recognizer.worker_stats()['requests'] == [len(images)]
+    finally:
+        recognizer.worker_pool.close()
+
+
+@_with_model_dir
+def test_plate_tiles_adapt_to_latency_budget(model_dir):
+    recognizer = _recognizer(model_dir)
+    plate = Image.new('RGB', (900, 600))
+    for i, image in enumerate(_images()):
+        plate.paste(image.resize((300, 600)), (300 * i, 0))
+    
+    report = recognizer.analyze_plate(plate, budget_ms=60000, min_confidence=0.0)
+    assert report['tiles_used'] == report['tiles_planned'] == 14
+    assert report['items'] and sum(item['tiles'] for item in report['items']) <= 14
+    assert set(report['total_nutrition']) == {'calories', 'protein', 'fat', 'carbs'}
+    
+    # A budget below the measured cost of one tile runs none
+    recognizer.plate_budget.seconds_per_tile = 1.0
+    report = recognizer.analyze_plate(plate, budget_ms=500, min_confidence=0.0)
+    assert report['tiles_used'] == 0 and report['tiles_planned'] == 14
+    assert report['items'] == [] and report['total_nutrition']['calories'] == 0
+
+
+def test_class_table_matches_label_matching():
+    model_dir = tempfile.mkdtemp()
+    try:
+        recognizer = FoodRecognizer(model_dir=model_dir)
+        labels = recognizer._load_imagenet_labels()
+        table = recognizer.build_class_table()
+        assert len(table) == len(labels) == 1000
+        assert table.dishes == [recognizer._find_best_match(label) for label in labels]
+    finally:
+        shutil.rmtree(model_dir)
+
+
+if __name__ == "__main__":
+    test_model_loads_on_first_image()
+    test_stage_latency_is_recorded_and_traced()
+    test_process_image_returns_catalog_nutrition()
+    test_preset_index_is_kept_across_preset_changes()
+    test_saved_results_are_dropped_when_presets_or_lexicon_change()
+    test_recognize_batch_matches_single_images()
+    test_micro_batched_requests_match_direct_inference()
+    test_thread_budget_bounds_concurrent_forward_passes()
+    test_worker_processes_match_in_process_inference()
+    test_plate_tiles_adapt_to_latency_budget()
+    test_class_table_matches_label_matching()
+    print("All tests passed!")
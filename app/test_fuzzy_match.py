@@ -0,0 +1,39 @@
+import random
+from difflib import SequenceMatcher
+from app.fuzzy_match import FuzzyMatcher
+
+
+def naive_best_match(names, query, threshold=0.6):
+    """The SequenceMatcher scan previously used by FoodRecognizer._find_best_match"""
+    best_match = None
+    best_score = 0.0
+    for name in names:
+        score = SequenceMatcher(None, query, name).ratio()
+        if score > best_score and score > threshold:
+            best_score = score
+            best_match = name
+    return best_match
+
+
+def test_fuzzy_matcher_agrees_with_sequence_matcher():
+    rng = random.Random(0)
+    words = ['rice', 'dal', 'dosa', 'idli', 'curry', 'bread', 'paneer', 'masala', 'fried', 'cake', 'soup']
+    names = [' '.join(rng.sample(words, rng.randint(1, 3))) for _ in range(300)]
+    matcher = FuzzyMatcher(names)
+    
+    queries = ['dosa', 'rice cake', 'panner', 'fried bread', 'soup', 'espresso', 'x', '', 'masala dosa curry']
+    queries += [' '.join(rng.sample(words, 2)) for _ in range(50)]
+    for query in queries:
+        assert matcher.best_match(query) == naive_best_match(names, query), f"Mismatch for {query!r}"
+        
+        top = matcher.top_k(query, k=5)
+        expected = sorted(
+            ((SequenceMatcher(None, query, name).ratio(), -i) for i, name in enumerate(names)),
+            reverse=True
+        )
+        expected = [(names[-i], score) for score, i in expected if score > 0.6][:5]
+        assert top == expected, f"Top-k mismatch for {query!r}"
+
+
+if __name__ == "__main__":
+    test_fuzzy_matcher_agrees_with_sequence_matcher()
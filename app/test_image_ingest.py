@@ -0,0 +1,54 @@
+import io
+from PIL import Image
+from app import image_ingest
+from app.image_ingest import ingest_image
+
+
+def _jpeg(size, orientation=None):
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    Image.new('RGB', size, (180, 90, 30)).save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+def test_large_jpeg_is_drafted_upright_and_within_budget():
+    image = ingest_image(_jpeg((4000, 3000), orientation=6), min_side=256, max_pixels=1 << 20)
+    width, height = image.size
+    assert image.mode == 'RGB'
+    assert height > width, "EXIF rotation was not applied"
+    assert min(width, height) >= 256
+    assert width * height <= 1 << 20
+
+
+def test_other_inputs_are_converted_and_downscaled():
+    png = Image.new('RGBA', (3000, 2000))
+    image = ingest_image(png, min_side=256, max_pixels=600_000)
+    assert image.mode == 'RGB' and image.size[0] * image.size[1] <= 600_000
+    assert png.size == (3000, 2000), "The caller's image was modified"
+    
+    small = ingest_image(io.BytesIO(_jpeg((200, 100))))
+    assert small.size == (200, 100)
+    
+    # An ingested image passed on again is reused, not copied
+    assert ingest_image(image, min_side=256, max_pixels=600_000) is image
+
+
+def test_oversized_sources_are_rejected_before_decoding():
+    limit = image_ingest.MAX_SOURCE_PIXELS
+    image_ingest.MAX_SOURCE_PIXELS = 1000
+    try:
+        ingest_image(_jpeg((100, 100)))
+        assert False, "Expected the pixel limit to be enforced"
+    except ValueError:
+        pass
+    finally:
+        image_ingest.MAX_SOURCE_PIXELS = limit
+
+
+if __name__ == "__main__":
+    test_large_jpeg_is_drafted_upright_and_within_budget()
+    test_other_inputs_are_converted_and_downscaled()
+    test_oversized_sources_are_rejected_before_decoding()
+    print("All tests passed!")
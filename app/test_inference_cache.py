@@ -0,0 +1,27 @@
+from PIL import Image
+from app.inference_cache import LRUCache, image_digest
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.get('b') is None
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'size': 2, 'maxsize': 2}
+
+
+def test_image_digest_depends_on_pixels_only():
+    red = Image.new('RGB', (8, 8), (255, 0, 0))
+    assert image_digest(red) == image_digest(red.copy())
+    assert image_digest(red) != image_digest(Image.new('RGB', (8, 8), (0, 255, 0)))
+    assert image_digest(red) != image_digest(Image.new('RGB', (4, 16), (255, 0, 0)))
+
+
+if __name__ == "__main__":
+    test_lru_cache_evicts_least_recently_used()
+    test_image_digest_depends_on_pixels_only()
+    print("All tests passed!")
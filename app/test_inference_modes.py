@@ -0,0 +1,41 @@
+import torch
+from app.inference_modes import INFERENCE_MODES, optimize_modules
+
+
+def _modules():
+    torch.manual_seed(0)
+    backbone = torch.nn.Sequential(
+        torch.nn.Conv2d(3, 8, 3, padding=1), torch.nn.BatchNorm2d(8), torch.nn.ReLU(),
+        torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten()
+    )
+    return backbone.eval(), torch.nn.Linear(8, 5).eval()
+
+
+def test_every_mode_keeps_the_model_outputs():
+    calibration = torch.randn(16, 3, 32, 32)
+    backbone, classifier = _modules()
+    with torch.no_grad():
+        expected = classifier(backbone(calibration))
+    
+    for mode in INFERENCE_MODES:
+        optimized_backbone, optimized_classifier = optimize_modules(*_modules(), mode, calibration)
+        with torch.no_grad():
+            logits = optimized_classifier(optimized_backbone(calibration))
+        tolerance = 0.1 if 'int8' in mode else 1e-4
+        assert logits.shape == expected.shape
+        assert torch.allclose(logits, expected, atol=tolerance), f"{mode} changed the outputs"
+
+
+def test_unknown_mode_and_missing_calibration_are_rejected():
+    for mode, calibration in (('fp8', None), ('static_int8', None)):
+        try:
+            optimize_modules(*_modules(), mode, calibration)
+            assert False, f"Expected {mode} to be rejected"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_every_mode_keeps_the_model_outputs()
+    test_unknown_mode_and_missing_calibration_are_rejected()
+    print("All tests passed!")
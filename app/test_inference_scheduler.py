@@ -0,0 +1,91 @@
+import threading
+from app.inference_scheduler import MicroBatcher
+
+
+def test_concurrent_requests_share_batches():
+    release = threading.Event()
+    seen = []
+    
+    def run_batch(items):
+        release.wait()
+        seen.append(len(items))
+        return [item * 2 for item in items]
+    
+    scheduler = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=50)
+    try:
+        futures = [scheduler.submit(i) for i in range(10)]
+        release.set()
+        assert [future.result(timeout=5) for future in futures] == [i * 2 for i in range(10)]
+        
+        stats = scheduler.stats()
+        assert stats['submitted'] == 10 and sum(seen) == 10
+        assert max(seen) <= 4 and stats['batches'] < 10
+        assert sum(size * count for size, count in stats['batch_size_histogram'].items()) == 10
+        assert stats['queue_depth'] == 0
+    finally:
+        scheduler.close()
+
+
+def test_batch_errors_reach_every_caller():
+    def run_batch(items):
+        raise ValueError("bad batch")
+    
+    scheduler = MicroBatcher(run_batch, max_batch_size=8, max_wait_ms=1)
+    try:
+        future = scheduler.submit(1)
+        try:
+            future.result(timeout=5)
+            assert False, "Expected the batch error"
+        except ValueError as e:
+            assert str(e) == "bad batch"
+        # The worker keeps serving after a failure
+        scheduler.run_batch = lambda items: items
+        assert scheduler.submit(3).result(timeout=5) == 3
+        assert scheduler.stats()['failed_batches'] == 1
+        
+        # A batch that comes back short fails every caller rather than leaving some waiting
+        scheduler.run_batch = lambda items: items[:-1]
+        futures = [scheduler.submit(i) for i in range(2)]
+        for future in futures:
+            try:
+                future.result(timeout=5)
+                assert False, "Expected a result count error"
+            except RuntimeError as e:
+                assert "results for" in str(e)
+        assert scheduler.stats()['failed_batches'] >= 2
+    finally:
+        scheduler.close()
+
+
+def test_batches_run_concurrently_up_to_max_in_flight():
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    both_running = threading.Event()
+    
+    def run_batch(items):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            if running[0] == 2:
+                both_running.set()
+        both_running.wait(timeout=5)
+        with lock:
+            running[0] -= 1
+        return items
+    
+    scheduler = MicroBatcher(run_batch, max_batch_size=2, max_wait_ms=1, max_in_flight=2)
+    try:
+        futures = [scheduler.submit(i) for i in range(6)]
+        assert [future.result(timeout=5) for future in futures] == list(range(6))
+        assert peak[0] == 2 and both_running.is_set()
+    finally:
+        scheduler.close()
+    assert not any(worker.is_alive() for worker in scheduler._workers)
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_batches()
+    test_batch_errors_reach_every_caller()
+    test_batches_run_concurrently_up_to_max_in_flight()
+    print("All tests passed!")
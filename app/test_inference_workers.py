@@ -0,0 +1,88 @@
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import torch
+from app.backbones import get_backbone
+from app.inference_workers import InferenceWorkerPool, WorkerCrashed
+
+
+def _model_dir():
+    model_dir = tempfile.mkdtemp()
+    spec = get_backbone('mobilenet_v3_large')
+    torch.manual_seed(0)
+    model = spec.build()
+    torch.save(model.state_dict(), os.path.join(model_dir, spec.weights_file))
+    return model_dir, spec.split(model)
+
+
+def test_workers_match_in_process_inference_and_restart_after_crash():
+    model_dir, (backbone, classifier) = _model_dir()
+    pool = InferenceWorkerPool(model_dir, 'mobilenet_v3_large', num_workers=2, max_batch=2, health_interval=0)
+    try:
+        tensors = list(torch.randn(5, 3, 224, 224))
+        with torch.no_grad():
+            embeddings = backbone(torch.stack(tensors))
+            expected = classifier(embeddings)
+        
+        # Five images over batches of at most two
+        outputs = pool.run(tensors)
+        assert len(outputs) == 5
+        for (embedding, logits), expected_embedding, expected_logits in zip(outputs, embeddings, expected):
+            assert torch.allclose(embedding, expected_embedding, atol=1e-4)
+            assert torch.allclose(logits, expected_logits, atol=1e-4)
+        assert sum(pool.stats()['requests']) == 3
+        
+        # A killed worker is replaced, and requests keep succeeding
+        os.kill(pool.workers[0].process.pid, signal.SIGKILL)
+        pool.workers[0].process.join()
+        assert pool.health_check() == {'healthy': 1, 'restarted': 1}
+        os.kill(pool.workers[1].process.pid, signal.SIGKILL)
+        pool.workers[1].process.join()
+        outputs = pool.run(tensors[:2]) + pool.run(tensors[2:4])
+        assert torch.allclose(outputs[3][1], expected[3], atol=1e-4)
+        
+        stats = pool.stats()
+        assert stats['restarts'] == 2 and stats['alive'] == 2
+    finally:
+        pool.close()
+        shutil.rmtree(model_dir)
+
+
+def test_close_wakes_waiting_callers_and_blocks_restarts():
+    model_dir, _ = _model_dir()
+    pool = InferenceWorkerPool(model_dir, 'mobilenet_v3_large', num_workers=1, max_batch=1, health_interval=0)
+    try:
+        # Hold the only worker, so the next request waits for it
+        worker = pool._idle.get()
+        errors = []
+        
+        def request():
+            try:
+                pool.run([torch.randn(3, 224, 224)])
+            except RuntimeError as e:
+                errors.append(e)
+        
+        caller = threading.Thread(target=request)
+        caller.start()
+        pool.close()
+        caller.join(timeout=5)
+        assert not caller.is_alive() and len(errors) == 1
+        
+        # A restart racing with close() does not start a process nobody stops
+        try:
+            pool._restart(worker)
+            assert False, "Expected the restart to be refused"
+        except WorkerCrashed:
+            pass
+        assert pool.workers == [] and not worker.process.is_alive()
+    finally:
+        pool.close()
+        shutil.rmtree(model_dir)
+
+
+if __name__ == "__main__":
+    test_workers_match_in_process_inference_and_restart_after_crash()
+    test_close_wakes_waiting_callers_and_blocks_restarts()
+    print("All tests passed!")
@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
-from app.nutrition_utils import load_nutrition_data
+from app.nutrition_utils import load_nutrition_data, NutritionCatalogCache, NutritionTable, build_catalog_snapshots
+from app.nutrition_utils import assess_health_impact, assess_health_impact_batch, decode_impact_codes
+from app.nutrition_utils import get_nutrition_info, get_nutrition_info_many
+import shutil
 import os
 
 def test_load_nutrition_data():
@@ -43,5 +46,130 @@ def test_load_nutrition_data():
         if os.path.exists('test_nutrition_data.csv'):
             os.remove('test_nutrition_data.csv')
 
+def test_catalog_cache_reloads_only_on_content_change():
+    test_df = pd.DataFrame({
+        'Food': ['Idli', 'Dosa'],
+        'Calories': [58, 133],
+        'Protein': [2, 2.7],
+        'Fat': [0.4, 4],
+        'Carbs': [12, 21]
+    })
+    test_df.to_csv('test_catalog_cache.csv', index=False)
+    
+    try:
+        cache = NutritionCatalogCache()
+        first = cache.get('test_catalog_cache.csv')
+        assert cache.get('test_catalog_cache.csv') is first, "Repeated loads should share one catalog"
+        assert cache.stats()['misses'] == 1 and cache.stats()['hits'] == 1
+        
+        # Touching the file without changing it should not trigger a reload
+        stat = os.stat('test_catalog_cache.csv')
+        os.utime('test_catalog_cache.csv', ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert cache.get('test_catalog_cache.csv') is first
+        assert cache.stats()['reloads'] == 0
+        
+        # Changing the contents should
+        test_df.loc[2] = ['Poha', 250, 6, 2, 45]
+        test_df.to_csv('test_catalog_cache.csv', index=False)
+        reloaded = cache.get('test_catalog_cache.csv')
+        assert len(reloaded) == 3
+        assert cache.stats()['reloads'] == 1
+        
+        # The digest and the DataFrame come from the same version
+        digest, df = cache.versioned('test_catalog_cache.csv')
+        assert df is reloaded and digest == cache.digest('test_catalog_cache.csv')
+        
+        # Derived structures are rebuilt per catalog version
+        assert cache.derived('rows', len, 'test_catalog_cache.csv') == 3
+        
+        # load_nutrition_data hands out private copies
+        assert load_nutrition_data('test_catalog_cache.csv') is not load_nutrition_data('test_catalog_cache.csv')
+    finally:
+        if os.path.exists('test_catalog_cache.csv'):
+            os.remove('test_catalog_cache.csv')
+
+def test_nutrition_table_lookup():
+    df = pd.DataFrame({
+        'Food': ['Idli', 'Dosa', 'IDLI'],
+        'Calories': [58, 133, 99],
+        'Protein': [2, 2.7, 1],
+        'Fat': [0.4, 4, 1],
+        'Carbs': [12, 21, 1]
+    })
+    table = NutritionTable.from_frame(df)
+    
+    assert table.calories.dtype == np.float32, "Nutrient columns should be float32"
+    
+    record = table.lookup('dOsA')
+    assert record == {'name': 'Dosa', 'calories': 133.0, 'protein': 2.7, 'fat': 4.0, 'carbs': 21.0}
+    assert pd.DataFrame([record])['protein'].iloc[0] == 2.7, "Records should convert to DataFrame rows"
+    
+    # Duplicate names resolve to the first row, like the old DataFrame filter
+    assert table.lookup('idli')['calories'] == 58.0
+    assert table.lookup('Vada') is None
+
+def test_catalog_snapshot_round_trip():
+    test_df = pd.DataFrame({
+        'Food': ['Idli', 'Dosa', 'Poha'],
+        'Calories': [58, 133, 250],
+        'Protein': [2, 2.7, 6],
+        'Fat': [0.4, 4, 2],
+        'Carbs': [12, 21, 45]
+    })
+    test_df.to_csv('test_snapshot_catalog.csv', index=False)
+    
+    try:
+        build_catalog_snapshots(['test_snapshot_catalog.csv'], 'test_snapshots')
+        
+        cache = NutritionCatalogCache(snapshot_dir='test_snapshots')
+        from_snapshot = cache.get('test_snapshot_catalog.csv')
+        assert cache.stats()['snapshot_loads'] == 1, "A current snapshot should be used"
+        pd.testing.assert_frame_equal(from_snapshot, load_nutrition_data('test_snapshot_catalog.csv'))
+        
+        # Once the CSV changes the snapshot is stale and the CSV is parsed instead
+        test_df.loc[3] = ['Upma', 150, 4, 3, 25]
+        test_df.to_csv('test_snapshot_catalog.csv', index=False)
+        assert len(cache.get('test_snapshot_catalog.csv')) == 4
+        assert cache.stats()['snapshot_loads'] == 1
+    finally:
+        if os.path.exists('test_snapshot_catalog.csv'):
+            os.remove('test_snapshot_catalog.csv')
+        shutil.rmtree('test_snapshots', ignore_errors=True)
+
+def test_assess_health_impact_batch_matches_scalar():
+    # Values on and around every threshold
+    df = pd.DataFrame({
+        'Calories': [0, 199, 200, 299, 300, 399, 400, 499, 500, 900],
+        'Protein': [0, 8, 8.5, 10, 10.5, 15, 15.5, 9, 20, 12],
+        'Fat': [0, 4.9, 5, 9.9, 10, 14.9, 15, 2, 30, 8],
+        'Carbs': [0, 19.9, 20, 39.9, 40, 10, 50, 25, 5, 60]
+    })
+    codes = assess_health_impact_batch(df)
+    messages = decode_impact_codes(codes)
+    
+    for i, row in df.iterrows():
+        expected = assess_health_impact({
+            'calories': row['Calories'],
+            'protein': row['Protein'],
+            'fat': row['Fat'],
+            'carbs': row['Carbs']
+        })
+        assert messages.loc[i].to_dict() == expected, f"Row {i} should match assess_health_impact"
+
+def test_get_nutrition_info_many():
+    meal = ['Idli', 'sambar', 'Not A Dish', 'IDLI']
+    result = get_nutrition_info_many(meal)
+    
+    assert result['unmatched'] == ['Not A Dish']
+    assert result['items']['name'].tolist() == ['Idli', 'Sambar', 'Idli'], "Matches should keep input order"
+    
+    expected_calories = sum(get_nutrition_info(name)['calories'] for name in ['Idli', 'Sambar', 'Idli'])
+    assert abs(result['totals']['calories'] - expected_calories) < 0.01
+
 if __name__ == "__main__":
-    test_load_nutrition_data() 
\ No newline at end of file
+    test_load_nutrition_data()
+    test_catalog_cache_reloads_only_on_content_change()
+    test_nutrition_table_lookup()
+    test_catalog_snapshot_round_trip()
+    test_assess_health_impact_batch_matches_scalar()
+    test_get_nutrition_info_many()
@@ -0,0 +1,74 @@
+import io
+import os
+import random
+import tempfile
+from PIL import Image, ImageFilter
+from app.perceptual_cache import PerceptualCache, dhash, hamming
+
+APP_DIR = os.path.dirname(__file__)
+
+
+def test_dhash_survives_resizing_and_recompression():
+    photo = Image.open(os.path.join(APP_DIR, 'dosa.jpg')).convert('RGB')
+    buffer = io.BytesIO()
+    photo.resize((photo.width // 3, photo.height // 3)).save(buffer, 'JPEG', quality=40)
+    copy = Image.open(buffer)
+    other = Image.open(os.path.join(APP_DIR, 'samosa.jpg')).convert('RGB')
+    
+    assert hamming(dhash(photo), dhash(copy)) <= 6
+    assert hamming(dhash(photo), dhash(photo.filter(ImageFilter.GaussianBlur(1)))) <= 6
+    assert hamming(dhash(photo), dhash(other)) > 6
+
+
+def test_multi_index_lookup_matches_brute_force():
+    rng = random.Random(0)
+    cache = PerceptualCache(max_distance=6, maxsize=10_000)
+    stored = [rng.getrandbits(64) for _ in range(2000)]
+    for i, value in enumerate(stored):
+        cache.put(value, f"dish {i}")
+    
+    for value in stored[:50]:
+        near = value
+        for bit in rng.sample(range(64), rng.randint(0, 6)):
+            near ^= 1 << bit
+        assert cache.get(near) is not None
+    for _ in range(50):
+        query = rng.getrandbits(64)
+        closest = min(stored, key=lambda value: hamming(value, query))
+        expected = f"dish {stored.index(closest)}" if hamming(closest, query) <= 6 else None
+        assert cache.get(query) == expected
+
+
+def test_lru_eviction_metrics_and_persistence():
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    os.remove(path)
+    try:
+        cache = PerceptualCache(max_distance=2, maxsize=2, path=path, signature=['m', 1])
+        cache.put(0b0, 'dal', seconds=0.5)
+        cache.put(0b1111 << 20, 'idli', seconds=0.25)
+        assert cache.get(0b1) == 'dal'
+        cache.put(0b1111 << 40, 'poha')
+        assert cache.get(0b1111 << 20) is None
+        
+        stats = cache.stats()
+        assert stats['hits'] == 1 and stats['lookups'] == 2
+        assert stats['hit_rate'] == 0.5 and stats['saved_seconds'] == 0.5
+        
+        cache.save()
+        assert PerceptualCache(max_distance=2, path=path, signature=['m', 1]).get(0b0) == 'dal'
+        assert len(PerceptualCache(max_distance=2, path=path, signature=['other', 1])) == 0
+        
+        # Clearing drops the saved entries too
+        cache.clear()
+        assert len(PerceptualCache(max_distance=2, path=path, signature=['m', 1])) == 0
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    test_dhash_survives_resizing_and_recompression()
+    test_multi_index_lookup_matches_brute_force()
+    test_lru_eviction_metrics_and_persistence()
+    print("All tests passed!")
@@ -0,0 +1,57 @@
+from app.plate_analysis import TileBudget, boxes_overlap, merge_detections, plate_tiles
+
+
+def test_tiles_go_coarse_to_fine_and_cover_the_image():
+    boxes = plate_tiles(800, 600, max_grid=3)
+    assert len(boxes) == 1 + 4 + 9
+    assert boxes[0] == (0, 0, 800, 600)
+    
+    # The finest level spans the image, and its first tile is the center one
+    finest = boxes[5:]
+    assert min(box[0] for box in finest) == 0 and max(box[2] for box in finest) == 800
+    assert min(box[1] for box in finest) == 0 and max(box[3] for box in finest) == 600
+    assert finest[0] == (240, 180, 560, 420)
+    
+    # Neighbouring windows overlap
+    assert boxes_overlap(boxes[1], boxes[2]) or boxes_overlap(boxes[1], boxes[3])
+
+
+def test_merge_joins_overlapping_tiles_of_the_same_dish():
+    items = merge_detections([
+        ((0, 0, 60, 60), 'dal', 0.5),
+        ((40, 40, 100, 100), 'dal', 0.7),
+        ((200, 200, 260, 260), 'dal', 0.3),
+        ((30, 30, 90, 90), 'rice', 0.6)
+    ])
+    assert [(item['food_name'], item['tiles']) for item in items] == [('dal', 2), ('rice', 1), ('dal', 1)]
+    assert items[0]['confidence'] == 0.7 and items[0]['box'] == (0, 0, 100, 100)
+    
+    # The whole-image tile does not join separate servings of a dish
+    whole = (0, 0, 300, 300)
+    items = merge_detections([
+        (whole, 'dal', 0.4),
+        ((0, 0, 60, 60), 'dal', 0.5),
+        ((200, 200, 260, 260), 'dal', 0.3),
+        (whole, 'rice', 0.6)
+    ], image_box=whole)
+    assert [(item['food_name'], item['tiles']) for item in items] == [('rice', 1), ('dal', 1), ('dal', 1)]
+    assert items[0]['box'] == whole
+
+
+def test_budget_sizes_tile_count_from_measured_cost():
+    budget = TileBudget(smoothing=0.5)
+    assert budget.affordable(1.0) == 1
+    assert budget.affordable(0.0) == 0
+    
+    budget.observe(1, 0.1)
+    assert budget.affordable(1.0) == 10
+    budget.observe(10, 0.5)
+    assert abs(budget.seconds_per_tile - 0.075) < 1e-9
+    assert budget.affordable(0.05) == 0
+
+
+if __name__ == "__main__":
+    test_tiles_go_coarse_to_fine_and_cover_the_image()
+    test_merge_joins_overlapping_tiles_of_the_same_dish()
+    test_budget_sizes_tile_count_from_measured_cost()
+    print("All tests passed!")
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from app.preset_gallery import PresetGallery
+
+
+def test_search_matches_cosine_similarity():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 16))
+    gallery = PresetGallery()
+    for i, vector in enumerate(vectors):
+        gallery.add(f"dish {i}", vector)
+    
+    query = rng.normal(size=16)
+    expected = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    order = np.argsort(-expected)
+    
+    matches = gallery.search(query, k=5)
+    assert [label for label, _ in matches] == [f"dish {i}" for i in order[:5]]
+    assert np.allclose([score for _, score in matches], expected[order[:5]], atol=1e-5)
+    assert gallery.best_match(query)[0] == f"dish {order[0]}"
+
+
+def test_sync_embeds_only_new_images_and_round_trips():
+    preset_dir = tempfile.mkdtemp()
+    gallery_dir = tempfile.mkdtemp()
+    embedded = []
+    
+    def embed(path):
+        embedded.append(path.name)
+        return np.frombuffer(path.read_bytes(), dtype=np.uint8).astype(np.float32)
+    
+    try:
+        for name, value in [('dal', 1), ('idli', 2)]:
+            with open(os.path.join(preset_dir, f"{name}.jpg"), 'wb') as f:
+                f.write(bytes([value, 0, 3]))
+        
+        gallery = PresetGallery(dtype=np.float16)
+        assert gallery.sync(preset_dir, embed, model_signature='m1') == 2
+        gallery.save(gallery_dir)
+        
+        loaded = PresetGallery.load(gallery_dir)
+        assert loaded.labels == ['dal', 'idli'] and loaded.matrix.dtype == np.float16
+        assert np.array_equal(loaded.matrix, gallery.matrix)
+        
+        # A new image is embedded alone; a removed one is dropped
+        with open(os.path.join(preset_dir, 'poha.jpg'), 'wb') as f:
+            f.write(bytes([0, 5, 0]))
+        os.remove(os.path.join(preset_dir, 'dal.jpg'))
+        embedded.clear()
+        assert loaded.sync(preset_dir, embed, model_signature='m1') == 1
+        assert embedded == ['poha.jpg']
+        assert loaded.labels == ['idli', 'poha']
+        assert loaded.best_match([0, 1, 0])[0] == 'poha'
+        
+        # A different model re-embeds everything
+        assert loaded.sync(preset_dir, embed, model_signature='m2') == 2
+    finally:
+        shutil.rmtree(preset_dir)
+        shutil.rmtree(gallery_dir)
+
+
+def test_indexed_gallery_keeps_exact_answers_and_new_rows():
+    rng = np.random.default_rng(1)
+    gallery = PresetGallery()
+    for i, vector in enumerate(rng.normal(size=(200, 8))):
+        gallery.add(f"dish {i}", vector)
+    query = rng.normal(size=8)
+    expected = gallery.search(query, k=3)
+    
+    gallery.build_index('ivf_flat', n_lists=4, n_probe=4)
+    assert [label for label, _ in gallery.search(query, k=3)] == [label for label, _ in expected]
+    
+    gallery.add('new dish', query)
+    assert gallery.best_match(query)[0] == 'new dish'
+    
+    directory = tempfile.mkdtemp()
+    try:
+        gallery.save(directory)
+        loaded = PresetGallery.load(directory)
+        assert loaded.index is not None and loaded.best_match(query)[0] == 'new dish'
+    finally:
+        shutil.rmtree(directory)
+    
+    # Changing a copy leaves the original, rows and index, as it was
+    copied = gallery.copy()
+    copied.remove([len(gallery) - 1])
+    copied.add('another dish', -query)
+    assert gallery.best_match(query)[0] == 'new dish' and len(gallery.index) == len(gallery) == 201
+
+
+def test_index_survives_sync_that_removes_a_file():
+    preset_dir = tempfile.mkdtemp()
+    gallery_dir = tempfile.mkdtemp()
+    rng = np.random.default_rng(2)
+    vectors = {f"dish{i}": rng.normal(size=8) for i in range(40)}
+    
+    def embed(path):
+        return vectors[path.stem]
+    
+    try:
+        for name in vectors:
+            open(os.path.join(preset_dir, f"{name}.jpg"), 'wb').close()
+        gallery = PresetGallery()
+        gallery.sync(preset_dir, embed, model_signature='m1')
+        gallery.build_index('ivf_flat', n_lists=4, n_probe=4)
+        index = gallery.index
+        
+        os.remove(os.path.join(preset_dir, 'dish3.jpg'))
+        assert gallery.sync(preset_dir, embed, model_signature='m1') == 0
+        assert gallery.index is index and len(index) == len(gallery) == 39
+        
+        # Rows after the removed one still resolve to their own labels
+        for name in ('dish0', 'dish10', 'dish39'):
+            assert gallery.best_match(vectors[name])[0] == name
+        assert gallery.best_match(vectors['dish3'])[0] != 'dish3'
+        
+        gallery.save(gallery_dir)
+        assert os.path.exists(os.path.join(gallery_dir, 'preset_index.npz'))
+        assert PresetGallery.load(gallery_dir).best_match(vectors['dish39'])[0] == 'dish39'
+    finally:
+        shutil.rmtree(preset_dir)
+        shutil.rmtree(gallery_dir)
+
+
+if __name__ == "__main__":
+    test_search_matches_cosine_similarity()
+    test_sync_embeds_only_new_images_and_round_trips()
+    test_indexed_gallery_keeps_exact_answers_and_new_rows()
+    test_index_survives_sync_that_removes_a_file()
+    print("All tests passed!")
@@ -0,0 +1,79 @@
+import os
+import pandas as pd
+import numpy as np
+from app.recommender import AlternativesIndex, get_alternatives_index
+
+
+def reference_alternatives(df, target_row, n_suggestions):
+    """The previous DataFrame-based get_healthier_alternatives() selection"""
+    target_calories = df['Calories'].iloc[target_row]
+    target_protein_ratio = df['Protein'].iloc[target_row] / target_calories
+    df = df.assign(Protein_Ratio=df['Protein'] / df['Calories'])
+    
+    alternatives = df[(df['Calories'] < target_calories) & (df['Protein_Ratio'] > target_protein_ratio)]
+    if len(alternatives) < n_suggestions:
+        alternatives = df[df['Calories'] < target_calories]
+        if len(alternatives) < n_suggestions:
+            alternatives = df.nsmallest(n_suggestions, 'Calories')
+    alternatives = alternatives.sort_values(
+        by=['Protein_Ratio', 'Calories'],
+        ascending=[False, True]
+    ).head(n_suggestions)
+    
+    result = alternatives[['Food', 'Calories', 'Protein', 'Fat', 'Carbs', 'Protein_Ratio']].copy()
+    result['Calories_Reduction'] = target_calories - result['Calories']
+    result['Protein_Ratio_Improvement'] = result['Protein_Ratio'] - target_protein_ratio
+    return result.round(2)
+
+
+def test_alternatives_index_matches_dataframe_filtering():
+    rng = np.random.default_rng(0)
+    n_rows = 200
+    # Coarse values so there are plenty of ties in calories and protein ratio
+    df = pd.DataFrame({
+        'Food': [f"Dish {i}" for i in range(n_rows)],
+        'Calories': rng.choice([50, 100, 150, 200, 300], n_rows),
+        'Protein': rng.choice([0.0, 2.5, 5.0, 10.0], n_rows),
+        'Fat': rng.uniform(0, 20, n_rows).round(1),
+        'Carbs': rng.uniform(0, 60, n_rows).round(1)
+    })
+    before = df.copy()
+    index = AlternativesIndex(df)
+    
+    for target_row in range(0, n_rows, 7):
+        for n_suggestions in [1, 3, 10, 60]:
+            pd.testing.assert_frame_equal(
+                index.alternatives(target_row, n_suggestions),
+                reference_alternatives(df, target_row, n_suggestions)
+            )
+    
+    pd.testing.assert_frame_equal(df, before, obj="The catalog should not be modified")
+
+
+def test_alternatives_index_and_name_lookup_share_a_catalog_version():
+    test_df = pd.DataFrame({
+        'Food': ['Idli', 'Masala Dosa', 'Poha'],
+        'Calories': [58, 168, 250],
+        'Protein': [2, 3.9, 6],
+        'Fat': [0.4, 5.8, 2],
+        'Carbs': [12, 26, 45]
+    })
+    test_df.to_csv('test_alternatives_catalog.csv', index=False)
+    
+    try:
+        index, names = get_alternatives_index('test_alternatives_catalog.csv')
+        assert index.df['Food'].iloc[int(names.contains('dosa')[0])] == 'Masala Dosa'
+        
+        # A reload replaces both, so a row found by name is the same food in the index
+        test_df.iloc[::-1].to_csv('test_alternatives_catalog.csv', index=False)
+        reloaded, renamed = get_alternatives_index('test_alternatives_catalog.csv')
+        assert reloaded is not index and renamed is not names
+        assert reloaded.df['Food'].iloc[int(renamed.contains('dosa')[0])] == 'Masala Dosa'
+    finally:
+        if os.path.exists('test_alternatives_catalog.csv'):
+            os.remove('test_alternatives_catalog.csv')
+
+
+if __name__ == "__main__":
+    test_alternatives_index_matches_dataframe_filtering()
+    test_alternatives_index_and_name_lookup_share_a_catalog_version()
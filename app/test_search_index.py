@@ -0,0 +1,72 @@
+import os
+import pandas as pd
+import numpy as np
+from app.search_index import NgramIndex, PrefixIndex, get_searchable_catalog, search_foods
+
+
+def test_ngram_index_matches_str_contains():
+    names = pd.Series([
+        'Idli', 'Masala Dosa', 'Dosa', 'Rava Dosa', 'Paneer Butter Masala',
+        'Dal Tadka', 'Dal Makhani', 'Aloo Paratha', 'Pav Bhaji', 'Crème Brûlée',
+        'Chole (Chickpea Curry)', 'Poha'
+    ], dtype=object)
+    index = NgramIndex(names)
+    
+    queries = [
+        'dosa', 'DOSA', 'masala', 'dal', 'al', 'a', 'x', 'paratha', 'bhaji pav',
+        'crème', 'CRÈME', 'brûlée', 'sa d', '\\(chickpea', 'd.l', 'dosa$', 'po|id', ''
+    ]
+    for query in queries:
+        expected = np.flatnonzero(names.str.contains(query, case=False, na=False).to_numpy())
+        assert index.contains(query).tolist() == expected.tolist(), f"Mismatch for query {query!r}"
+
+
+def test_prefix_index_ranks_distinct_completions():
+    index = PrefixIndex([
+        ('masala dosa', 'Masala Dosa', 6),
+        ('dosa', 'Masala Dosa', 6),
+        ('dosa', 'Dosa', 8),
+        ('dal tadka', 'Dal Tadka', 7),
+        ('tadka', 'Dal Tadka', 7),
+        ('pancake', 'Dosa', 7.5),
+        ('paneer tikka', 'Paneer Tikka', 9)
+    ])
+    
+    assert index.complete('do') == ['Dosa', 'Masala Dosa']
+    assert index.complete('D') == ['Dosa', 'Dal Tadka', 'Masala Dosa'], "Completions should be distinct and ranked by score"
+    assert index.complete('pan') == ['Paneer Tikka', 'Dosa']
+    assert index.complete('pan', k=1) == ['Paneer Tikka']
+    assert index.complete('xyz') == []
+    assert index.complete('') == []
+
+def test_search_uses_index_of_same_catalog_version():
+    test_df = pd.DataFrame({
+        'Food': ['Idli', 'Masala Dosa'],
+        'Calories': [58, 168],
+        'Protein': [2, 3.9],
+        'Fat': [0.4, 5.8],
+        'Carbs': [12, 26]
+    })
+    test_df.to_csv('test_search_catalog.csv', index=False)
+    
+    try:
+        df, index = get_searchable_catalog('test_search_catalog.csv')
+        assert index.contains('dosa').tolist() == [1]
+        assert search_foods('dosa', 'test_search_catalog.csv')['Food'].tolist() == ['Masala Dosa']
+        
+        # After a reload the catalog and its index are replaced together
+        pd.concat([pd.DataFrame({
+            'Food': ['Dosa'], 'Calories': [133], 'Protein': [2.7], 'Fat': [4], 'Carbs': [21]
+        }), test_df]).to_csv('test_search_catalog.csv', index=False)
+        reloaded, reindexed = get_searchable_catalog('test_search_catalog.csv')
+        assert reloaded is not df and reindexed is not index
+        assert search_foods('dosa', 'test_search_catalog.csv')['Food'].tolist() == ['Dosa', 'Masala Dosa']
+    finally:
+        if os.path.exists('test_search_catalog.csv'):
+            os.remove('test_search_catalog.csv')
+
+
+if __name__ == "__main__":
+    test_ngram_index_matches_str_contains()
+    test_prefix_index_ranks_distinct_completions()
+    test_search_uses_index_of_same_catalog_version()
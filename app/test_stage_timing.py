@@ -0,0 +1,58 @@
+import random
+from app.stage_timing import StageTimer, LatencyHistogram, timed_stage
+
+
+def test_histogram_percentiles_are_close():
+    rng = random.Random(0)
+    durations = sorted(rng.uniform(0.001, 0.1) for _ in range(10000))
+    histogram = LatencyHistogram()
+    for seconds in durations:
+        histogram.add(seconds)
+    
+    for q in (50, 90, 99):
+        exact = durations[int(q / 100 * len(durations)) - 1]
+        assert abs(histogram.percentile(q) - exact) / exact < 0.1
+    assert histogram.percentile(100) == durations[-1]
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def test_disabled_timer_records_only_traced_requests():
+    timer = StageTimer(enabled=False)
+    assert timer.span('decode') is timer.span('forward')
+    with timer.span('decode'):
+        pass
+    assert timer.percentiles() == {}
+    
+    with timer.trace() as trace:
+        with timer.span('outer'):
+            with timer.span('inner'):
+                pass
+    assert [stage for stage, _, _ in trace.spans] == ['outer', 'inner']
+    assert trace.total_ms >= trace.summary()['outer'] >= trace.summary()['inner']
+    assert timer.percentiles() == {}
+
+
+def test_enabled_timer_keeps_histograms_per_stage():
+    class Pipeline:
+        def __init__(self):
+            self.stage_timer = StageTimer(enabled=True)
+        
+        @timed_stage('double')
+        def double(self, x):
+            return 2 * x
+    
+    pipeline = Pipeline()
+    assert [pipeline.double(i) for i in range(5)] == [0, 2, 4, 6, 8]
+    stats = pipeline.stage_timer.percentiles((50, 99.9))
+    assert stats['double']['count'] == 5
+    assert set(stats['double']) == {'count', 'mean_ms', 'p50_ms', 'p99.9_ms', 'max_ms'}
+    
+    pipeline.stage_timer.reset()
+    assert pipeline.stage_timer.percentiles() == {}
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles_are_close()
+    test_disabled_timer_records_only_traced_requests()
+    test_enabled_timer_keeps_histograms_per_stage()
+    print("All tests passed!")
@@ -0,0 +1,68 @@
+import threading
+import time
+from app.thread_budget import ThreadBudget
+
+
+def _run_concurrently(budget, callers=8):
+    running = []
+    peak = []
+    lock = threading.Lock()
+    
+    def work(i):
+        with lock:
+            running.append(i)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(i)
+        return threading.current_thread().name, i * 2
+    
+    results = [None] * callers
+    
+    def caller(i):
+        results[i] = budget.run(work, i)
+    
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, max(peak)
+
+
+def test_concurrent_calls_are_bounded():
+    for dedicated_pool in (True, False):
+        budget = ThreadBudget(intra_op_threads=1, max_concurrent=2, dedicated_pool=dedicated_pool)
+        try:
+            results, peak = _run_concurrently(budget)
+            assert [value for _, value in results] == [i * 2 for i in range(8)]
+            assert peak <= 2
+            assert all(name.startswith('inference') for name, _ in results) == dedicated_pool
+            
+            stats = budget.stats()
+            assert stats['calls'] == 8 and stats['active'] == 0 and stats['peak_active'] <= 2
+            assert stats['max_wait_ms'] > 0
+        finally:
+            budget.close()
+
+
+def test_errors_reach_the_caller():
+    budget = ThreadBudget(intra_op_threads=1, max_concurrent=1)
+    
+    def fail():
+        raise ValueError("bad input")
+    
+    try:
+        budget.run(fail)
+        assert False, "Expected the error"
+    except ValueError as e:
+        assert str(e) == "bad input"
+    finally:
+        budget.close()
+    assert budget.stats()['active'] == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_are_bounded()
+    test_errors_reach_the_caller()
+    print("All tests passed!")
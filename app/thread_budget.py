@@ -0,0 +1,148 @@
+"""
+CPU thread budgeting for concurrent inference.
+
+Streamlit runs every session in its own thread, and all of them share one
+FoodRecognizer. Left alone, each thread that enters a forward pass gets
+torch's default intra-op parallelism (one thread per core), so N
+concurrent uploads run N x cores compute threads that time-slice the same
+cores: every request slows down and tail latency collapses.
+
+ThreadBudget splits the cores explicitly:
+
+    intra_op_threads   threads one forward pass uses (torch.set_num_threads)
+    inter_op_threads   threads for running independent ops in parallel
+                       (torch.set_num_interop_threads; 1 suffices for a CNN)
+    max_concurrent     forward passes allowed at once, so that
+                       max_concurrent x intra_op_threads ~ cores
+
+Forward passes beyond max_concurrent wait their turn. With a dedicated
+pool they also run on max_concurrent long-lived threads instead of the
+callers' threads, so the number of threads that ever enter torch (each
+with its own OpenMP team) stays fixed however many sessions there are.
+
+    budget = ThreadBudget()
+    recognizer = FoodRecognizer(thread_budget=budget)
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import torch
+
+# Threads per forward pass when not given; more than this rarely speeds up
+# a single 224 x 224 image
+MAX_INTRA_OP_THREADS = 4
+
+_configure_lock = threading.Lock()
+
+
+def available_cores() -> int:
+    """CPU cores this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def configure_torch_threads(intra_op_threads: int, inter_op_threads: int = None):
+    """
+    Set torch's process-wide intra-op and inter-op thread counts.
+
+    The inter-op count can only be set before torch first runs parallel
+    work; later calls keep whatever is already in effect.
+    """
+    with _configure_lock:
+        torch.set_num_threads(intra_op_threads)
+        if inter_op_threads is not None and torch.get_num_interop_threads() != inter_op_threads:
+            try:
+                torch.set_num_interop_threads(inter_op_threads)
+            except RuntimeError:
+                pass
+
+
+class ThreadBudget:
+    """
+    Bounds concurrent forward passes and the threads each may use.
+
+    Args:
+        intra_op_threads (int): Threads per forward pass (default: cores, at most MAX_INTRA_OP_THREADS)
+        inter_op_threads (int): torch inter-op threads (default: 1)
+        max_concurrent (int): Forward passes at once (default: cores // intra_op_threads)
+        dedicated_pool (bool): Run forward passes on a pool of max_concurrent
+            threads rather than on the callers' threads (default: True)
+    """
+
+    def __init__(self, intra_op_threads: int = None, inter_op_threads: int = 1, max_concurrent: int = None,
+                 dedicated_pool: bool = True):
+        cores = available_cores()
+        self.intra_op_threads = intra_op_threads or min(cores, MAX_INTRA_OP_THREADS)
+        self.inter_op_threads = inter_op_threads
+        self.max_concurrent = max_concurrent or max(1, cores // self.intra_op_threads)
+        self.dedicated_pool = dedicated_pool
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._pool = None
+        if dedicated_pool:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_concurrent, thread_name_prefix='inference',
+                initializer=torch.set_num_threads, initargs=(self.intra_op_threads,)
+            )
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+        configure_torch_threads(self.intra_op_threads, self.inter_op_threads)
+
+    def reset_stats(self):
+        """Zero the counters"""
+        with self._stats_lock:
+            self.calls = 0
+            self.active = 0
+            self.peak_active = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def _run_slot(self, submitted: float, fn, args):
+        """Run fn holding one of the max_concurrent slots"""
+        with self._slots:
+            waited = time.perf_counter() - submitted
+            with self._stats_lock:
+                self.calls += 1
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._stats_lock:
+                    self.active -= 1
+
+    def run(self, fn, *args):
+        """
+        Call fn(*args) within the budget, waiting for a free slot.
+
+        Returns:
+            Whatever fn returns; its exceptions propagate to the caller
+        """
+        submitted = time.perf_counter()
+        if self._pool is not None:
+            return self._pool.submit(self._run_slot, submitted, fn, args).result()
+        return self._run_slot(submitted, fn, args)
+
+    def stats(self) -> dict:
+        """Thread settings, calls, forward passes running now and at peak, and time spent waiting"""
+        with self._stats_lock:
+            return {
+                'intra_op_threads': self.intra_op_threads,
+                'inter_op_threads': self.inter_op_threads,
+                'max_concurrent': self.max_concurrent,
+                'dedicated_pool': self.dedicated_pool,
+                'calls': self.calls,
+                'active': self.active,
+                'peak_active': self.peak_active,
+                'mean_wait_ms': 1000.0 * self.wait_seconds / self.calls if self.calls else 0.0,
+                'max_wait_ms': 1000.0 * self.max_wait_seconds
+            }
+
+    def close(self):
+        """Stop the dedicated pool once running forward passes finish"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)